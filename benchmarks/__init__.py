@@ -0,0 +1,3 @@
+"""
+Pruebas de rendimiento del gestor; se ejecutan con python -m benchmarks
+"""
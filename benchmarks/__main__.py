@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from benchmarks.espacio_sintetico import generar_espacio
+from benchmarks.medicion import medir, describir_maquina, cargar_resultados, guardar_resultados, comparar
+from src_gestor.entornos import GestorEntornos
+from src_gestor.paquetes import LectorPaquetes
+from src_gestor.proyectos import GestorProyectos
+
+"""
+Pruebas de rendimiento de los caminos más usados sobre un directorio base
+sintético, sin conexión: python -m benchmarks
+"""
+
+def medir_proyectos(base, repeticiones):
+    """obtener_proyectos en frío (gestor nuevo) y con la caché de proyectos llena"""
+    caliente = GestorProyectos(base)
+    caliente.obtener_proyectos()
+    return {
+        'proyectos_frio': medir(lambda gestor: gestor.obtener_proyectos(), repeticiones,
+                                preparar=lambda: GestorProyectos(base)),
+        'proyectos_caliente': medir(lambda _: caliente.obtener_proyectos(), repeticiones)
+    }
+
+def medir_arbol(base, repeticiones, arbol_tk=None):
+    """Escaneo completo de GestorInterfaz hasta el árbol, en frío y repetido sin cambios"""
+    try:
+        from benchmarks.arbol_modelo import crear_interfaz_sin_ventana, escanear
+    except ImportError as e:
+        print(f"Se omite el árbol: {str(e)}", file=sys.stderr)
+        return {}
+
+    def preparar():
+        if arbol_tk is not None:
+            arbol_tk.delete(*arbol_tk.get_children())
+        return crear_interfaz_sin_ventana(base, arbol_tk)
+
+    resultados = {'arbol_escaneo_frio': medir(escanear, repeticiones, preparar=preparar)}
+
+    repetido = preparar()
+    escanear(repetido)
+    resultados['arbol_reescaneo'] = medir(lambda _: escanear(repetido), repeticiones)
+    return resultados
+
+def medir_paquetes(base, repeticiones):
+    """Listado de paquetes de todos los entornos leyendo los dist-info"""
+    gestor = GestorProyectos(base)
+    directorios = [
+        gestor.sistema.obtener_site_packages_venv(ruta_cfg.parent)
+        for ruta_cfg in sorted(gestor.directorio_proyectos.glob("*/*/pyvenv.cfg"))
+    ]
+    caliente = LectorPaquetes()
+    for site in directorios:
+        caliente.listar(site)
+
+    def listar_todos(lector):
+        for site in directorios:
+            lector.listar(site)
+
+    return {
+        'paquetes_frio': medir(listar_todos, repeticiones, preparar=LectorPaquetes),
+        'paquetes_caliente': medir(lambda _: listar_todos(caliente), repeticiones)
+    }
+
+def medir_requirements(base, repeticiones):
+    """Generación del requirements.txt de todos los entornos, sin pip"""
+    entornos = [
+        (ruta_cfg.parent.parent.name, ruta_cfg.parent.name)
+        for ruta_cfg in sorted(GestorProyectos(base).directorio_proyectos.glob("*/*/pyvenv.cfg"))
+    ]
+
+    def generar_todos(gestor):
+        for proyecto, entorno in entornos:
+            exito, texto = gestor.texto_requirements(proyecto, entorno)
+            if not exito:
+                raise RuntimeError(texto)
+
+    return {
+        'requirements': medir(generar_todos, repeticiones, preparar=lambda: GestorEntornos(base))
+    }
+
+def crear_analizador():
+    """Argumentos de la línea de comandos"""
+    analizador = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Mide los caminos más usados del gestor sobre un directorio base sintético"
+    )
+    analizador.add_argument("--proyectos", type=int, default=100)
+    analizador.add_argument("--entornos", type=int, default=2, help="entornos por proyecto")
+    analizador.add_argument("--carpetas", type=int, default=3, help="carpetas por proyecto")
+    analizador.add_argument("--paquetes", type=int, default=30, help="paquetes por entorno")
+    analizador.add_argument("--repeticiones", type=int, default=5)
+    analizador.add_argument("--espacio", help="usar (o crear si no existe) este directorio base en vez de uno temporal")
+    analizador.add_argument("--tk", action="store_true", help="medir el árbol con un Treeview real (necesita pantalla)")
+    analizador.add_argument("--salida", help="guardar los resultados en este JSON")
+    analizador.add_argument("--linea-base", help="JSON de resultados anterior con el que comparar")
+    analizador.add_argument("--tolerancia", type=float, default=0.25, help="empeoramiento admitido (0.25 = 25%%)")
+    return analizador
+
+def main(argv=None):
+    argumentos = crear_analizador().parse_args(argv)
+
+    temporal = None
+    base = argumentos.espacio
+    if base is None:
+        temporal = base = tempfile.mkdtemp(prefix="gestor_bench_")
+
+    try:
+        resumen = None
+        if not os.path.isdir(base) or not os.listdir(base):
+            print(f"Generando espacio sintético en {base}...", file=sys.stderr)
+            resumen = generar_espacio(base, argumentos.proyectos, argumentos.entornos,
+                                      argumentos.carpetas, argumentos.paquetes)
+
+        arbol_tk = None
+        if argumentos.tk:
+            import tkinter as tk
+            from tkinter import ttk
+            ventana = tk.Tk()
+            ventana.withdraw()
+            arbol_tk = ttk.Treeview(ventana, columns=('tamano',))
+
+        resultados = {}
+        for nombre, funcion in (('proyectos', medir_proyectos), ('paquetes', medir_paquetes),
+                                ('requirements', medir_requirements)):
+            print(f"Midiendo {nombre}...", file=sys.stderr)
+            resultados.update(funcion(base, argumentos.repeticiones))
+        print("Midiendo árbol...", file=sys.stderr)
+        resultados.update(medir_arbol(base, argumentos.repeticiones, arbol_tk))
+
+        informe = {
+            'maquina': describir_maquina(),
+            'espacio': resumen or {'directorio': base},
+            'resultados': resultados
+        }
+
+        codigo = 0
+        if argumentos.linea_base:
+            informe['comparacion'] = comparar(informe, cargar_resultados(argumentos.linea_base), argumentos.tolerancia)
+            regresiones = [nombre for nombre, datos in informe['comparacion'].items() if datos['regresion']]
+            if regresiones:
+                print(f"Regresiones: {', '.join(regresiones)}", file=sys.stderr)
+                codigo = 1
+
+        if argumentos.salida:
+            guardar_resultados(argumentos.salida, informe)
+        print(json.dumps(informe, ensure_ascii=False, indent=2))
+        return codigo
+
+    finally:
+        if temporal is not None:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
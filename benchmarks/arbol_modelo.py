@@ -0,0 +1,88 @@
+import collections
+
+from src_gestor.arbol import ReconciliadorArbol
+from src_gestor.arranque import CronometroArranque
+from src_gestor.despachador import Despachador
+from src_gestor.entornos import GestorEntornos
+from src_gestor.proyectos import GestorProyectos
+
+"""
+Modelo en memoria del Treeview para medir el escaneo y la reconciliación del
+árbol de GestorInterfaz sin pantalla
+"""
+
+class ArbolModelo:
+    """Implementa las operaciones de ttk.Treeview que usa ReconciliadorArbol"""
+
+    def __init__(self):
+        self.hijos = {'': []}
+        self.padres = {}
+        self.datos = {}
+        self.operaciones = collections.Counter()
+
+    def insert(self, padre, indice, iid=None, text='', values=(), open=False):
+        self.operaciones['insert'] += 1
+        self.hijos[padre].insert(indice, iid)
+        self.hijos[iid] = []
+        self.padres[iid] = padre
+        self.datos[iid] = {'text': text, 'values': values, 'open': open}
+        return iid
+
+    def item(self, iid, **opciones):
+        self.operaciones['item'] += 1
+        self.datos[iid].update(opciones)
+
+    def delete(self, iid):
+        self.operaciones['delete'] += 1
+        self.hijos[self.padres.pop(iid)].remove(iid)
+        for hijo in list(self.hijos.get(iid, [])):
+            self.delete(hijo)
+        self.hijos.pop(iid, None)
+        self.datos.pop(iid, None)
+
+    def move(self, iid, padre, indice):
+        self.operaciones['move'] += 1
+        self.hijos[self.padres[iid]].remove(iid)
+        self.hijos[padre].insert(indice, iid)
+        self.padres[iid] = padre
+
+    def get_children(self, iid=''):
+        return tuple(self.hijos.get(iid, []))
+
+def crear_interfaz_sin_ventana(directorio_base, arbol=None):
+    """
+    GestorInterfaz con solo el estado que usa el escaneo del árbol. arbol puede ser
+    un ttk.Treeview real (con pantalla) o, por defecto, un ArbolModelo.
+    """
+    from src_gestor.interfaz import GestorInterfaz
+
+    interfaz = GestorInterfaz.__new__(GestorInterfaz)
+    interfaz.gestor_proyectos = GestorProyectos(directorio_base)
+    interfaz.gestor_entornos = GestorEntornos(
+        interfaz.gestor_proyectos.directorio_proyectos, papelera=interfaz.gestor_proyectos.papelera
+    )
+    interfaz.despachador = Despachador()
+
+    interfaz._generacion_escaneo = 0
+    interfaz._prioridad_escaneo = collections.deque()
+    interfaz._proyectos_cargados = set()
+    interfaz._estados_sello = {}
+    interfaz._tamanos = {}
+    interfaz.estructura_proyectos = {}
+    interfaz._hijos_deseados = {'': []}
+    interfaz.arbol_proyectos = arbol if arbol is not None else ArbolModelo()
+    interfaz.reconciliador_arbol = ReconciliadorArbol(interfaz.arbol_proyectos)
+
+    # Sin consola, medición de espacio ni instantánea: solo escaneo y árbol
+    interfaz.cronometro = CronometroArranque()
+    interfaz.cronometro.marcas['datos_completos'] = 0
+    interfaz.cambiar_estado = lambda mensaje: None
+    interfaz._pedir_medidas = lambda nombres: None
+    interfaz._guardar_instantanea = lambda en_fondo=False: None
+    return interfaz
+
+def escanear(interfaz):
+    """Lo que hace actualizar_proyectos, pero en este hilo y aplicando el resultado al árbol"""
+    interfaz._generacion_escaneo += 1
+    interfaz._escanear_en_fondo(interfaz._generacion_escaneo)
+    interfaz.despachador.procesar()
@@ -0,0 +1,114 @@
+import os
+import platform
+import random
+import sys
+import time
+
+"""
+Generador de directorios base sintéticos: proyectos con entornos virtuales
+falsos (pyvenv.cfg y dist-info reales, sin intérprete) y carpetas normales
+"""
+
+# Antigüedad de las fechas de modificación, para que la caché de proyectos
+# no descarte los directorios por recién modificados
+ANTIGUEDAD_SEGUNDOS = 3600
+
+def generar_espacio(destino, proyectos=50, entornos=2, carpetas=3, paquetes=30, semilla=0):
+    """
+    Crea en destino proyectos × entornos × carpetas; cada entorno lleva paquetes
+    dist-info con METADATA, RECORD e INSTALLER. Devuelve un resumen de lo creado.
+    """
+    aleatorio = random.Random(semilla)
+    version = f"{sys.version_info[0]}.{sys.version_info[1]}.{sys.version_info[2]}"
+    catalogo = [f"paquete-{indice:04d}" for indice in range(max(paquetes * 4, 1))]
+    os.makedirs(destino, exist_ok=True)
+
+    archivos = 0
+    for indice_proyecto in range(proyectos):
+        ruta_proyecto = os.path.join(destino, f"proyecto_{indice_proyecto:04d}")
+        os.makedirs(ruta_proyecto, exist_ok=True)
+
+        for indice_entorno in range(entornos):
+            ruta_entorno = os.path.join(ruta_proyecto, f"venv_{indice_entorno}")
+            elegidos = aleatorio.sample(catalogo, min(paquetes, len(catalogo)))
+            archivos += _crear_entorno(ruta_entorno, version, elegidos, aleatorio)
+
+        for indice_carpeta in range(carpetas):
+            ruta_carpeta = os.path.join(ruta_proyecto, f"carpeta_{indice_carpeta}")
+            os.makedirs(ruta_carpeta, exist_ok=True)
+            for indice_archivo in range(3):
+                _escribir(os.path.join(ruta_carpeta, f"modulo_{indice_archivo}.py"), "x = 1\n" * 20)
+                archivos += 1
+
+    _envejecer(destino)
+    return {
+        'proyectos': proyectos,
+        'entornos': proyectos * entornos,
+        'carpetas': proyectos * carpetas,
+        'paquetes': proyectos * entornos * paquetes,
+        'archivos': archivos
+    }
+
+def _crear_entorno(ruta_entorno, version, paquetes, aleatorio):
+    """Entorno con la estructura de venv pero sin ejecutables; devuelve los archivos creados"""
+    if platform.system() == "Windows":
+        site_packages = os.path.join(ruta_entorno, "Lib", "site-packages")
+    else:
+        mayor, menor = version.split('.')[:2]
+        site_packages = os.path.join(ruta_entorno, "lib", f"python{mayor}.{menor}", "site-packages")
+    os.makedirs(site_packages, exist_ok=True)
+
+    _escribir(os.path.join(ruta_entorno, "pyvenv.cfg"), (
+        f"home = {os.path.dirname(sys.executable)}\n"
+        "include-system-site-packages = false\n"
+        f"version = {version}\n"
+    ))
+
+    archivos = 1
+    for posicion, nombre in enumerate(paquetes):
+        version_paquete = f"{aleatorio.randint(0, 5)}.{aleatorio.randint(0, 20)}.{aleatorio.randint(0, 9)}"
+        # Cada paquete depende de alguno de los anteriores, para tener un grafo realista
+        dependencias = aleatorio.sample(paquetes[:posicion], min(posicion, aleatorio.randint(0, 3)))
+        archivos += _crear_dist_info(site_packages, nombre, version_paquete, dependencias)
+    return archivos
+
+def _crear_dist_info(site_packages, nombre, version, dependencias):
+    """Paquete instalado: módulo y su dist-info con los archivos que genera pip"""
+    modulo = nombre.replace('-', '_')
+    ruta_modulo = os.path.join(site_packages, modulo)
+    os.makedirs(ruta_modulo, exist_ok=True)
+    contenido = f'"""{nombre}"""\n' + "VALOR = 1\n" * 40
+    _escribir(os.path.join(ruta_modulo, "__init__.py"), contenido)
+
+    dist_info = os.path.join(site_packages, f"{modulo}-{version}.dist-info")
+    os.makedirs(dist_info, exist_ok=True)
+
+    metadata = [
+        "Metadata-Version: 2.1",
+        f"Name: {nombre}",
+        f"Version: {version}",
+        "Summary: Paquete sintético para pruebas de rendimiento"
+    ]
+    metadata += [f"Requires-Dist: {dependencia}" for dependencia in dependencias]
+    _escribir(os.path.join(dist_info, "METADATA"), "\n".join(metadata) + "\n\n")
+    _escribir(os.path.join(dist_info, "INSTALLER"), "pip\n")
+    _escribir(os.path.join(dist_info, "WHEEL"), "Wheel-Version: 1.0\nRoot-Is-Purelib: true\n")
+
+    registro = [
+        f"{modulo}/__init__.py,sha256=,{len(contenido.encode())}",
+        f"{modulo}-{version}.dist-info/METADATA,,",
+        f"{modulo}-{version}.dist-info/INSTALLER,,",
+        f"{modulo}-{version}.dist-info/RECORD,,"
+    ]
+    _escribir(os.path.join(dist_info, "RECORD"), "\n".join(registro) + "\n")
+    return 5
+
+def _escribir(ruta, texto):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.write(texto)
+
+def _envejecer(destino):
+    """Lleva al pasado la fecha de modificación de todos los directorios"""
+    momento = time.time() - ANTIGUEDAD_SEGUNDOS
+    for directorio, _, _ in os.walk(destino):
+        os.utime(directorio, (momento, momento))
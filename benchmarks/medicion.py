@@ -0,0 +1,77 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+"""
+Medición de tiempos y comparación con una línea base guardada
+"""
+
+def medir(funcion, repeticiones=5, preparar=None):
+    """
+    Ejecuta funcion(contexto) varias veces y devuelve sus tiempos en milisegundos.
+    preparar() crea el contexto de cada repetición y no cuenta en el tiempo.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        contexto = preparar() if preparar else None
+        inicio = time.perf_counter()
+        funcion(contexto)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    return {
+        'repeticiones': repeticiones,
+        'min_ms': round(min(tiempos), 3),
+        'mediana_ms': round(statistics.median(tiempos), 3),
+        'media_ms': round(statistics.mean(tiempos), 3),
+        'max_ms': round(max(tiempos), 3)
+    }
+
+def describir_maquina():
+    """Datos de la máquina para saber si dos resultados son comparables"""
+    return {
+        'python': platform.python_version(),
+        'implementacion': platform.python_implementation(),
+        'sistema': platform.system(),
+        'cpus': os.cpu_count(),
+        'ejecutable': sys.executable
+    }
+
+def cargar_resultados(ruta):
+    """Resultados guardados con guardar_resultados"""
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+def guardar_resultados(ruta, resultados):
+    """Escribe los resultados como JSON legible"""
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+        archivo.write('\n')
+
+def comparar(resultados, linea_base, tolerancia=0.25, metrica='mediana_ms', mayor_es_mejor=False):
+    """
+    Compara cada medición con la de la línea base. Devuelve {nombre: comparación}
+    con el cociente actual/base; regresion es True si empeora más que la tolerancia
+    (sube de 1 + tolerancia, o baja de 1 - tolerancia si mayor_es_mejor).
+    """
+    comparacion = {}
+    anteriores = linea_base.get('resultados', {})
+    for nombre, actual in resultados.get('resultados', {}).items():
+        anterior = anteriores.get(nombre)
+        if not anterior or anterior.get(metrica) is None or actual.get(metrica) is None:
+            continue
+
+        cociente = actual[metrica] / anterior[metrica] if anterior[metrica] else float('inf')
+        if mayor_es_mejor:
+            regresion = cociente < 1 - tolerancia
+        else:
+            regresion = cociente > 1 + tolerancia
+        comparacion[nombre] = {
+            'base': anterior[metrica],
+            'actual': actual[metrica],
+            'cociente': round(cociente, 3),
+            'regresion': regresion
+        }
+    return comparacion
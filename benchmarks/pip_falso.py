@@ -0,0 +1,62 @@
+import argparse
+import sys
+import time
+
+"""
+Sustituto de pip para las pruebas de rendimiento: acepta cualquier orden
+(install, uninstall...) y escribe la salida que se le pida sin tocar la red
+"""
+
+COLORES_ANSI = ('\x1b[32m', '\x1b[33m', '\x1b[1;34m', '\x1b[36m')
+FIN_ANSI = '\x1b[0m'
+
+def crear_analizador():
+    """Argumentos del pip falso; los que no reconoce se ignoran, como los paquetes"""
+    analizador = argparse.ArgumentParser(prog="pip_falso")
+    analizador.add_argument("--lineas", type=int, default=1000, help="líneas que escribir")
+    analizador.add_argument("--longitud", type=int, default=80, help="caracteres por línea")
+    analizador.add_argument("--ritmo", type=float, default=0, help="líneas por segundo (0 = sin límite)")
+    analizador.add_argument("--ansi", action="store_true", help="colorear las líneas con códigos ANSI")
+    analizador.add_argument("--marcas", action="store_true", help="empezar cada línea con la hora de emisión")
+    analizador.add_argument("--sin-salto", type=int, default=0, metavar="BYTES",
+                            help="terminar con una línea de BYTES caracteres sin salto de línea")
+    analizador.add_argument("--codigo", type=int, default=0, help="código de salida")
+    return analizador
+
+def main(argv=None):
+    argumentos, _ = crear_analizador().parse_known_args(argv)
+    salida = sys.stdout
+    relleno = ("Collecting paquete-falso " * (argumentos.longitud // 25 + 1))[:argumentos.longitud]
+    inicio = time.perf_counter()
+
+    for indice in range(argumentos.lineas):
+        if argumentos.ritmo:
+            # Mantiene el ritmo pedido sin acumular retraso
+            espera = inicio + indice / argumentos.ritmo - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+
+        linea = relleno
+        if argumentos.ansi:
+            linea = f"{COLORES_ANSI[indice % len(COLORES_ANSI)]}{linea}{FIN_ANSI}"
+        if argumentos.marcas:
+            linea = f"{time.time():.6f} {linea}"
+        salida.write(linea + "\n")
+
+        # Con ritmo cada línea sale al momento, como la barra de progreso de pip
+        if argumentos.ritmo:
+            salida.flush()
+
+    if argumentos.sin_salto:
+        bloque = "#" * 4096
+        restantes = argumentos.sin_salto
+        while restantes > 0:
+            salida.write(bloque[:restantes])
+            restantes -= len(bloque)
+        salida.flush()
+
+    salida.flush()
+    return argumentos.codigo
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import statistics
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.medicion import describir_maquina, cargar_resultados, guardar_resultados, comparar
+from src_gestor.consola import ColaConsola, HistorialConsola, agrupar_por_etiqueta
+from src_gestor.historial import HistorialComandos
+from src_gestor.trabajos import PlanificadorTrabajos, Trabajo
+from src_gestor.utilidades import EjecutorComandos
+
+"""
+Rendimiento de EjecutorComandos de punta a punta con un pip falso: líneas por
+segundo hasta la consola, latencia, hilos y memoria. python -m benchmarks.rendimiento_comandos
+"""
+
+RUTA_PIP_FALSO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pip_falso.py')
+
+# Cada escenario: trabajos simultáneos, parámetros del pip falso y estado final esperado
+ESCENARIOS = {
+    'volumen': {'trabajos': 1, 'pip': {'lineas': 200000}},
+    'lineas_largas': {'trabajos': 1, 'pip': {'lineas': 2000, 'longitud': 20000}},
+    'ansi': {'trabajos': 1, 'pip': {'lineas': 100000, 'ansi': True}},
+    'sin_salto': {'trabajos': 1, 'pip': {'lineas': 10, 'sin_salto': 8 * 1024 * 1024}},
+    'concurrentes': {'trabajos': 16, 'pip': {'lineas': 20000}},
+    'latencia': {'trabajos': 4, 'pip': {'lineas': 4000, 'ritmo': 2000, 'marcas': True}},
+    'codigo_salida': {'trabajos': 2, 'pip': {'lineas': 100, 'codigo': 3}, 'estado': Trabajo.ERROR}
+}
+
+# Igual que la consola de la interfaz: espera entre vaciados cuando no hay salida
+INTERVALO_CONSOLA_MS = 50
+
+# Frecuencia con la que se miran hilos y memoria
+INTERVALO_MUESTREO = 0.02
+
+class BancoComandos:
+    """Lanza trabajos del pip falso y hace de consola: recibe, agrupa y guarda su salida"""
+
+    def __init__(self, max_trabajadores=None, historial=None):
+        self.planificador = PlanificadorTrabajos(max_trabajadores)
+        self.cola = ColaConsola()
+        self.ejecutor = EjecutorComandos(self._recibir, planificador=self.planificador, historial=historial)
+
+    def _recibir(self, mensaje, etiqueta=None):
+        """callback_salida: la salida del comando llega sin etiqueta, los avisos propios con ella"""
+        if etiqueta is None:
+            if self._primera_recepcion is None:
+                self._primera_recepcion = time.perf_counter()
+            self._ultima_recepcion = time.perf_counter()
+        self.cola.poner(mensaje, etiqueta or 'normal')
+
+    def ejecutar(self, nombre, trabajos, pip, estado='completado'):
+        """Ejecuta un escenario y devuelve sus medidas"""
+        self._primera_recepcion = None
+        self._ultima_recepcion = None
+        self._lineas = 0
+        self._bytes = 0
+        self._latencias = []
+        self._terminar = threading.Event()
+        self._muestras = []
+        historial = HistorialConsola()
+
+        consola = threading.Thread(target=self._mostrar, args=(historial, pip.get('marcas')), daemon=True)
+        muestreo = threading.Thread(target=self._muestrear, daemon=True)
+        muestreo.start()
+        consola.start()
+
+        comando = [sys.executable, RUTA_PIP_FALSO, "install", "paquete-falso"] + _argumentos_pip(pip)
+        inicio = time.perf_counter()
+        lanzados = [self.ejecutor.ejecutar(comando, clave=f"{nombre}-{indice}") for indice in range(trabajos)]
+        for trabajo in lanzados:
+            trabajo.esperar()
+
+        self._terminar.set()
+        consola.join()
+        segundos = time.perf_counter() - inicio
+        muestreo.join()
+        historial.limpiar()
+
+        esperadas = trabajos * (pip.get('lineas', 0) + (1 if pip.get('sin_salto') else 0))
+        hilos = [hilos for hilos, _ in self._muestras]
+        memoria = [rss for _, rss in self._muestras if rss is not None]
+
+        resultado = {
+            'trabajos': trabajos,
+            'lineas': self._lineas,
+            'segundos': round(segundos, 3),
+            'lineas_por_segundo': round(self._lineas / segundos, 1),
+            'mb_por_segundo': round(self._bytes / segundos / 1024 / 1024, 2),
+            'hilos_max': max(hilos) if hilos else None,
+            'rss_max_mb': round(max(memoria) / 1024 / 1024, 1) if memoria else None,
+            'correcto': self._lineas == esperadas and all(trabajo.estado == estado for trabajo in lanzados)
+        }
+        if self._primera_recepcion is not None and self._ultima_recepcion > self._primera_recepcion:
+            resultado['lineas_por_segundo_callback'] = round(
+                self._lineas / (self._ultima_recepcion - self._primera_recepcion), 1
+            )
+        if self._latencias:
+            self._latencias.sort()
+            resultado['latencia_p50_ms'] = round(statistics.median(self._latencias) * 1000, 2)
+            resultado['latencia_p95_ms'] = round(self._latencias[int(len(self._latencias) * 0.95)] * 1000, 2)
+            resultado['latencia_max_ms'] = round(self._latencias[-1] * 1000, 2)
+        return resultado
+
+    def _mostrar(self, historial, con_marcas):
+        """Hace lo que _bombear_consola sin Tk: vacía por lotes, agrupa por etiqueta y guarda"""
+        while True:
+            lote = self.cola.extraer_lote()
+            if lote:
+                ahora = time.time()
+                for mensaje, etiqueta in lote:
+                    if etiqueta != 'normal':
+                        continue
+                    self._lineas += 1
+                    self._bytes += len(mensaje)
+                    if con_marcas:
+                        try:
+                            self._latencias.append(ahora - float(mensaje.split(' ', 1)[0]))
+                        except ValueError:
+                            pass
+                for texto, _ in agrupar_por_etiqueta(lote):
+                    historial.agregar(texto)
+            elif self._terminar.is_set():
+                return
+
+            time.sleep(0.001 if self.cola.hay_pendientes() else INTERVALO_CONSOLA_MS / 1000)
+
+    def _muestrear(self):
+        """Anota hilos vivos y memoria residente mientras dura el escenario"""
+        while True:
+            self._muestras.append((threading.active_count(), _memoria_residente()))
+            if self._terminar.wait(INTERVALO_MUESTREO):
+                return
+
+def _argumentos_pip(pip):
+    """Convierte los parámetros de un escenario en argumentos del pip falso"""
+    argumentos = []
+    for clave, valor in pip.items():
+        opcion = "--" + clave.replace('_', '-')
+        if valor is True:
+            argumentos.append(opcion)
+        elif valor not in (None, False):
+            argumentos.extend([opcion, str(valor)])
+    return argumentos
+
+def _memoria_residente():
+    """Memoria residente actual en bytes (pico del proceso si no se puede leer la actual)"""
+    try:
+        with open('/proc/self/statm') as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux da kilobytes y macOS bytes
+    return maximo if sys.platform == 'darwin' else maximo * 1024
+
+def crear_analizador():
+    """Argumentos de la línea de comandos"""
+    analizador = argparse.ArgumentParser(
+        prog="python -m benchmarks.rendimiento_comandos",
+        description="Mide la salida de EjecutorComandos hasta la consola con un pip falso"
+    )
+    analizador.add_argument("escenarios", nargs="*", metavar="ESCENARIO",
+                            help=f"escenarios a ejecutar (por defecto, todos): {', '.join(ESCENARIOS)}")
+    analizador.add_argument("--escala", type=float, default=1.0, help="multiplica las líneas de cada escenario")
+    analizador.add_argument("--trabajadores", type=int, help="hilos del planificador (por defecto, los de la aplicación)")
+    analizador.add_argument("--historial", action="store_true",
+                            help="registrar los comandos en un historial SQLite temporal, como la aplicación")
+    analizador.add_argument("--salida", help="guardar los resultados en este JSON")
+    analizador.add_argument("--linea-base", help="JSON de resultados anterior con el que comparar")
+    analizador.add_argument("--tolerancia", type=float, default=0.25, help="pérdida de rendimiento admitida (0.25 = 25%%)")
+    return analizador
+
+def main(argv=None):
+    analizador = crear_analizador()
+    argumentos = analizador.parse_args(argv)
+    desconocidos = [nombre for nombre in argumentos.escenarios if nombre not in ESCENARIOS]
+    if desconocidos:
+        analizador.error(f"escenarios desconocidos: {', '.join(desconocidos)}")
+
+    temporal = historial = None
+    if argumentos.historial:
+        temporal = tempfile.mkdtemp(prefix="gestor_historial_")
+        historial = HistorialComandos(temporal)
+
+    banco = BancoComandos(argumentos.trabajadores, historial)
+    hilos_inicio = threading.active_count()
+
+    resultados = {}
+    try:
+        for nombre in argumentos.escenarios or list(ESCENARIOS):
+            escenario = ESCENARIOS[nombre]
+            pip = dict(escenario['pip'])
+            pip['lineas'] = max(1, int(pip['lineas'] * argumentos.escala))
+
+            print(f"Escenario {nombre}...", file=sys.stderr)
+            resultados[nombre] = banco.ejecutar(nombre, escenario['trabajos'], pip,
+                                                escenario.get('estado', Trabajo.COMPLETADO))
+    finally:
+        if historial is not None:
+            historial.cerrar()
+            shutil.rmtree(temporal, ignore_errors=True)
+
+    informe = {
+        'maquina': describir_maquina(),
+        'trabajadores': banco.planificador.max_trabajadores,
+        'historial': argumentos.historial,
+        'hilos_inicio': hilos_inicio,
+        'hilos_fin': threading.active_count(),
+        'resultados': resultados
+    }
+
+    fallos = [nombre for nombre, resultado in resultados.items() if not resultado['correcto']]
+    if argumentos.linea_base:
+        informe['comparacion'] = comparar(informe, cargar_resultados(argumentos.linea_base), argumentos.tolerancia,
+                                          metrica='lineas_por_segundo', mayor_es_mejor=True)
+        fallos += [nombre for nombre, datos in informe['comparacion'].items() if datos['regresion']]
+
+    if argumentos.salida:
+        guardar_resultados(argumentos.salida, informe)
+    print(json.dumps(informe, ensure_ascii=False, indent=2))
+
+    if fallos:
+        print(f"Fallos o regresiones: {', '.join(sorted(set(fallos)))}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
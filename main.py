@@ -1,3 +1,8 @@
+import time
+
+# Referencia para medir cuánto tarda el arranque, importaciones incluidas
+INICIO = time.perf_counter()
+
 from src_gestor.interfaz import GestorInterfaz
 
 """
@@ -6,8 +11,8 @@ Gestor de Entornos Virtuales - Compatible con Windows y Linux
 
 def main():
     # Inicia la aplicación del gestor
-    app = GestorInterfaz()
+    app = GestorInterfaz(inicio=INICIO)
     app.ejecutar()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,14 +1,27 @@
+import importlib
+
 __version__ = "1.2.0"
 
-from .interfaz import GestorInterfaz
-from .proyectos import GestorProyectos
-from .entornos import GestorEntornos
-from .utilidades import SistemaOperativo, EjecutorComandos
-
-__all__ = [
-    'GestorInterfaz',
-    'GestorProyectos',
-    'GestorEntornos',
-    'SistemaOperativo',
-    'EjecutorComandos'
-]
\ No newline at end of file
+# Cada nombre se importa la primera vez que se usa: así la línea de comandos
+# y los scripts no cargan tkinter si no necesitan la interfaz
+_MODULOS = {
+    'GestorInterfaz': 'interfaz',
+    'GestorProyectos': 'proyectos',
+    'GestorEntornos': 'entornos',
+    'SistemaOperativo': 'utilidades',
+    'EjecutorComandos': 'utilidades'
+}
+
+__all__ = list(_MODULOS)
+
+def __getattr__(nombre):
+    modulo = _MODULOS.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+    valor = getattr(importlib.import_module(f".{modulo}", __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,10 @@
+import sys
+
+from src_gestor.linea_comandos import main
+
+"""
+Permite ejecutar la línea de comandos con python -m src_gestor
+"""
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+import hashlib
+import os
+import stat
+import uuid
+
+"""
+Almacén de archivos direccionado por contenido y compartido entre entornos
+mediante enlaces duros
+"""
+
+class AlmacenPaquetes:
+    """
+    Cada archivo instalado se guarda una sola vez en objetos/<sha256> y los
+    entornos lo enlazan. Un objeto con un único enlace ya no lo usa nadie.
+    """
+
+    NOMBRE_CARPETA = '.almacen_paquetes'
+
+    # Los archivos pequeños no compensan el hash ni la entrada en el almacén
+    TAMANO_MINIMO = 1024
+
+    TAMANO_BLOQUE = 1024 * 1024
+
+    def __init__(self, directorio_base):
+        self.directorio = os.path.join(os.fspath(directorio_base), self.NOMBRE_CARPETA)
+        self.directorio_objetos = os.path.join(self.directorio, 'objetos')
+
+    def deduplicar(self, directorios):
+        """
+        Sustituye los archivos de los directorios por enlaces a objetos del almacén.
+        Devuelve un resumen con los archivos enlazados y los bytes liberados.
+        """
+        os.makedirs(self.directorio_objetos, exist_ok=True)
+        resumen = {'archivos': 0, 'enlazados': 0, 'nuevos': 0, 'bytes_liberados': 0}
+
+        for directorio in directorios:
+            pendientes = [os.fspath(directorio)]
+            while pendientes:
+                actual = pendientes.pop()
+                try:
+                    entradas = list(os.scandir(actual))
+                except OSError:
+                    continue
+
+                for entrada in entradas:
+                    if entrada.is_symlink():
+                        continue
+                    if entrada.is_dir():
+                        # Los metadatos de pip se reescriben y no merece la pena compartirlos
+                        if not entrada.name.endswith(('.dist-info', '.egg-info')):
+                            pendientes.append(entrada.path)
+                        continue
+
+                    resultado = self._deduplicar_archivo(entrada)
+                    if resultado is None:
+                        continue
+                    if resultado is False:
+                        # Otro sistema de archivos: los enlaces duros no son posibles
+                        return resumen
+
+                    resumen['archivos'] += 1
+                    enlazado, liberados = resultado
+                    if enlazado:
+                        resumen['enlazados'] += 1
+                        resumen['bytes_liberados'] += liberados
+                    else:
+                        resumen['nuevos'] += 1
+
+        return resumen
+
+    def _deduplicar_archivo(self, entrada):
+        """
+        Enlaza un archivo con su objeto. Devuelve None si se omite, False si el
+        almacén está en otro sistema de archivos o (enlazado, bytes_liberados).
+        """
+        try:
+            # En Windows la caché de scandir no trae el número de enlaces
+            info = os.stat(entrada.path, follow_symlinks=False)
+        except OSError:
+            return None
+
+        # Con más de un enlace ya está compartido (con el almacén o con un clon)
+        if not stat.S_ISREG(info.st_mode) or info.st_nlink > 1 or info.st_size < self.TAMANO_MINIMO:
+            return None
+
+        try:
+            huella = self._calcular_huella(entrada.path)
+        except OSError:
+            return None
+
+        objeto = self.ruta_objeto(huella)
+        os.makedirs(os.path.dirname(objeto), exist_ok=True)
+
+        try:
+            # El primer archivo con este contenido pasa a ser el objeto, sin copiar nada
+            os.link(entrada.path, objeto)
+            return False, 0
+        except FileExistsError:
+            pass
+        except OSError:
+            return False
+
+        try:
+            info_objeto = os.stat(objeto)
+        except OSError:
+            return None
+
+        # Un enlace comparte también los permisos: solo se enlazan archivos equivalentes
+        if stat.S_IMODE(info_objeto.st_mode) != stat.S_IMODE(info.st_mode) or info_objeto.st_size != info.st_size:
+            return None
+
+        temporal = f"{entrada.path}.{uuid.uuid4().hex[:8]}.tmp-almacen"
+        try:
+            os.link(objeto, temporal)
+            os.replace(temporal, entrada.path)
+        except OSError:
+            try:
+                os.unlink(temporal)
+            except OSError:
+                pass
+            return None
+
+        return True, info.st_size
+
+    def _calcular_huella(self, ruta):
+        """SHA-256 del contenido de un archivo"""
+        huella = hashlib.sha256()
+        with open(ruta, 'rb') as archivo:
+            for bloque in iter(lambda: archivo.read(self.TAMANO_BLOQUE), b''):
+                huella.update(bloque)
+        return huella.hexdigest()
+
+    def ruta_objeto(self, huella):
+        """Ruta del objeto con un hash dado"""
+        return os.path.join(self.directorio_objetos, huella[:2], huella[2:])
+
+    def _objetos(self):
+        """Recorre los objetos del almacén devolviendo (ruta, stat)"""
+        if not os.path.isdir(self.directorio_objetos):
+            return
+
+        with os.scandir(self.directorio_objetos) as prefijos:
+            for prefijo in prefijos:
+                if not prefijo.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(prefijo.path) as objetos:
+                    for objeto in objetos:
+                        try:
+                            yield objeto.path, os.stat(objeto.path, follow_symlinks=False)
+                        except OSError:
+                            continue
+
+    def recolectar(self):
+        """Borra los objetos que ya no enlaza ningún entorno; devuelve (objetos, bytes)"""
+        borrados = 0
+        bytes_borrados = 0
+        for ruta, info in self._objetos():
+            if info.st_nlink > 1:
+                continue
+            try:
+                os.unlink(ruta)
+            except OSError:
+                continue
+            borrados += 1
+            bytes_borrados += info.st_size
+
+        return borrados, bytes_borrados
+
+    def informe(self):
+        """Tamaño del almacén y espacio que se ahorra frente a tener copias independientes"""
+        resumen = {'objetos': 0, 'sin_uso': 0, 'bytes_almacen': 0, 'referencias': 0, 'bytes_ahorrados': 0}
+        for _, info in self._objetos():
+            # Un enlace es el del propio almacén; el resto son entornos
+            usos = info.st_nlink - 1
+            resumen['objetos'] += 1
+            resumen['bytes_almacen'] += info.st_size
+            resumen['referencias'] += usos
+            if usos == 0:
+                resumen['sin_uso'] += 1
+            elif usos > 1:
+                resumen['bytes_ahorrados'] += info.st_size * (usos - 1)
+
+        return resumen
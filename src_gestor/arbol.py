@@ -0,0 +1,82 @@
+from src_gestor.trazas import trazar
+
+"""
+Reconciliación incremental del árbol de proyectos
+"""
+
+class ReconciliadorArbol:
+    """Aplica sobre un Treeview solo los cambios entre dos estados, usando la ruta como clave"""
+
+    def __init__(self, arbol):
+        self.arbol = arbol
+        # Copia de lo aplicado al árbol, para no tener que consultar a Tk
+        self._hijos = {'': []}
+        self._aplicado = {}
+
+    @trazar("Reconciliar árbol", 'tk')
+    def reconciliar(self, hijos_deseados, padres=None):
+        """
+        Ajusta el árbol al estado deseado.
+        hijos_deseados: {iid_padre: [(iid, texto, valores, abierto), ...]} con '' como raíz
+        padres: si se indica, solo se revisan esos nodos y sus descendientes
+        """
+        posicion = self.arbol.yview()[0] if hasattr(self.arbol, 'yview') else None
+
+        # Recorre por niveles para que cada padre exista antes que sus hijos
+        pendientes = [''] if padres is None else list(padres)
+        while pendientes:
+            padre = pendientes.pop(0)
+            if padre and padre not in self._aplicado:
+                continue
+
+            hijos = hijos_deseados.get(padre, [])
+            self._reconciliar_hijos(padre, hijos)
+            pendientes.extend(
+                iid for iid, _, _, _ in hijos
+                if iid in hijos_deseados or self._hijos.get(iid)
+            )
+
+        if posicion is not None:
+            self.arbol.yview_moveto(posicion)
+
+    def existe(self, iid):
+        """Indica si el nodo está en el árbol"""
+        return iid in self._aplicado
+
+    def _olvidar(self, iid):
+        """Descarta la copia de un nodo y de sus descendientes"""
+        for hijo in self._hijos.pop(iid, []):
+            self._olvidar(hijo)
+        self._aplicado.pop(iid, None)
+
+    def _reconciliar_hijos(self, padre, hijos):
+        """Inserta, borra, mueve o actualiza los hijos de un nodo"""
+        orden_deseado = [iid for iid, _, _, _ in hijos]
+        conjunto_deseado = set(orden_deseado)
+
+        # Una ruta siempre cuelga del mismo padre, así que lo que sobra se borra
+        actuales = []
+        for iid in self._hijos.get(padre, []):
+            if iid in conjunto_deseado:
+                actuales.append(iid)
+            else:
+                self.arbol.delete(iid)
+                self._olvidar(iid)
+
+        for indice, (iid, texto, valores, abierto) in enumerate(hijos):
+            if iid not in self._aplicado:
+                self.arbol.insert(padre, indice, iid=iid, text=texto, values=valores, open=abierto)
+                self._aplicado[iid] = (texto, valores)
+                actuales.insert(indice, iid)
+                continue
+
+            if self._aplicado[iid] != (texto, valores):
+                self.arbol.item(iid, text=texto, values=valores)
+                self._aplicado[iid] = (texto, valores)
+
+        # Solo mueve si el orden cambió
+        if actuales != orden_deseado:
+            for indice, iid in enumerate(orden_deseado):
+                self.arbol.move(iid, padre, indice)
+
+        self._hijos[padre] = orden_deseado
@@ -0,0 +1,113 @@
+import json
+import os
+import time
+from pathlib import Path
+
+from src_gestor.utilidades import escribir_atomico
+
+"""
+Arranque rápido de la interfaz: instantánea del último escaneo para pintar el
+árbol al instante y cronómetro de las fases del arranque
+"""
+
+NOMBRE_INSTANTANEA = '.gestor_instantanea.json'
+VERSION_INSTANTANEA = 1
+
+class CronometroArranque:
+    """Tiempos desde el inicio del proceso hasta cada hito del arranque, en milisegundos"""
+
+    # Hitos en el orden en que ocurren
+    HITOS = ('importacion', 'widgets', 'primer_pintado', 'datos_completos')
+
+    TEXTOS = {
+        'importacion': "importación",
+        'widgets': "widgets",
+        'primer_pintado': "primer pintado",
+        'datos_completos': "datos completos"
+    }
+
+    # Máximo aceptable de cada hito; por encima se avisa en la consola
+    PRESUPUESTO_MS = {
+        'primer_pintado': 1000,
+        'datos_completos': 5000
+    }
+
+    def __init__(self, inicio=None):
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self.marcas = {}
+
+    def marcar(self, hito):
+        """Anota un hito la primera vez que se alcanza"""
+        if hito not in self.marcas:
+            self.marcas[hito] = (time.perf_counter() - self.inicio) * 1000
+
+    def completo(self):
+        """Indica si ya se alcanzaron todos los hitos"""
+        return all(hito in self.marcas for hito in self.HITOS)
+
+    def excedidos(self):
+        """Hitos que superaron su presupuesto: [(hito, ms, límite)]"""
+        return [
+            (hito, self.marcas[hito], limite)
+            for hito, limite in self.PRESUPUESTO_MS.items()
+            if self.marcas.get(hito, 0) > limite
+        ]
+
+    def resumen(self):
+        """Línea legible con los hitos alcanzados"""
+        return ", ".join(
+            f"{self.TEXTOS[hito]} {self.marcas[hito]:.0f} ms" for hito in self.HITOS if hito in self.marcas
+        )
+
+    def registrar(self, ruta):
+        """Añade los tiempos como una línea JSON a un archivo, para seguir su evolución"""
+        registro = {'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'), 'marcas_ms': {
+            hito: round(milisegundos, 1) for hito, milisegundos in self.marcas.items()
+        }}
+        with open(ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps(registro) + '\n')
+
+def ruta_instantanea(directorio_base):
+    """Archivo de la instantánea dentro del directorio base"""
+    return os.path.join(os.fspath(directorio_base), NOMBRE_INSTANTANEA)
+
+def guardar_instantanea(directorio_base, proyectos, tamanos, sellos):
+    """
+    Guarda el último estado conocido del árbol. proyectos es una lista de
+    {nombre, entornos, carpetas} con los nombres de sus hijos.
+    """
+    datos = {
+        'version': VERSION_INSTANTANEA,
+        'base': os.fspath(directorio_base),
+        'proyectos': proyectos,
+        'tamanos': tamanos,
+        'sellos': sellos
+    }
+    escribir_atomico(ruta_instantanea(directorio_base), json.dumps(datos, ensure_ascii=False))
+
+def leer_instantanea(directorio_base):
+    """
+    Devuelve (proyectos, tamaños, sellos) de la última sesión, con los proyectos en el
+    formato de GestorProyectos.obtener_proyectos, o None si no hay instantánea válida
+    """
+    try:
+        with open(ruta_instantanea(directorio_base), encoding='utf-8') as archivo:
+            datos = json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+    if datos.get('version') != VERSION_INSTANTANEA or datos.get('base') != os.fspath(directorio_base):
+        return None
+
+    base = Path(directorio_base)
+    proyectos = []
+    for guardado in datos.get('proyectos', []):
+        ruta = base / guardado['nombre']
+        proyectos.append({
+            'nombre': guardado['nombre'],
+            'ruta': ruta,
+            'entornos': [{'nombre': nombre, 'ruta': ruta / nombre} for nombre in guardado.get('entornos', [])],
+            'carpetas': [{'nombre': nombre, 'ruta': ruta / nombre} for nombre in guardado.get('carpetas', [])]
+        })
+
+    return proyectos, datos.get('tamanos', {}), datos.get('sellos', {})
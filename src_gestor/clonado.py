@@ -0,0 +1,153 @@
+import ctypes
+import ctypes.util
+import os
+import platform
+import shutil
+
+"""
+Copia rápida de entornos virtuales: reflinks, enlaces duros o copia normal,
+y reescritura de las rutas que el entorno guarda de sí mismo
+"""
+
+# ioctl FICLONE de Linux (copia por referencia en btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+# Los clones se copian a una carpeta oculta con este sufijo y se mueven al terminar
+SUFIJO_CLONANDO = '.clonando'
+
+# Archivos de texto de un venv que contienen su propia ruta
+ARCHIVOS_ACTIVACION = (
+    'activate', 'activate.csh', 'activate.fish', 'Activate.ps1',
+    'activate.bat', 'deactivate.bat', 'activate.nu', 'activate_this.py'
+)
+
+class CopiadorArchivos:
+    """Copia archivos con el método más barato que admita el sistema de archivos"""
+
+    def __init__(self, permitir_enlaces_duros=True):
+        self.permitir_enlaces_duros = permitir_enlaces_duros
+        self.sistema = platform.system()
+        self._reflink_disponible = self.sistema in ("Linux", "Darwin")
+        self._clonefile = None
+        if self.sistema == "Darwin":
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+                self._clonefile = libc.clonefile
+            except (OSError, AttributeError):
+                self._reflink_disponible = False
+
+        # Cuántos archivos se copiaron con cada método
+        self.estadisticas = {'reflink': 0, 'enlace': 0, 'copia': 0}
+
+    def copiar(self, origen, destino):
+        """Copia un archivo regular probando reflink, enlace duro y copia, en ese orden"""
+        if self._reflink_disponible:
+            if self._reflink(origen, destino):
+                self.estadisticas['reflink'] += 1
+                return
+            # Si el primer intento falla el sistema de archivos no lo admite
+            self._reflink_disponible = False
+
+        if self.permitir_enlaces_duros:
+            try:
+                os.link(origen, destino)
+                self.estadisticas['enlace'] += 1
+                return
+            except OSError:
+                self.permitir_enlaces_duros = False
+
+        shutil.copy2(origen, destino)
+        self.estadisticas['copia'] += 1
+
+    def _reflink(self, origen, destino):
+        """Intenta una copia por referencia (copy-on-write)"""
+        if self._clonefile is not None:
+            return self._clonefile(os.fsencode(origen), os.fsencode(destino), 0) == 0
+
+        import fcntl
+        try:
+            with open(origen, 'rb') as archivo_origen, open(destino, 'wb') as archivo_destino:
+                fcntl.ioctl(archivo_destino.fileno(), FICLONE, archivo_origen.fileno())
+            shutil.copystat(origen, destino)
+            return True
+        except OSError:
+            try:
+                os.unlink(destino)
+            except OSError:
+                pass
+            return False
+
+def copiar_arbol(origen, destino, copiador):
+    """Replica un directorio completo conservando enlaces simbólicos"""
+    origen = os.fspath(origen)
+    destino = os.fspath(destino)
+    os.makedirs(destino)
+    shutil.copystat(origen, destino)
+
+    pendientes = [(origen, destino)]
+    while pendientes:
+        dir_origen, dir_destino = pendientes.pop()
+        with os.scandir(dir_origen) as entradas:
+            for entrada in entradas:
+                ruta_destino = os.path.join(dir_destino, entrada.name)
+                if entrada.is_symlink():
+                    os.symlink(os.readlink(entrada.path), ruta_destino)
+                elif entrada.is_dir():
+                    os.mkdir(ruta_destino)
+                    shutil.copystat(entrada.path, ruta_destino)
+                    pendientes.append((entrada.path, ruta_destino))
+                else:
+                    copiador.copiar(entrada.path, ruta_destino)
+
+def reubicar_entorno(ruta_entorno, ruta_anterior, ruta_nueva=None):
+    """
+    Sustituye la ruta anterior por la nueva en pyvenv.cfg, los scripts de
+    activación y los shebangs de los scripts de consola. Devuelve los archivos tocados.
+    Por defecto la ruta nueva es donde está el entorno ahora.
+    """
+    ruta_entorno = os.fspath(ruta_entorno)
+    anterior = os.fspath(ruta_anterior).encode()
+    nueva = os.fspath(ruta_nueva or ruta_entorno).encode()
+    modificados = []
+
+    candidatos = [os.path.join(ruta_entorno, 'pyvenv.cfg')]
+    for carpeta in ('bin', 'Scripts'):
+        ruta_carpeta = os.path.join(ruta_entorno, carpeta)
+        if os.path.isdir(ruta_carpeta):
+            with os.scandir(ruta_carpeta) as entradas:
+                candidatos.extend(
+                    entrada.path for entrada in entradas
+                    if entrada.is_file(follow_symlinks=False)
+                )
+
+    for ruta in candidatos:
+        if not os.path.exists(ruta):
+            continue
+
+        nombre = os.path.basename(ruta)
+        with open(ruta, 'rb') as archivo:
+            contenido = archivo.read()
+
+        if nombre == 'pyvenv.cfg' or nombre in ARCHIVOS_ACTIVACION:
+            nuevo = contenido.replace(anterior, nueva)
+        elif contenido.startswith(b'#!'):
+            # Solo se toca la línea del shebang de los scripts de consola
+            fin_linea = contenido.find(b'\n')
+            fin_linea = len(contenido) if fin_linea == -1 else fin_linea
+            nuevo = contenido[:fin_linea].replace(anterior, nueva) + contenido[fin_linea:]
+        else:
+            continue
+
+        if nuevo != contenido:
+            _reescribir(ruta, nuevo)
+            modificados.append(ruta)
+
+    return modificados
+
+def _reescribir(ruta, contenido):
+    """Escribe un archivo nuevo en lugar de modificarlo, para no alterar el original enlazado"""
+    temporal = ruta + '.tmp-clonado'
+    with open(temporal, 'wb') as archivo:
+        archivo.write(contenido)
+    shutil.copymode(ruta, temporal)
+    os.replace(temporal, ruta)
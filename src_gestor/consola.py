@@ -0,0 +1,139 @@
+import collections
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+
+"""
+Canal de salida entre los hilos de trabajo y la consola de la interfaz
+"""
+
+def clasificar_mensaje(mensaje, etiqueta='normal'):
+    """Determina la etiqueta de color según el contenido del mensaje"""
+    if mensaje.startswith("✓"):
+        return "exito"
+    elif mensaje.startswith("✗"):
+        return "error"
+    elif mensaje.startswith("⚠"):
+        return "advertencia"
+    elif mensaje.startswith("$"):
+        return "comando"
+    elif mensaje.startswith(("📁", "📂", "🐍")):
+        return "info"
+    return etiqueta
+
+class ColaConsola:
+    """Cola segura entre hilos que entrega la salida en lotes"""
+
+    def __init__(self, max_lineas_lote=500, presupuesto_ms=8):
+        self._cola = queue.SimpleQueue()
+        self.max_lineas_lote = max_lineas_lote
+        self.presupuesto_ms = presupuesto_ms
+
+        # Estadísticas de rendimiento
+        self.lineas_entregadas = 0
+        self._inicio_medicion = None
+        self._ultima_entrega = None
+
+    def poner(self, mensaje, etiqueta='normal'):
+        """Encola una línea; se puede llamar desde cualquier hilo"""
+        self._cola.put((mensaje, clasificar_mensaje(mensaje, etiqueta)))
+
+    def hay_pendientes(self):
+        """Indica si quedan líneas por entregar"""
+        return not self._cola.empty()
+
+    def extraer_lote(self):
+        """Extrae líneas pendientes respetando el límite de líneas y de tiempo"""
+        lote = []
+        limite = time.perf_counter() + self.presupuesto_ms / 1000
+
+        while len(lote) < self.max_lineas_lote:
+            try:
+                lote.append(self._cola.get_nowait())
+            except queue.Empty:
+                break
+
+            # Comprueba el reloj cada 64 líneas para no pagar su coste en cada una
+            if len(lote) % 64 == 0 and time.perf_counter() >= limite:
+                break
+
+        if lote:
+            ahora = time.perf_counter()
+            if self._inicio_medicion is None:
+                self._inicio_medicion = ahora
+            self._ultima_entrega = ahora
+            self.lineas_entregadas += len(lote)
+
+        return lote
+
+    def lineas_por_segundo(self):
+        """Devuelve el rendimiento medio desde la primera entrega"""
+        if self._inicio_medicion is None or self._ultima_entrega == self._inicio_medicion:
+            return 0.0
+        return self.lineas_entregadas / (self._ultima_entrega - self._inicio_medicion)
+
+def agrupar_por_etiqueta(lote):
+    """Une líneas consecutivas con la misma etiqueta para un único insert"""
+    segmentos = []
+    textos = []
+    etiqueta_actual = None
+
+    for mensaje, etiqueta in lote:
+        if etiqueta != etiqueta_actual and textos:
+            segmentos.append(("".join(textos), etiqueta_actual))
+            textos = []
+        etiqueta_actual = etiqueta
+        textos.append(f"{mensaje}\n")
+
+    if textos:
+        segmentos.append(("".join(textos), etiqueta_actual))
+
+    return segmentos
+
+class HistorialConsola:
+    """Historial completo de la consola: memoria acotada con desbordamiento a disco"""
+
+    def __init__(self, max_bytes_memoria=4 * 1024 * 1024):
+        self.max_bytes_memoria = max_bytes_memoria
+        self._bloques = collections.deque()
+        self._bytes_memoria = 0
+        self._desborde = None
+        self._candado = threading.Lock()
+
+    def agregar(self, texto):
+        """Añade un bloque de texto al historial"""
+        with self._candado:
+            self._bloques.append(texto)
+            self._bytes_memoria += len(texto)
+
+            # Los bloques más antiguos pasan al archivo de desborde
+            while self._bytes_memoria > self.max_bytes_memoria and len(self._bloques) > 1:
+                antiguo = self._bloques.popleft()
+                self._bytes_memoria -= len(antiguo)
+                if self._desborde is None:
+                    self._desborde = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+                self._desborde.write(antiguo)
+
+    def exportar(self, ruta_archivo):
+        """Escribe el historial completo en un archivo"""
+        with self._candado:
+            with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
+                if self._desborde is not None:
+                    self._desborde.flush()
+                    self._desborde.seek(0)
+                    shutil.copyfileobj(self._desborde, archivo)
+                    self._desborde.seek(0, os.SEEK_END)
+                for bloque in self._bloques:
+                    archivo.write(bloque)
+
+    def limpiar(self):
+        """Descarta todo el historial"""
+        with self._candado:
+            self._bloques.clear()
+            self._bytes_memoria = 0
+            if self._desborde is not None:
+                self._desborde.close()
+                self._desborde = None
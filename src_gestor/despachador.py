@@ -0,0 +1,126 @@
+import collections
+import threading
+import time
+
+"""
+Envío de funciones desde los hilos de fondo al hilo que maneja la interfaz
+"""
+
+class Despachador:
+    """
+    Cola de funciones pendientes que se ejecutan al llamar a procesar().
+    Sirve tal cual para usos sin interfaz gráfica: el bucle propio llama a procesar().
+    """
+
+    def __init__(self):
+        self._cola = collections.deque()
+        self._claves = set()
+        self._candado = threading.Lock()
+        self.al_error = None
+
+    def despachar(self, funcion, *argumentos, clave=None):
+        """
+        Pide ejecutar funcion(*argumentos); seguro desde cualquier hilo.
+        Con clave, las peticiones repetidas mientras la primera espera se descartan.
+        """
+        with self._candado:
+            if clave is not None:
+                if clave in self._claves:
+                    return
+                self._claves.add(clave)
+            self._cola.append((funcion, argumentos, clave))
+
+        self._avisar()
+
+    def procesar(self, presupuesto_ms=None):
+        """Ejecuta las funciones pendientes; devuelve cuántas se ejecutaron"""
+        limite = None if presupuesto_ms is None else time.perf_counter() + presupuesto_ms / 1000
+        ejecutadas = 0
+
+        while True:
+            with self._candado:
+                if not self._cola:
+                    break
+                funcion, argumentos, clave = self._cola.popleft()
+                self._claves.discard(clave)
+
+            try:
+                funcion(*argumentos)
+            except Exception as e:
+                if self.al_error:
+                    self.al_error(e)
+            ejecutadas += 1
+
+            if limite is not None and time.perf_counter() >= limite:
+                break
+
+        return ejecutadas
+
+    def pendientes(self):
+        """Número de funciones en espera"""
+        with self._candado:
+            return len(self._cola)
+
+    def _avisar(self):
+        """Despierta al hilo consumidor; la versión base no necesita hacer nada"""
+        pass
+
+class DespachadorInmediato(Despachador):
+    """Ejecuta cada función en el momento, en el hilo que la pide"""
+
+    def despachar(self, funcion, *argumentos, clave=None):
+        try:
+            funcion(*argumentos)
+        except Exception as e:
+            if self.al_error:
+                self.al_error(e)
+
+class DespachadorTk(Despachador):
+    """Ejecuta las funciones en el hilo de Tk en cuanto el bucle de eventos queda libre"""
+
+    EVENTO = '<<Despachar>>'
+
+    # Tiempo máximo por tanda, para no congelar la ventana con una ráfaga de peticiones
+    PRESUPUESTO_MS = 20
+
+    # Revisión periódica por si un aviso desde otro hilo no llegó a Tk
+    INTERVALO_RESPALDO_MS = 250
+
+    def __init__(self, ventana):
+        super().__init__()
+        self.ventana = ventana
+        self._hilo_principal = threading.get_ident()
+        self._avisado = False
+
+        self.ventana.bind(self.EVENTO, self._al_evento)
+        self._respaldo()
+
+    def _avisar(self):
+        if self._avisado:
+            return
+        self._avisado = True
+
+        try:
+            if threading.get_ident() == self._hilo_principal:
+                self.ventana.after_idle(self._procesar_tanda)
+            else:
+                # event_generate es la forma segura de despertar a Tk desde otro hilo
+                self.ventana.event_generate(self.EVENTO, when='tail')
+        except Exception:
+            # El bucle de eventos aún no arrancó: lo recogerá la revisión periódica
+            self._avisado = False
+
+    def _al_evento(self, event=None):
+        self._procesar_tanda()
+
+    def _procesar_tanda(self):
+        """Ejecuta una tanda y vuelve a programarse si quedó trabajo"""
+        self._avisado = False
+        self.procesar(self.PRESUPUESTO_MS)
+        if self.pendientes():
+            self._avisar()
+
+    def _respaldo(self):
+        if self.pendientes():
+            self._procesar_tanda()
+        self.ventana.after(self.INTERVALO_RESPALDO_MS, self._respaldo)
@@ -1,20 +1,72 @@
+import hashlib
+import os
+import shlex
 import subprocess
 import shutil
+import uuid
 from pathlib import Path
-from src_gestor.utilidades import SistemaOperativo, EjecutorComandos, validar_nombre
+from src_gestor.utilidades import SistemaOperativo, EjecutorComandos, validar_nombre, formatear_bytes, leer_pyvenv_cfg, escribir_atomico
+from src_gestor.clonado import SUFIJO_CLONANDO, CopiadorArchivos, copiar_arbol, reubicar_entorno
+from src_gestor.reserva import ReservaEntornos
+from src_gestor.wheelhouse import AlmacenWheels
+from src_gestor.almacen import AlmacenPaquetes
+from src_gestor.paquetes import LectorPaquetes, generar_freeze
+from src_gestor.requisitos import leer_archivo_requisitos, clave_version, entorno_marcadores
+from src_gestor.sincronizacion import planificar
+from src_gestor.sellos import AL_DIA, NOMBRE_SELLO, comprobar_sello, escribir_sello
+from src_gestor.papelera import Papelera
+from src_gestor.trazas import trazar
 
 """
 Creación, eliminación y manejo de entornos virtuales de Python
 """
 
+# Lista de requisitos que se pasa a pip con -r cuando llevan --hash u otras opciones propias
+ARCHIVO_SINCRONIZACION = '.gestor_sincronizar.txt'
+
 class GestorEntornos:
     """Maneja la creación y administración de entornos virtuales"""
 
-    def __init__(self, directorio_proyectos, callback_salida=None, callback_estado=None):
+    # Tiempo máximo en segundos de cada tipo de operación (None = sin límite)
+    TIEMPOS_LIMITE = {
+        'crear': 600,
+        'instalar': 3600
+    }
+
+    # Modos del wheelhouse: None (solo PyPI), primero (local y luego PyPI) o sin conexión
+    MODOS_WHEELHOUSE = (None, 'primero', 'sin_conexion')
+
+    # Los wheels se leen por bloques para calcular su hash sin cargarlos enteros en memoria
+    TAMANO_BLOQUE = 1024 * 1024
+
+    def __init__(self, directorio_proyectos, callback_salida=None, callback_estado=None,
+                 tiempos_limite=None, despachador=None, tamano_reserva=0, modo_wheelhouse=None,
+                 almacen_compartido=False, papelera=None, historial=None):
         self.directorio_proyectos = Path(directorio_proyectos)
         self.sistema = SistemaOperativo()
-        self.ejecutor = EjecutorComandos(callback_salida, callback_estado)
+        self.ejecutor = EjecutorComandos(callback_salida, callback_estado, despachador=despachador, historial=historial)
+        self.tiempos_limite = dict(self.TIEMPOS_LIMITE, **(tiempos_limite or {}))
+
+        # Entornos ya creados esperando a ser usados (opcional)
+        self.reserva = None
+        if tamano_reserva > 0:
+            self.reserva = ReservaEntornos(self.directorio_proyectos, tamano_reserva, self.ejecutor.planificador)
+            self.reserva.reponer(self.sistema.obtener_python())
+
+        # Paquetes descargados de antemano para instalar sin conexión
+        self.wheelhouse = AlmacenWheels(self.directorio_proyectos)
+        self.modo_wheelhouse = modo_wheelhouse
 
+        # Paquetes instalados, leídos de los metadatos con caché por directorio
+        self.lector_paquetes = LectorPaquetes()
+
+        # Archivos de paquetes compartidos entre entornos con enlaces duros (opcional)
+        self.almacen = AlmacenPaquetes(self.directorio_proyectos) if almacen_compartido else None
+
+        # Lo eliminado se borra en segundo plano; se comparte con el gestor de proyectos
+        self.papelera = papelera or Papelera(self.directorio_proyectos)
+
+    @trazar("Crear entorno", 'entornos')
     def crear_entorno(self, nombre_proyecto, nombre_entorno, callback_exito=None):
         """Crea un nuevo entorno virtual en el proyecto especificado"""
         if not nombre_entorno.strip():
@@ -32,12 +84,86 @@ class GestorEntornos:
         if ruta_entorno.exists():
             return False, f"Ya existe un entorno llamado '{nombre_entorno}'"
 
+        python = self.sistema.obtener_python()
+
+        # Si hay un entorno de reserva basta con moverlo al proyecto
+        if self.reserva is not None and self.reserva.disponibles(python):
+            def _tomar_de_reserva():
+                if self.reserva.tomar(str(ruta_entorno), python):
+                    return True, f"Entorno '{nombre_entorno}' creado desde la reserva"
+                return False, "No quedaban entornos en la reserva, vuelve a intentarlo"
+
+            self.ejecutor.ejecutar_funcion(
+                f"venv {ruta_entorno} (reserva)",
+                _tomar_de_reserva,
+                callback_exito=callback_exito,
+                clave=str(ruta_entorno)
+            )
+            self._encolar_deduplicacion(ruta_entorno)
+            return True, f"Creando entorno '{nombre_entorno}'..."
+
         # Comando para crear el entorno virtual
-        comando = [self.sistema.obtener_python(), "-m", "venv", str(ruta_entorno)]
-        self.ejecutor.ejecutar(comando, callback_exito=callback_exito)
+        comando = [python, "-m", "venv", str(ruta_entorno)]
+        self.ejecutor.ejecutar(comando, callback_exito=callback_exito, clave=str(ruta_entorno),
+                               tiempo_limite=self.tiempos_limite['crear'])
+        self._encolar_deduplicacion(ruta_entorno)
 
         return True, f"Creando entorno '{nombre_entorno}'..."
 
+    @trazar("Clonar entorno", 'entornos')
+    def clonar_entorno(self, nombre_proyecto, nombre_entorno, nombre_nuevo,
+                       proyecto_destino=None, callback_exito=None):
+        """Crea un entorno nuevo copiando uno existente, sin volver a instalar paquetes"""
+        proyecto_destino = proyecto_destino or nombre_proyecto
+
+        if not nombre_nuevo.strip():
+            return False, "El nombre del entorno no puede estar vacío"
+
+        if not validar_nombre(nombre_nuevo):
+            return False, "El nombre solo puede contener letras, números, guiones y guiones bajos"
+
+        if not self.entorno_existe(nombre_proyecto, nombre_entorno):
+            return False, f"El entorno '{nombre_entorno}' no existe o no es válido"
+
+        ruta_origen = self.obtener_ruta_entorno(nombre_proyecto, nombre_entorno)
+        ruta_destino = self.obtener_ruta_entorno(proyecto_destino, nombre_nuevo)
+
+        if not ruta_destino.parent.exists():
+            return False, f"El proyecto '{proyecto_destino}' no existe"
+
+        if ruta_destino.exists():
+            return False, f"Ya existe un entorno llamado '{nombre_nuevo}'"
+
+        def _clonar():
+            # Se copia junto al destino y se mueve al final, como la reserva: nadie ve un entorno a medias
+            temporal = ruta_destino.with_name(f".{nombre_nuevo}.{uuid.uuid4().hex[:8]}{SUFIJO_CLONANDO}")
+            copiador = CopiadorArchivos()
+            try:
+                copiar_arbol(ruta_origen, temporal, copiador)
+                reubicar_entorno(temporal, ruta_origen, ruta_destino)
+                # El sello era del origen: el clon se sella en su primera instalación
+                (temporal / NOMBRE_SELLO).unlink(missing_ok=True)
+                if ruta_destino.exists():
+                    raise FileExistsError(f"ya existe '{ruta_destino}'")
+                os.replace(temporal, ruta_destino)
+            except Exception as e:
+                shutil.rmtree(temporal, ignore_errors=True)
+                return False, f"Error al clonar el entorno: {str(e)}"
+
+            metodos = ", ".join(f"{cantidad} {metodo}" for metodo, cantidad in copiador.estadisticas.items() if cantidad)
+            return True, f"Entorno '{nombre_nuevo}' clonado desde '{nombre_entorno}' ({metodos})"
+
+        # Se bloquea el origen para que nadie instale en él mientras se copia
+        self.ejecutor.ejecutar_funcion(
+            f"clonar {ruta_origen} -> {ruta_destino}",
+            _clonar,
+            callback_exito=callback_exito,
+            clave=str(ruta_origen)
+        )
+
+        return True, f"Clonando entorno '{nombre_entorno}' como '{nombre_nuevo}'..."
+
+    @trazar("Eliminar entorno", 'entornos')
     def eliminar_entorno(self, nombre_proyecto, nombre_entorno):
         """Elimina un entorno virtual"""
         ruta_entorno = self.directorio_proyectos / nombre_proyecto / nombre_entorno
@@ -46,13 +172,14 @@ class GestorEntornos:
             return False, f"El entorno '{nombre_entorno}' no existe"
 
         try:
-            shutil.rmtree(ruta_entorno)
+            self.papelera.enviar(ruta_entorno, f"entorno {nombre_proyecto}/{nombre_entorno}")
             return True, f"Entorno '{nombre_entorno}' eliminado"
 
         except Exception as e:
             return False, f"Error al eliminar el entorno: {str(e)}"
 
-    def instalar_libreria(self, nombre_proyecto, nombre_entorno, libreria):
+    @trazar("Instalar librería", 'entornos')
+    def instalar_libreria(self, nombre_proyecto, nombre_entorno, libreria, callback_exito=None):
         """Instala una librería en el entorno virtual especificado"""
         if not libreria.strip():
             return False, "Debes especificar el nombre de la librería"
@@ -61,13 +188,25 @@ class GestorEntornos:
         if not pip_path.exists():
             return False, f"El entorno '{nombre_entorno}' no existe o no es válido"
 
-        comando = [str(pip_path), "install", libreria]
-        self.ejecutor.ejecutar(comando)
-
-        return True, f"Instalando '{libreria}'..."
-
-    def instalar_desde_requirements(self, nombre_proyecto, nombre_entorno, archivo_requirements):
-        """Instala librerías desde un archivo requirements.txt"""
+        def _instalar(opciones):
+            comando = [str(pip_path), "install"] + opciones + [libreria]
+            self.ejecutor.ejecutar(comando, clave=self._clave_entorno(nombre_proyecto, nombre_entorno),
+                                   callback_exito=callback_exito, tiempo_limite=self.tiempos_limite['instalar'])
+            self._encolar_deduplicacion(self.obtener_ruta_entorno(nombre_proyecto, nombre_entorno))
+
+        exito, mensaje = self._preparar_wheelhouse(nombre_proyecto, nombre_entorno, [libreria], _instalar)
+        if not exito:
+            return False, mensaje
+
+        return True, f"Instalando '{libreria}'{mensaje}..."
+
+    @trazar("Instalar requirements", 'entornos')
+    def instalar_desde_requirements(self, nombre_proyecto, nombre_entorno, archivo_requirements,
+                                    forzar=False, callback_exito=None):
+        """
+        Instala librerías desde un archivo requirements.txt. Si el sello del entorno dice
+        que nada cambió desde la última instalación con ese archivo, no se ejecuta pip.
+        """
         pip_path = self._obtener_pip_entorno(nombre_proyecto, nombre_entorno)
         if not pip_path.exists():
             return False, f"El entorno '{nombre_entorno}' no existe o no es válido"
@@ -75,43 +214,356 @@ class GestorEntornos:
         if not Path(archivo_requirements).exists():
             return False, f"El archivo '{archivo_requirements}' no existe"
 
-        comando = [str(pip_path), "install", "-r", archivo_requirements]
-        self.ejecutor.ejecutar(comando)
-
-        return True, f"Instalando desde {archivo_requirements}..."
-
-    def crear_requirements(self, nombre_proyecto, nombre_entorno, ruta_destino):
-        """Crea un archivo requirements.txt con las librerías instaladas"""
-        pip_path = self._obtener_pip_entorno(nombre_proyecto, nombre_entorno)
-        if not pip_path.exists():
+        ruta_entorno = self.obtener_ruta_entorno(nombre_proyecto, nombre_entorno)
+        if not forzar and self.estado_sello(ruta_entorno, archivo_requirements) == AL_DIA:
+            return True, f"'{nombre_entorno}' ya está al día con {archivo_requirements}; no hace falta ejecutar pip"
+
+        requisitos = []
+        if self.modo_wheelhouse:
+            try:
+                requisitos, _, _ = leer_archivo_requisitos(archivo_requirements)
+            except (OSError, UnicodeDecodeError) as e:
+                return False, f"Error al leer {archivo_requirements}: {str(e)}"
+
+        def _instalar(opciones):
+            comando = [str(pip_path), "install"] + opciones + ["-r", archivo_requirements]
+            self.ejecutor.ejecutar(
+                comando,
+                clave=self._clave_entorno(nombre_proyecto, nombre_entorno),
+                callback_exito=lambda: self._encolar_sello(ruta_entorno, archivo_requirements, callback_exito),
+                tiempo_limite=self.tiempos_limite['instalar']
+            )
+            self._encolar_deduplicacion(ruta_entorno)
+
+        exito, mensaje = self._preparar_wheelhouse(
+            nombre_proyecto, nombre_entorno, [requisito['texto'] for requisito in requisitos], _instalar
+        )
+        if not exito:
+            return False, mensaje
+
+        return True, f"Instalando desde {archivo_requirements}{mensaje}..."
+
+    @trazar("Sincronizar requirements", 'entornos')
+    def sincronizar_requirements(self, nombre_proyecto, nombre_entorno, archivo_requirements,
+                                 simulacion=False, eliminar_sobrantes=True, callback_exito=None, plan=None):
+        """
+        Deja el entorno tal como pide el archivo instalando, actualizando y eliminando solo la diferencia.
+        Con simulacion=True devuelve (True, plan) sin tocar nada; pasando ese plan se aplica tal cual,
+        sin volver a calcularlo.
+        """
+        if not self.entorno_existe(nombre_proyecto, nombre_entorno):
             return False, f"El entorno '{nombre_entorno}' no existe o no es válido"
 
         try:
-            resultado = subprocess.run(
-                [str(pip_path), "freeze"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            requisitos, restricciones, opciones_archivo = leer_archivo_requisitos(archivo_requirements)
+        except (OSError, UnicodeDecodeError) as e:
+            return False, f"Error al leer {archivo_requirements}: {str(e)}"
+
+        ruta_entorno = self.obtener_ruta_entorno(nombre_proyecto, nombre_entorno)
+        variables = entorno_marcadores(self._version_python_entorno(ruta_entorno))
+
+        def _planificar():
+            exito, instalados = self.listar_paquetes(nombre_proyecto, nombre_entorno)
+            if not exito:
+                return False, f"No se pudieron leer los paquetes de '{nombre_entorno}'"
+            try:
+                return True, planificar(requisitos, restricciones, instalados, variables, eliminar_sobrantes)
+            except ValueError as e:
+                return False, f"Error en {archivo_requirements}: {str(e)}"
+
+        if plan is None:
+            exito, plan = _planificar()
+            if not exito:
+                return False, plan
+
+        if simulacion:
+            return True, plan
+
+        if plan.vacio():
+            self._encolar_sello(ruta_entorno, archivo_requirements, callback_exito)
+            return True, plan
+
+        # Cada paso se encola desde el éxito del anterior: instalar, eliminar sobrantes y sellar
+        def _sellar():
+            self._encolar_sello(ruta_entorno, archivo_requirements, callback_exito)
+
+        clave = str(ruta_entorno)
+        pip_path = str(self._obtener_pip_entorno(nombre_proyecto, nombre_entorno))
+
+        siguiente = _sellar
+        if eliminar_sobrantes:
+            def _eliminar_sobrantes():
+                # Se recalcula tras instalar: los paquetes nuevos pueden necesitar alguno de los sobrantes.
+                # Nunca se elimina nada que no estuviera en el plan inicial
+                exito, plan_final = _planificar()
+                if not exito:
+                    return False, plan_final
+                eliminar = [nombre for nombre in plan_final.eliminar if nombre in plan.eliminar]
+                if eliminar:
+                    self.ejecutor.ejecutar([pip_path, "uninstall", "-y"] + eliminar, clave=clave,
+                                           callback_exito=_sellar, tiempo_limite=self.tiempos_limite['instalar'])
+                    return True, f"Eliminando {len(eliminar)} paquete(s) que ya no se usan"
+
+                self.ejecutor.despachador.despachar(_sellar)
+                return True, "No sobra ningún paquete"
+
+            siguiente = lambda: self.ejecutor.ejecutar_funcion(f"sincronizar {ruta_entorno}",
+                                                               _eliminar_sobrantes, clave=clave)
+
+        if plan.requisitos_pip():
+            # Las opciones del archivo (índices, find-links) y sus -c se respetan
+            opciones_extra = []
+            for linea in opciones_archivo:
+                opciones_extra.extend(shlex.split(linea))
+            for origen in sorted({restriccion['origen'] for restriccion in restricciones if restriccion.get('origen')}):
+                opciones_extra.extend(["-c", origen])
+
+            requisitos_pip = plan.requisitos_pip()
+            if plan.opciones:
+                # pip solo acepta --hash y las opciones por requisito dentro de un archivo
+                ruta_lista = ruta_entorno / ARCHIVO_SINCRONIZACION
+                try:
+                    escribir_atomico(ruta_lista, '\n'.join(plan.lineas_pip()) + '\n')
+                except OSError as e:
+                    return False, f"Error al preparar la lista de requisitos: {str(e)}"
+                requisitos_pip = ["-r", str(ruta_lista)]
+                if plan.con_hashes():
+                    opciones_extra.append("--require-hashes")
+
+            def _instalar(opciones):
+                comando = [pip_path, "install"] + opciones + opciones_extra + requisitos_pip
+                self.ejecutor.ejecutar(comando, clave=clave, callback_exito=siguiente,
+                                       tiempo_limite=self.tiempos_limite['instalar'])
+
+            exito, mensaje = self._preparar_wheelhouse(nombre_proyecto, nombre_entorno, plan.requisitos_pip(), _instalar)
+            if not exito:
+                return False, mensaje
+        else:
+            siguiente()
+
+        self._encolar_deduplicacion(ruta_entorno)
+        return True, plan
+
+    @trazar("Comprobar sello", 'disco')
+    def estado_sello(self, ruta_entorno, archivo_requirements=None):
+        """None si el entorno no tiene sello, o si está al día o desactualizado respecto a él"""
+        ruta_entorno = Path(ruta_entorno)
+        return comprobar_sello(
+            ruta_entorno,
+            self._version_python_entorno(ruta_entorno),
+            lambda: self.lector_paquetes.listar(self.sistema.obtener_site_packages_venv(ruta_entorno)),
+            archivo_requirements
+        )
+
+    def _encolar_sello(self, ruta_entorno, archivo_requirements, callback_exito=None):
+        """Tras una instalación correcta, guarda su huella en el entorno"""
+        def _sellar():
+            archivos = set()
+            leer_archivo_requisitos(archivo_requirements, archivos)
+            directorios = self.sistema.obtener_site_packages_venv(ruta_entorno)
+            escribir_sello(ruta_entorno, archivo_requirements, archivos, self._version_python_entorno(ruta_entorno),
+                           directorios, self.lector_paquetes.listar(directorios))
+            return True, f"'{ruta_entorno.name}' sellado con {Path(archivo_requirements).name}"
+
+        return self.ejecutor.ejecutar_funcion(f"sello {ruta_entorno}", _sellar,
+                                              callback_exito=callback_exito, clave=str(ruta_entorno))
+
+    def agregar_a_wheelhouse(self, rutas_archivos):
+        """Copia wheels o sdists al wheelhouse local"""
+        agregados = 0
+        errores = []
+        for ruta in rutas_archivos:
+            exito, mensaje = self.wheelhouse.agregar(ruta)
+            if exito:
+                agregados += 1
+            else:
+                errores.append(mensaje)
+
+        if errores:
+            return False, "; ".join(errores)
+        return True, f"{agregados} archivo(s) añadido(s) al wheelhouse"
+
+    @trazar("Preparar wheelhouse", 'entornos')
+    def _preparar_wheelhouse(self, nombre_proyecto, nombre_entorno, requisitos, instalar):
+        """
+        Decide las opciones de pip según el modo del wheelhouse y llama a instalar(opciones)
+        para encolar la instalación. Devuelve (exito, mensaje); sin conexión falla antes de
+        llamar a pip si falta algo.
+        """
+        if not self.modo_wheelhouse:
+            instalar([])
+            return True, ""
+
+        sin_conexion = self.modo_wheelhouse == 'sin_conexion'
+        if not self.wheelhouse.existe():
+            if sin_conexion:
+                return False, "El wheelhouse local está vacío; no se puede instalar sin conexión"
+            instalar([])
+            return True, ""
 
-            with open(ruta_destino, 'w') as archivo:
-                archivo.write(resultado.stdout)
+        ruta_entorno = self.directorio_proyectos / nombre_proyecto / nombre_entorno
 
-            return True, f"Requirements guardado en {ruta_destino}"
+        def _comprobar():
+            try:
+                faltan = self.wheelhouse.faltantes(requisitos, self._version_python_entorno(ruta_entorno))
+            except ValueError as e:
+                return False, f"Error en los requisitos: {str(e)}"
+            if faltan and sin_conexion:
+                return False, "Faltan en el wheelhouse: " + ", ".join(faltan)
+
+            # Si el wheelhouse lo tiene todo no hace falta consultar PyPI
+            instalar(self.wheelhouse.opciones_pip(sin_conexion or not faltan))
+            return True, "Wheelhouse listo"
+
+        # Los sdists se convierten en wheels una sola vez, antes de instalar. Lo que falta
+        # se mira después de construirlos, y si la construcción falla no se instala nada.
+        comando_wheels = self.wheelhouse.comando_construir_wheels(self.sistema.obtener_python_venv(ruta_entorno))
+        if comando_wheels:
+            def _tras_construir():
+                self.wheelhouse.actualizar_indice()
+                self.ejecutor.ejecutar_funcion(f"wheelhouse {ruta_entorno}", _comprobar, clave=str(ruta_entorno))
+
+            self.ejecutor.ejecutar(comando_wheels, callback_exito=_tras_construir,
+                                   clave=str(ruta_entorno), tiempo_limite=self.tiempos_limite['instalar'])
+            return True, " desde el wheelhouse"
+
+        exito, mensaje = _comprobar()
+        if not exito:
+            return False, mensaje
+        return True, " desde el wheelhouse"
+
+    def _encolar_deduplicacion(self, ruta_entorno):
+        """Tras instalar, enlaza los archivos nuevos del entorno con el almacén compartido"""
+        if self.almacen is None:
+            return None
+
+        def _deduplicar():
+            directorios = self.sistema.obtener_site_packages_venv(ruta_entorno)
+            if not directorios:
+                return True, f"Nada que compartir en {ruta_entorno.name}"
+
+            resumen = self.almacen.deduplicar(directorios)
+            return True, (
+                f"Almacén: {resumen['enlazados']} archivo(s) compartido(s), "
+                f"{resumen['nuevos']} nuevo(s), {formatear_bytes(resumen['bytes_liberados'])} liberados"
+            )
 
-        except Exception as e:
-            return False, f"Error al crear requirements: {str(e)}"
+        # Misma clave que la instalación: se ejecuta justo después y sin pip en marcha
+        return self.ejecutor.ejecutar_funcion(f"almacén {ruta_entorno}", _deduplicar, clave=str(ruta_entorno))
+
+    def deduplicar_todos(self):
+        """Pasa por el almacén todos los entornos del directorio base"""
+        if self.almacen is None:
+            return False, "El almacén compartido no está activado"
+
+        entornos = [
+            ruta_cfg.parent for ruta_cfg in self.directorio_proyectos.glob("*/*/pyvenv.cfg")
+            if not ruta_cfg.parent.parent.name.startswith('.')
+        ]
+        for ruta_entorno in entornos:
+            self._encolar_deduplicacion(ruta_entorno)
+
+        return True, f"Compartiendo archivos de {len(entornos)} entorno(s)..."
+
+    def recolectar_almacen(self):
+        """Borra del almacén los objetos que ya no usa ningún entorno e informa del ahorro"""
+        if self.almacen is None:
+            return False, "El almacén compartido no está activado"
+
+        def _recolectar():
+            borrados, bytes_borrados = self.almacen.recolectar()
+            informe = self.almacen.informe()
+            return True, (
+                f"Almacén: {borrados} objeto(s) sin uso borrados ({formatear_bytes(bytes_borrados)}); "
+                f"{informe['objetos']} objeto(s), {formatear_bytes(informe['bytes_almacen'])} en disco, "
+                f"{formatear_bytes(informe['bytes_ahorrados'])} ahorrados"
+            )
 
+        self.ejecutor.ejecutar_funcion("recolectar almacén", _recolectar, clave=self.almacen.directorio)
+        return True, "Revisando el almacén compartido..."
+
+    def _version_python_entorno(self, ruta_entorno):
+        """Versión de Python de un entorno según su pyvenv.cfg"""
+        return leer_pyvenv_cfg(ruta_entorno).get('version')
+
+    @trazar("Crear requirements", 'entornos')
+    def crear_requirements(self, nombre_proyecto, nombre_entorno, ruta_destino, con_hashes=False,
+                           incluir_todos=False, callback_exito=None):
+        """
+        Crea un archivo requirements.txt con las librerías instaladas, leyendo los
+        metadatos en segundo plano en lugar de lanzar pip freeze
+        """
+        if not self.entorno_existe(nombre_proyecto, nombre_entorno):
+            return False, f"El entorno '{nombre_entorno}' no existe o no es válido"
+
+        def _generar():
+            try:
+                exito, texto = self.texto_requirements(nombre_proyecto, nombre_entorno, con_hashes, incluir_todos)
+                if not exito:
+                    return False, texto
+
+                escribir_atomico(ruta_destino, texto)
+                return True, f"Requirements guardado en {ruta_destino}"
+
+            except Exception as e:
+                return False, f"Error al crear requirements: {str(e)}"
+
+        self.ejecutor.ejecutar_funcion(
+            f"freeze {nombre_entorno} -> {ruta_destino}",
+            _generar,
+            callback_exito=callback_exito,
+            clave=self._clave_entorno(nombre_proyecto, nombre_entorno)
+        )
+
+        return True, f"Generando {ruta_destino}..."
+
+    @trazar("Generar requirements", 'entornos')
+    def texto_requirements(self, nombre_proyecto, nombre_entorno, con_hashes=False, incluir_todos=False):
+        """Devuelve (True, texto) con el requirements.txt del entorno, o (False, mensaje)"""
+        exito, paquetes = self.listar_paquetes(nombre_proyecto, nombre_entorno)
+        if not exito:
+            return False, paquetes
+
+        hashes = self._hashes_wheelhouse(paquetes) if con_hashes else None
+        version_python = self._version_python_entorno(self.obtener_ruta_entorno(nombre_proyecto, nombre_entorno))
+        return True, generar_freeze(paquetes, incluir_todos, hashes, version_python)
+
+    def _hashes_wheelhouse(self, paquetes):
+        """
+        Hashes sha256 de los archivos del wheelhouse que corresponden a cada paquete instalado.
+        Los metadatos instalados solo guardan hashes de archivos sueltos, no del wheel.
+        """
+        indice = self.wheelhouse.obtener_indice()
+        hashes = {}
+        for paquete in paquetes:
+            for artefacto in indice.get(paquete['clave'], []):
+                if clave_version(artefacto['version']) == clave_version(paquete['version']):
+                    ruta = Path(self.wheelhouse.directorio) / artefacto['archivo']
+                    huella = hashlib.sha256()
+                    with open(ruta, 'rb') as archivo:
+                        for bloque in iter(lambda: archivo.read(self.TAMANO_BLOQUE), b''):
+                            huella.update(bloque)
+                    hashes.setdefault(paquete['clave'], []).append(f"sha256:{huella.hexdigest()}")
+        return hashes
+
+    @trazar("Listar paquetes", 'disco')
     def listar_paquetes(self, nombre_proyecto, nombre_entorno):
-        """Lista los paquetes instalados en un entorno virtual"""
-        pip_path = self._obtener_pip_entorno(nombre_proyecto, nombre_entorno)
-        if not pip_path.exists():
+        """
+        Lista los paquetes instalados leyendo los metadatos de site-packages, sin lanzar pip.
+        Devuelve (True, paquetes) o (False, mensaje).
+        """
+        if not self.entorno_existe(nombre_proyecto, nombre_entorno):
             return False, f"El entorno '{nombre_entorno}' no existe o no es válido"
 
-        comando = [str(pip_path), "list"]
-        self.ejecutor.ejecutar(comando)
+        ruta_entorno = self.obtener_ruta_entorno(nombre_proyecto, nombre_entorno)
+        directorios = self.sistema.obtener_site_packages_venv(ruta_entorno)
+        if not directorios:
+            return False, f"No se encontró site-packages en '{nombre_entorno}'"
 
-        return True, f"Listando paquetes de '{nombre_entorno}'..."
+        try:
+            return True, self.lector_paquetes.listar(directorios)
+        except OSError as e:
+            return False, f"Error al leer los paquetes: {str(e)}"
 
     def abrir_terminal_con_entorno(self, nombre_proyecto, nombre_entorno):
         """Abre una terminal con el entorno virtual activado"""
@@ -168,6 +620,29 @@ class GestorEntornos:
         ruta_entorno = self.directorio_proyectos / nombre_proyecto / nombre_entorno
         return self.sistema.obtener_pip_venv(ruta_entorno)
 
+    def _clave_entorno(self, nombre_proyecto, nombre_entorno):
+        """Clave con la que se serializan las operaciones sobre un mismo entorno"""
+        return str(self.directorio_proyectos / nombre_proyecto / nombre_entorno)
+
+    def listar_trabajos(self):
+        """Devuelve los trabajos en ejecución y en cola"""
+        return self.ejecutor.listar_trabajos()
+
+    def cancelar_trabajos(self, nombre_proyecto=None, nombre_entorno=None):
+        """Cancela los trabajos de un entorno, o todos si no se indica ninguno"""
+        clave = None
+        if nombre_proyecto and nombre_entorno:
+            clave = self._clave_entorno(nombre_proyecto, nombre_entorno)
+
+        cancelados = [
+            trabajo for trabajo in self.listar_trabajos()
+            if (clave is None or trabajo.clave == clave) and trabajo.cancelar()
+        ]
+
+        if not cancelados:
+            return False, "No hay trabajos que cancelar"
+        return True, f"{len(cancelados)} trabajo(s) cancelado(s)"
+
     def entorno_existe(self, nombre_proyecto, nombre_entorno):
         """Verifica si existe un entorno virtual específico"""
         ruta_entorno = self.directorio_proyectos / nombre_proyecto / nombre_entorno
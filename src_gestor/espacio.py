@@ -0,0 +1,151 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+"""
+Cálculo del espacio en disco de proyectos y entornos, en paralelo y con caché
+por directorio
+"""
+
+class CalculadorEspacio:
+    """
+    Mide árboles de directorios con varios hilos. Cada directorio se guarda con su
+    mtime y solo se vuelve a leer si cambió; los archivos con varios enlaces duros
+    se cuentan una vez por medición.
+    """
+
+    def __init__(self, max_hilos=None):
+        self.max_hilos = max_hilos or min(8, (os.cpu_count() or 2) * 2)
+        # ruta -> (mtime_ns, bytes_propios, [(dev, ino, bytes)] enlazados, [subdirectorios])
+        self._cache = {}
+        self._candado = threading.Lock()
+        # Los hilos se crean en la primera medición y se reutilizan en las siguientes
+        self._grupo = None
+
+    def medir(self, raices):
+        """Devuelve {raiz: bytes} ocupados por cada raíz"""
+        raices = [os.fspath(raiz) for raiz in raices]
+        self._actualizar(raices)
+        return {raiz: self._sumar(raiz) for raiz in raices}
+
+    def cerrar(self):
+        """Libera los hilos; una medición posterior los vuelve a crear"""
+        with self._candado:
+            grupo, self._grupo = self._grupo, None
+        if grupo is not None:
+            grupo.shutdown(wait=False)
+
+    def olvidar(self, raiz):
+        """Quita de la caché un árbol que ya no existe"""
+        raiz = os.fspath(raiz)
+        prefijo = raiz + os.sep
+        with self._candado:
+            for ruta in [ruta for ruta in self._cache if ruta == raiz or ruta.startswith(prefijo)]:
+                del self._cache[ruta]
+
+    def _actualizar(self, raices):
+        """Recorre en paralelo los directorios, releyendo solo los que cambiaron"""
+        pendientes = list(raices)
+        # Una raíz puede estar dentro de otra (un entorno dentro de su proyecto)
+        revisados = set()
+        # Directorios en proceso: el trabajo termina cuando no queda ninguno ni hay pendientes
+        estado = {'en_curso': 0}
+        condicion = threading.Condition()
+
+        def trabajar():
+            while True:
+                with condicion:
+                    while not pendientes and estado['en_curso']:
+                        condicion.wait()
+                    if not pendientes:
+                        condicion.notify_all()
+                        return
+                    ruta = pendientes.pop()
+                    if ruta in revisados:
+                        continue
+                    revisados.add(ruta)
+                    estado['en_curso'] += 1
+
+                try:
+                    subdirectorios = self._revisar_directorio(ruta)
+                except Exception:
+                    subdirectorios = []
+
+                with condicion:
+                    pendientes.extend(subdirectorios)
+                    estado['en_curso'] -= 1
+                    condicion.notify_all()
+
+        with self._candado:
+            if self._grupo is None:
+                self._grupo = ThreadPoolExecutor(self.max_hilos, thread_name_prefix='espacio')
+            grupo = self._grupo
+        wait([grupo.submit(trabajar) for _ in range(self.max_hilos)])
+
+    def _revisar_directorio(self, ruta):
+        """Lee un directorio si su mtime cambió; devuelve sus subdirectorios"""
+        try:
+            info_directorio = os.stat(ruta, follow_symlinks=False)
+            mtime = info_directorio.st_mtime_ns
+        except OSError:
+            with self._candado:
+                self._cache.pop(ruta, None)
+            return []
+
+        with self._candado:
+            guardado = self._cache.get(ruta)
+        if guardado is not None and guardado[0] == mtime:
+            return guardado[3]
+
+        propios = _bytes_ocupados(info_directorio)
+        enlazados = []
+        subdirectorios = []
+        try:
+            with os.scandir(ruta) as entradas:
+                for entrada in entradas:
+                    try:
+                        if entrada.is_dir(follow_symlinks=False):
+                            subdirectorios.append(entrada.path)
+                            continue
+                        info = entrada.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+
+                    ocupado = _bytes_ocupados(info)
+                    # En Windows scandir no rellena st_nlink y todo cuenta como archivo propio
+                    if info.st_nlink > 1:
+                        enlazados.append((info.st_dev, info.st_ino, ocupado))
+                    else:
+                        propios += ocupado
+        except OSError:
+            pass
+
+        with self._candado:
+            self._cache[ruta] = (mtime, propios, enlazados, subdirectorios)
+        return subdirectorios
+
+    def _sumar(self, raiz):
+        """Total de un árbol ya revisado, contando una sola vez cada inodo enlazado"""
+        total = 0
+        vistos = set()
+        pendientes = [raiz]
+        with self._candado:
+            while pendientes:
+                guardado = self._cache.get(pendientes.pop())
+                if guardado is None:
+                    continue
+                _, propios, enlazados, subdirectorios = guardado
+                total += propios
+                for dev, ino, ocupado in enlazados:
+                    if (dev, ino) not in vistos:
+                        vistos.add((dev, ino))
+                        total += ocupado
+                pendientes.extend(subdirectorios)
+        return total
+
+def _bytes_ocupados(info):
+    """Espacio real en disco de un archivo (bloques si el sistema los da)"""
+    bloques = getattr(info, 'st_blocks', None)
+    if bloques is not None:
+        return bloques * 512
+    return info.st_size
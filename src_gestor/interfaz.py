@@ -1,9 +1,24 @@
+import collections
+import os
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, scrolledtext
+from tkinter import ttk, messagebox, filedialog, scrolledtext, simpledialog
 from pathlib import Path
 
 from src_gestor.proyectos import GestorProyectos
 from src_gestor.entornos import GestorEntornos
+from src_gestor.consola import ColaConsola, HistorialConsola, agrupar_por_etiqueta
+from src_gestor.arbol import ReconciliadorArbol
+from src_gestor.vigilante import crear_vigilante
+from src_gestor.despachador import DespachadorTk
+from src_gestor.espacio import CalculadorEspacio
+from src_gestor.requisitos import clave_version
+from src_gestor.sellos import AL_DIA, DESACTUALIZADO
+from src_gestor.utilidades import formatear_bytes
+from src_gestor.arranque import CronometroArranque, guardar_instantanea, leer_instantanea
+from src_gestor.trazas import VARIABLE_ENTORNO, obtener_trazador, trazar, trazar_operacion
+from src_gestor.historial import HistorialComandos
 
 """
 Interfaz Gráfica del Gestor de Entornos Virtuales, con ventana principal y los componentes visuales
@@ -12,23 +27,89 @@ Interfaz Gráfica del Gestor de Entornos Virtuales, con ventana principal y los
 class GestorInterfaz:
     """Interfaz gráfica principal"""
 
-    def __init__(self):
+    # Frecuencia con la que se vacía la cola de la consola
+    INTERVALO_CONSOLA_MS = 50
+
+    # Sufijo de los entornos en el árbol según su sello de instalación
+    TEXTOS_SELLO = {
+        AL_DIA: "  ✓ al día",
+        DESACTUALIZADO: "  ⚠ desactualizado"
+    }
+
+    # Filas de la vista de elementos más grandes
+    ELEMENTOS_MAS_GRANDES = 50
+
+    # Proyectos escaneados en segundo plano que se envían juntos a la interfaz
+    PROYECTOS_POR_LOTE = 25
+
+    # Líneas visibles en la consola y cuántas se recortan de golpe al superarlas
+    LINEAS_MAXIMAS_CONSOLA = 5000
+    LINEAS_RECORTE_CONSOLA = 1000
+
+    def __init__(self, inicio=None):
+        # Tiempos del arranque; inicio es el momento en que el programa empezó a importar
+        self.cronometro = CronometroArranque(inicio)
+        self.cronometro.marcar('importacion')
+
         self.ventana = tk.Tk()
         self.configurar_ventana()
 
+        # Salida de los comandos, escrita desde cualquier hilo
+        self.cola_consola = ColaConsola()
+        self.historial_consola = HistorialConsola()
+        self._estado_pendiente = None
+        self._operacion_pendiente = None
+
+        # Tramos de las operaciones; la duración de la última se ve en la barra de estado
+        self.trazador = obtener_trazador()
+        self.trazador.al_terminar_operacion = self._al_terminar_operacion
+
+        # Funciones que los hilos de fondo piden ejecutar en el hilo de Tk
+        self.despachador = DespachadorTk(self.ventana)
+        self.despachador.al_error = lambda e: self.escribir_en_consola(f"✗ Error: {str(e)}", "error")
+
+        # Escaneo en segundo plano: generación vigente y proyectos a adelantar
+        self._generacion_escaneo = 0
+        self._prioridad_escaneo = collections.deque()
+        self._proyectos_cargados = set()
+
+        # Última relectura pedida de cada proyecto: una respuesta atrasada no pisa a otra más nueva
+        self._relecturas = {}
+        self._numero_relectura = 0
+
+        # Estado del sello de cada entorno (al día / desactualizado), calculado fuera del hilo de Tk
+        self._estados_sello = {}
+
+        # Tamaño en disco de cada nodo del árbol, medido por un hilo propio
+        self.calculador_espacio = CalculadorEspacio()
+        self._tamanos = {}
+        self._medidas_pendientes = set()
+        self._candado_medidas = threading.Lock()
+        self._aviso_medidas = threading.Event()
+
         # Variables de estado
         self.proyecto_actual = tk.StringVar()
         self.entorno_actual = tk.StringVar()
         self.libreria_a_instalar = tk.StringVar()
+        self.usar_wheelhouse = tk.BooleanVar(value=False)
+        self.wheelhouse_sin_conexion = tk.BooleanVar(value=False)
 
         # Inicializa los gestores
         self.directorio_base = Path.cwd()
         self.gestor_proyectos = GestorProyectos(self.directorio_base)
+        self.historial_comandos = HistorialComandos(self.gestor_proyectos.directorio_proyectos)
+        self.historial_comandos.al_error = lambda mensaje: self.escribir_en_consola(f"⚠ {mensaje}", "advertencia")
         self.gestor_entornos = GestorEntornos(
             self.gestor_proyectos.directorio_proyectos,
             self.escribir_en_consola,
-            self.cambiar_estado
+            self.cambiar_estado,
+            despachador=self.despachador,
+            tamano_reserva=int(os.environ.get('GESTOR_RESERVA_ENTORNOS', '0') or 0),
+            almacen_compartido=os.environ.get('GESTOR_ALMACEN_COMPARTIDO', '') not in ('', '0'),
+            papelera=self.gestor_proyectos.papelera,
+            historial=self.historial_comandos
         )
+        self.gestor_proyectos.papelera.al_progreso = self._progreso_papelera
 
         # Para seguimiento responsive
         self.ancho_ventana = 1100
@@ -37,7 +118,16 @@ class GestorInterfaz:
 
         # Configurar la interfaz
         self.crear_interfaz()
-        self.actualizar_proyectos()
+        self.cronometro.marcar('widgets')
+
+        # Refleja en el árbol los cambios hechos fuera del gestor
+        self._cambios_pendientes = set()
+        self._candado_cambios = threading.Lock()
+        self.vigilante = crear_vigilante(self.gestor_proyectos.directorio_proyectos, self.al_cambiar_directorio)
+
+        # La ventana aparece con el árbol de la última sesión; lo demás espera al primer pintado
+        self._pintar_instantanea()
+        self.ventana.after_idle(self._tras_primer_pintado)
 
     def configurar_ventana(self):
         """Configura las propiedades básicas de la ventana"""
@@ -62,7 +152,7 @@ class GestorInterfaz:
         self.crear_seccion_estado()
         self.crear_seccion_entornos()
         self.crear_seccion_librerias()
-        self.crear_consola()
+        # La consola queda al final de la ventana y se crea tras el primer pintado
         self.crear_barra_estado()
 
     def configurar_estilos(self):
@@ -204,29 +294,38 @@ class GestorInterfaz:
         scroll_arbol = ttk.Scrollbar(marco_arbol, orient="vertical")
         scroll_arbol.grid(row=0, column=1, sticky="ns")
 
-        self.arbol_proyectos = ttk.Treeview(marco_arbol, yscrollcommand=scroll_arbol.set)
+        self.arbol_proyectos = ttk.Treeview(marco_arbol, columns=('tamano',), yscrollcommand=scroll_arbol.set)
         self.arbol_proyectos.grid(row=0, column=0, sticky="nsew")
         scroll_arbol.config(command=self.arbol_proyectos.yview)
 
         self.arbol_proyectos.heading('#0', text='Estructura de Proyectos → Entornos Virtuales')
+        self.arbol_proyectos.heading('tamano', text='Tamaño')
+        self.arbol_proyectos.column('tamano', width=90, minwidth=70, stretch=False, anchor='e')
         self.arbol_proyectos.bind('<<TreeviewSelect>>', self.al_seleccionar_arbol)
+        self.arbol_proyectos.bind('<<TreeviewOpen>>', self.al_expandir_arbol)
+
+        self.estructura_proyectos = {}
+        self._hijos_deseados = {'': []}
+        self.reconciliador_arbol = ReconciliadorArbol(self.arbol_proyectos)
 
         # Botones de acción
         marco_acciones = ttk.Frame(tarjeta_proyectos)
         marco_acciones.grid(row=2, column=0, sticky="ew", pady=(10, 0))
-        marco_acciones.columnconfigure((0,1,2,3), weight=1)
+        marco_acciones.columnconfigure((0,1,2,3,4), weight=1)
 
         self.botones_accion = {
             'eliminar': ttk.Button(marco_acciones, text="🗑️ Eliminar", command=self.eliminar_seleccionado, style='Boton.TButton'),
             'actualizar': ttk.Button(marco_acciones, text="🔄 Actualizar", command=self.actualizar_proyectos, style='Boton.TButton'),
             'carpeta': ttk.Button(marco_acciones, text="📁 Abrir Carpeta", command=self.abrir_carpeta, style='Boton.TButton'),
-            'terminal': ttk.Button(marco_acciones, text="💻 Terminal", command=self.abrir_terminal, style='Boton.TButton')
+            'terminal': ttk.Button(marco_acciones, text="💻 Terminal", command=self.abrir_terminal, style='Boton.TButton'),
+            'espacio': ttk.Button(marco_acciones, text="📊 Más grandes", command=self.mostrar_mas_grandes, style='Boton.TButton')
         }
 
         self.botones_accion['eliminar'].grid(row=0, column=0, padx=(0,5), sticky="ew")
         self.botones_accion['actualizar'].grid(row=0, column=1, padx=(0,5), sticky="ew")
         self.botones_accion['carpeta'].grid(row=0, column=2, padx=(0,5), sticky="ew")
-        self.botones_accion['terminal'].grid(row=0, column=3, sticky="ew")
+        self.botones_accion['terminal'].grid(row=0, column=3, padx=(0,5), sticky="ew")
+        self.botones_accion['espacio'].grid(row=0, column=4, sticky="ew")
 
     def crear_seccion_estado(self):
         """Crea la sección de estado actual"""
@@ -256,6 +355,7 @@ class GestorInterfaz:
         self.entrada_entorno = ttk.Entry(marco_crear_venv, font=('Segoe UI', 10))
         self.entrada_entorno.grid(row=0, column=1, sticky="ew", padx=(0, 10))
         ttk.Button(marco_crear_venv, text="+ Crear Entorno", command=self.crear_entorno, style='BotonAccion.TButton').grid(row=0, column=2, sticky="e")
+        ttk.Button(marco_crear_venv, text="⧉ Clonar", command=self.clonar_entorno, style='Boton.TButton').grid(row=0, column=3, sticky="e", padx=(5, 0))
 
     def crear_seccion_librerias(self):
         """Crea la sección de gestión de librerías"""
@@ -276,17 +376,110 @@ class GestorInterfaz:
         # Botones para requirements
         marco_req = ttk.Frame(tarjeta_libs)
         marco_req.grid(row=1, column=0, sticky="ew")
-        marco_req.columnconfigure((0,1,2), weight=1)
+        marco_req.columnconfigure((0,1,2,3), weight=1)
 
         self.botones_req = {
             'desde_req': ttk.Button(marco_req, text="📄 Desde requirements.txt", command=self.instalar_desde_requirements, style='Boton.TButton'),
             'crear_req': ttk.Button(marco_req, text="💾 Crear requirements.txt", command=self.crear_requirements, style='Boton.TButton'),
-            'ver_paquetes': ttk.Button(marco_req, text="📋 Ver instaladas", command=self.mostrar_paquetes, style='Boton.TButton')
+            'ver_paquetes': ttk.Button(marco_req, text="📋 Ver instaladas", command=self.mostrar_paquetes, style='Boton.TButton'),
+            'sincronizar': ttk.Button(marco_req, text="🔄 Sincronizar", command=self.sincronizar_requirements, style='Boton.TButton')
         }
 
         self.botones_req['desde_req'].grid(row=0, column=0, padx=(0, 5), sticky="ew")
         self.botones_req['crear_req'].grid(row=0, column=1, padx=(0, 5), sticky="ew")
-        self.botones_req['ver_paquetes'].grid(row=0, column=2, sticky="ew")
+        self.botones_req['ver_paquetes'].grid(row=0, column=2, padx=(0, 5), sticky="ew")
+        self.botones_req['sincronizar'].grid(row=0, column=3, sticky="ew")
+
+        # Wheelhouse local para instalar sin depender de PyPI
+        marco_wheelhouse = ttk.Frame(tarjeta_libs)
+        marco_wheelhouse.grid(row=2, column=0, sticky="ew", pady=(10, 0))
+        marco_wheelhouse.columnconfigure(2, weight=1)
+
+        ttk.Checkbutton(marco_wheelhouse, text="Usar wheelhouse local", variable=self.usar_wheelhouse,
+                        command=self.cambiar_modo_wheelhouse).grid(row=0, column=0, sticky="w", padx=(0, 10))
+        ttk.Checkbutton(marco_wheelhouse, text="Sin conexión", variable=self.wheelhouse_sin_conexion,
+                        command=self.cambiar_modo_wheelhouse).grid(row=0, column=1, sticky="w")
+        ttk.Button(marco_wheelhouse, text="📦 Añadir al wheelhouse", command=self.agregar_a_wheelhouse,
+                   style='Boton.TButton').grid(row=0, column=2, sticky="e")
+
+    def _tras_primer_pintado(self):
+        """Con la ventana ya visible crea la consola y arranca el escaneo y los hilos de fondo"""
+        self.ventana.update_idletasks()
+        self.cronometro.marcar('primer_pintado')
+
+        self.crear_consola()
+        if self.modo_compacto:
+            self.salida_consola.configure(height=8)
+        self._bombear_consola()
+
+        self.actualizar_proyectos()
+        threading.Thread(target=self._medir_en_fondo, daemon=True).start()
+        self.vigilante.iniciar()
+
+    def _pintar_instantanea(self):
+        """Muestra el árbol guardado en la última sesión mientras llega el escaneo real"""
+        instantanea = leer_instantanea(self.gestor_proyectos.directorio_proyectos)
+        if instantanea is None:
+            return
+
+        proyectos, tamanos, sellos = instantanea
+        self._tamanos.update(tamanos)
+        self._estados_sello.update(sellos)
+
+        # Se dan por cargados: el escaneo conserva sus hijos hasta tener los reales
+        for proyecto in proyectos:
+            self._describir_proyecto(proyecto)
+        self.reconciliador_arbol.reconciliar(self._hijos_deseados)
+        self.variable_estado.set(f"⏳ {len(proyectos)} proyectos de la última sesión, comprobando cambios...")
+
+    def _guardar_instantanea(self, en_fondo=False):
+        """Guarda el árbol actual para pintarlo al instante en el próximo arranque"""
+        proyectos = []
+        for id_proyecto, _, _, _ in self._hijos_deseados['']:
+            if id_proyecto not in self._proyectos_cargados:
+                continue
+            hijos = [
+                self.estructura_proyectos[id_hijo] for id_hijo, _, _, _ in self._hijos_deseados.get(id_proyecto, [])
+                if id_hijo in self.estructura_proyectos
+            ]
+            proyectos.append({
+                'nombre': self.estructura_proyectos[id_proyecto]['nombre'],
+                'entornos': [hijo['nombre'] for hijo in hijos if hijo['tipo'] == 'entorno'],
+                'carpetas': [hijo['nombre'] for hijo in hijos if hijo['tipo'] == 'carpeta']
+            })
+
+        tamanos = {id_nodo: tamano for id_nodo, tamano in self._tamanos.items() if id_nodo in self.estructura_proyectos}
+        # Los sellos se escriben desde el hilo de escaneo: se copian antes de recorrerlos
+        sellos = {id_nodo: estado for id_nodo, estado in dict(self._estados_sello).items()
+                  if estado is not None and id_nodo in self.estructura_proyectos}
+
+        argumentos = (self.gestor_proyectos.directorio_proyectos, proyectos, tamanos, sellos)
+        if en_fondo:
+            threading.Thread(target=self._escribir_instantanea, args=argumentos, daemon=True).start()
+        else:
+            self._escribir_instantanea(*argumentos)
+
+    def _escribir_instantanea(self, directorio_base, proyectos, tamanos, sellos):
+        """Escribe la instantánea; si falla, el próximo arranque simplemente no la tendrá"""
+        try:
+            guardar_instantanea(directorio_base, proyectos, tamanos, sellos)
+        except OSError:
+            pass
+
+    def _informar_arranque(self):
+        """Escribe en la consola los tiempos del arranque y avisa si alguno se pasó"""
+        self.escribir_en_consola(f"⏱ Arranque: {self.cronometro.resumen()}", "info")
+        for hito, milisegundos, limite in self.cronometro.excedidos():
+            self.escribir_en_consola(
+                f"⚠ {self.cronometro.TEXTOS[hito]} tardó {milisegundos:.0f} ms (presupuesto {limite} ms)", "advertencia"
+            )
+
+        registro = os.environ.get('GESTOR_REGISTRO_ARRANQUE')
+        if registro:
+            try:
+                self.cronometro.registrar(registro)
+            except OSError as e:
+                self.escribir_en_consola(f"✗ No se pudo guardar el registro de arranque: {str(e)}", "error")
 
     def crear_consola(self):
         """Crea la consola de salida"""
@@ -317,23 +510,37 @@ class GestorInterfaz:
         self.salida_consola.tag_configure("comando", foreground="#a78bfa")
 
         # Mensaje inicial
-        self.salida_consola.insert(tk.END, "Gestor iniciado - Listo para usar\n", "exito")
-        self.salida_consola.insert(tk.END, f"📁 Base: {self.directorio_base}\n", "info")
-        self.salida_consola.insert(tk.END, f"📂 Proyectos: {self.gestor_proyectos.directorio_proyectos}\n\n", "info")
-        self.salida_consola.config(state=tk.DISABLED)
+        self._insertar_lote([
+            ("Gestor iniciado - Listo para usar", "exito"),
+            (f"📁 Base: {self.directorio_base}", "info"),
+            (f"📂 Proyectos: {self.gestor_proyectos.directorio_proyectos}\n", "info")
+        ])
 
         # Botones de la consola
         marco_botones_consola = ttk.Frame(tarjeta_consola)
         marco_botones_consola.grid(row=1, column=0, sticky="ew")
 
         ttk.Button(marco_botones_consola, text=" Limpiar", command=self.limpiar_consola, style='Boton.TButton').grid(row=0, column=0, padx=(0, 5), sticky="w")
-        ttk.Button(marco_botones_consola, text=" Guardar Log", command=self.guardar_log, style='Boton.TButton').grid(row=0, column=1, sticky="w")
+        ttk.Button(marco_botones_consola, text=" Guardar Log", command=self.guardar_log, style='Boton.TButton').grid(row=0, column=1, padx=(0, 5), sticky="w")
+        ttk.Button(marco_botones_consola, text=" Trabajos", command=self.mostrar_trabajos, style='Boton.TButton').grid(row=0, column=2, padx=(0, 5), sticky="w")
+        ttk.Button(marco_botones_consola, text="⏹ Cancelar", command=self.cancelar_trabajos, style='Boton.TButton').grid(row=0, column=3, padx=(0, 5), sticky="w")
+        ttk.Button(marco_botones_consola, text="↩ Deshacer", command=self.deshacer_eliminacion, style='Boton.TButton').grid(row=0, column=4, sticky="w")
+        if self.gestor_entornos.almacen is not None:
+            ttk.Button(marco_botones_consola, text="💽 Almacén", command=self.revisar_almacen, style='Boton.TButton').grid(row=0, column=5, padx=(5, 0), sticky="w")
+        self.boton_trazas = ttk.Button(marco_botones_consola, command=self.alternar_trazas, style='Boton.TButton')
+        self.boton_trazas.grid(row=0, column=6, padx=(5, 0), sticky="w")
+        ttk.Button(marco_botones_consola, text="🕘 Historial", command=self.mostrar_historial, style='Boton.TButton').grid(row=0, column=7, padx=(5, 0), sticky="w")
+        self._actualizar_boton_trazas()
 
     def crear_barra_estado(self):
         """Crea la barra de estado en la parte inferior"""
         self.variable_estado = tk.StringVar(value="✅ Listo")
-        barra_estado = ttk.Label(self.contenedor, textvariable=self.variable_estado, style='Estado.TLabel', relief=tk.SUNKEN, padding=(10, 5))
+        self.variable_operacion = tk.StringVar(value="")
+        barra_estado = ttk.Frame(self.contenedor, relief=tk.SUNKEN)
         barra_estado.grid(row=7, column=0, sticky="ew", pady=(15, 0))
+        barra_estado.columnconfigure(0, weight=1)
+        ttk.Label(barra_estado, textvariable=self.variable_estado, style='Estado.TLabel', padding=(10, 5)).grid(row=0, column=0, sticky="ew")
+        ttk.Label(barra_estado, textvariable=self.variable_operacion, style='Estado.TLabel', padding=(10, 5)).grid(row=0, column=1, sticky="e")
 
     # Métodos para manejar eventos de la interfaz
 
@@ -386,10 +593,12 @@ class GestorInterfaz:
             self.botones_accion['actualizar'].config(text="🔄")
             self.botones_accion['carpeta'].config(text="📁")
             self.botones_accion['terminal'].config(text="💻")
+            self.botones_accion['espacio'].config(text="📊")
 
             self.botones_req['desde_req'].config(text="📄 Desde req.")
             self.botones_req['crear_req'].config(text="💾 Crear req.")
             self.botones_req['ver_paquetes'].config(text="📋 Ver paquetes")
+            self.botones_req['sincronizar'].config(text="🔄 Sincr.")
         except:
             pass
 
@@ -400,10 +609,12 @@ class GestorInterfaz:
             self.botones_accion['actualizar'].config(text="Actualizar")
             self.botones_accion['carpeta'].config(text=" Abrir Carpeta")
             self.botones_accion['terminal'].config(text=" Terminal")
+            self.botones_accion['espacio'].config(text="📊 Más grandes")
 
             self.botones_req['desde_req'].config(text=" Desde requirements.txt")
             self.botones_req['crear_req'].config(text=" Crear requirements.txt")
             self.botones_req['ver_paquetes'].config(text=" Ver instaladas")
+            self.botones_req['sincronizar'].config(text="🔄 Sincronizar")
         except:
             pass
 
@@ -415,35 +626,61 @@ class GestorInterfaz:
             pass
 
     def escribir_en_consola(self, mensaje, etiqueta='normal'):
-        """Escribe un mensaje en la consola"""
-        self.salida_consola.config(state=tk.NORMAL)
+        """Encola un mensaje para la consola; seguro desde cualquier hilo"""
+        self.cola_consola.poner(mensaje, etiqueta)
+
+    def _bombear_consola(self):
+        """Vuelca en la consola un lote de mensajes pendientes"""
+        lote = self.cola_consola.extraer_lote()
+        if lote:
+            self._insertar_lote(lote)
+
+        if self._estado_pendiente is not None:
+            self.variable_estado.set(self._estado_pendiente)
+            self._estado_pendiente = None
+
+        if self._operacion_pendiente is not None:
+            self.variable_operacion.set(self._operacion_pendiente)
+            self._operacion_pendiente = None
+
+        # Si quedó salida pendiente vuelve en cuanto Tk procese sus eventos
+        if self.cola_consola.hay_pendientes():
+            self.ventana.after(1, self._bombear_consola)
+        else:
+            self.ventana.after(self.INTERVALO_CONSOLA_MS, self._bombear_consola)
 
-        # Determina automáticamente la etiqueta según el contenido
-        if mensaje.startswith("✓"):
-            etiqueta = "exito"
-        elif mensaje.startswith("✗"):
-            etiqueta = "error"
-        elif mensaje.startswith("⚠"):
-            etiqueta = "advertencia"
-        elif mensaje.startswith("$"):
-            etiqueta = "comando"
-        elif mensaje.startswith(("📁", "📂", "🐍")):
-            etiqueta = "info"
-
-        self.salida_consola.insert(tk.END, f"{mensaje}\n", etiqueta)
+    @trazar("Pintar consola", 'tk')
+    def _insertar_lote(self, lote):
+        """Inserta un lote completo con un solo insert y un solo desplazamiento"""
+        argumentos = []
+        for texto, etiqueta in agrupar_por_etiqueta(lote):
+            argumentos.extend((texto, etiqueta))
+            self.historial_consola.agregar(texto)
+
+        self.salida_consola.config(state=tk.NORMAL)
+        self.salida_consola.insert(tk.END, *argumentos)
+        self._recortar_consola()
         self.salida_consola.see(tk.END)
         self.salida_consola.config(state=tk.DISABLED)
-        self.ventana.update_idletasks()
+
+    def _recortar_consola(self):
+        """Elimina las líneas más antiguas cuando la consola supera su límite"""
+        total_lineas = int(self.salida_consola.index('end-1c').split('.')[0])
+        exceso = total_lineas - self.LINEAS_MAXIMAS_CONSOLA
+        if exceso > 0:
+            # Recorta por bloques para no pagar un delete en cada lote
+            recorte = max(exceso, self.LINEAS_RECORTE_CONSOLA)
+            self.salida_consola.delete('1.0', f'{recorte + 1}.0')
 
     def limpiar_consola(self):
         """Limpia el contenido de la consola"""
         self.salida_consola.config(state=tk.NORMAL)
         self.salida_consola.delete(1.0, tk.END)
-        self.salida_consola.insert(tk.END, "Consola limpiada\n\n", "exito")
-        self.salida_consola.config(state=tk.DISABLED)
+        self.historial_consola.limpiar()
+        self._insertar_lote([("Consola limpiada\n", "exito")])
 
     def guardar_log(self):
-        """Guarda el contenido de la consola en un archivo"""
+        """Guarda el historial completo de la consola en un archivo"""
         try:
             ruta_archivo = filedialog.asksaveasfilename(
                 title="Guardar log",
@@ -452,9 +689,7 @@ class GestorInterfaz:
             )
 
             if ruta_archivo:
-                contenido = self.salida_consola.get(1.0, tk.END)
-                with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
-                    archivo.write(contenido)
+                self.historial_consola.exportar(ruta_archivo)
 
                 self.escribir_en_consola(f"Log guardado: {ruta_archivo}", "exito")
                 messagebox.showinfo("Éxito", "Log guardado exitosamente")
@@ -462,9 +697,80 @@ class GestorInterfaz:
         except Exception as e:
             self.escribir_en_consola(f"✗ Error guardando log: {str(e)}", "error")
 
+    def mostrar_trabajos(self):
+        """Muestra en la consola los trabajos en ejecución y en cola"""
+        trabajos = self.gestor_entornos.listar_trabajos()
+        if not trabajos:
+            self.escribir_en_consola("No hay trabajos en ejecución ni en cola", "info")
+            return
+
+        for trabajo in trabajos:
+            self.escribir_en_consola(f"  #{trabajo.id} [{trabajo.estado}] {trabajo.descripcion}", "info")
+
+    def cancelar_trabajos(self):
+        """Cancela los trabajos del entorno seleccionado, o todos si no hay ninguno"""
+        proyecto = self.proyecto_actual.get()
+        entorno = self.entorno_actual.get()
+
+        if proyecto and entorno:
+            pregunta = f"¿Cancelar los trabajos del entorno '{entorno}'?"
+        else:
+            pregunta = "¿Cancelar todos los trabajos en ejecución y en cola?"
+
+        if not messagebox.askyesno("Confirmar", pregunta):
+            return
+
+        exito, mensaje = self.gestor_entornos.cancelar_trabajos(proyecto or None, entorno or None)
+        if exito:
+            self.escribir_en_consola(f"⚠ {mensaje}", "advertencia")
+        else:
+            self.escribir_en_consola(mensaje, "info")
+
+    def revisar_almacen(self):
+        """Comparte los archivos de todos los entornos y limpia el almacén"""
+        for exito, mensaje in (self.gestor_entornos.deduplicar_todos(), self.gestor_entornos.recolectar_almacen()):
+            if exito:
+                self.escribir_en_consola(mensaje, "info")
+            else:
+                self.escribir_en_consola(f"✗ {mensaje}", "error")
+
     def cambiar_estado(self, mensaje):
-        """Cambia el texto de la barra de estado"""
-        self.variable_estado.set(mensaje)
+        """Cambia el texto de la barra de estado; se aplica en el siguiente bombeo"""
+        self._estado_pendiente = mensaje
+
+    def _al_terminar_operacion(self, nombre, milisegundos):
+        """Duración de la última operación, desde cualquier hilo; se aplica en el siguiente bombeo"""
+        self._operacion_pendiente = f"⏱ {nombre}: {milisegundos:.0f} ms"
+
+    def alternar_trazas(self):
+        """Empieza a grabar las trazas o, si ya se grababan, para y las guarda"""
+        if not self.trazador.activo:
+            self.trazador.limpiar()
+            self.trazador.activar()
+            self.escribir_en_consola("⏺ Grabando trazas; pulsa de nuevo para guardarlas", "info")
+            self._actualizar_boton_trazas()
+            return
+
+        self.trazador.activar(False)
+        self._actualizar_boton_trazas()
+        ruta_archivo = filedialog.asksaveasfilename(
+            title="Guardar traza",
+            defaultextension=".json",
+            initialfile="traza.json",
+            filetypes=[("Trazas de Chrome / Perfetto", "*.json"), ("Todos los archivos", "*.*")]
+        )
+        if not ruta_archivo:
+            return
+
+        exito, mensaje = self.trazador.exportar(ruta_archivo)
+        if exito:
+            self.escribir_en_consola(f"✓ {mensaje} (se abre en ui.perfetto.dev)", "exito")
+        else:
+            self.escribir_en_consola(f"✗ {mensaje}", "error")
+
+    def _actualizar_boton_trazas(self):
+        """Texto del botón de trazas según se esté grabando o no"""
+        self.boton_trazas.config(text="⏹ Guardar traza" if self.trazador.activo else "⏺ Trazar")
 
     # Métodos para gestión de proyectos
 
@@ -476,57 +782,359 @@ class GestorInterfaz:
             messagebox.showwarning("Advertencia", "Ingresa un nombre para el proyecto")
             return
 
-        exito, mensaje = self.gestor_proyectos.crear_proyecto(nombre)
+        with self.trazador.operacion("Crear proyecto", 'interfaz'):
+            exito, mensaje = self.gestor_proyectos.crear_proyecto(nombre)
+            if exito:
+                self.actualizar_proyectos_cambiados([nombre])
 
         if exito:
             self.escribir_en_consola(f"✓ {mensaje}", "exito")
-            self.actualizar_proyectos()
             self.entrada_proyecto.delete(0, tk.END)
         else:
             self.escribir_en_consola(f"✗ {mensaje}", "error")
             messagebox.showwarning("Error", mensaje)
 
     def actualizar_proyectos(self):
-        """Actualiza el árbol de proyectos"""
-        # Limpia el árbol actual
-        for item in self.arbol_proyectos.get_children():
-            self.arbol_proyectos.delete(item)
+        """Escanea los proyectos en segundo plano y actualiza el árbol según llegan"""
+        self._generacion_escaneo += 1
+        generacion = self._generacion_escaneo
+        self._relecturas.clear()
+        self.cambiar_estado("⏳ Escaneando proyectos...")
+
+        hilo = threading.Thread(target=self._escanear_en_fondo, args=(generacion,), daemon=True)
+        hilo.start()
+
+    @trazar_operacion("Escanear proyectos")
+    def _escanear_en_fondo(self, generacion):
+        """Lista los proyectos y después escanea su contenido, por lotes"""
+        nombres = self.gestor_proyectos.listar_proyectos()
+        self.despachador.despachar(self._mostrar_proyectos, generacion, nombres)
+
+        restantes = list(nombres)
+        total = len(restantes)
+        lote = []
+
+        while restantes and generacion == self._generacion_escaneo:
+            # Los proyectos que el usuario expande pasan por delante
+            nombre = None
+            while self._prioridad_escaneo and nombre is None:
+                candidato = self._prioridad_escaneo.popleft()
+                if candidato in restantes:
+                    nombre = candidato
+            if nombre is None:
+                nombre = restantes[0]
+            restantes.remove(nombre)
+
+            proyecto = self.gestor_proyectos.obtener_proyecto(nombre)
+            if proyecto is not None:
+                self._revisar_sellos(proyecto)
+                lote.append(proyecto)
+
+            if len(lote) >= self.PROYECTOS_POR_LOTE or not restantes or self._prioridad_escaneo:
+                self.despachador.despachar(self._completar_proyectos, generacion, lote, total - len(restantes), total)
+                lote = []
+
+        if not total:
+            self.despachador.despachar(self._completar_proyectos, generacion, [], 0, 0)
+
+        if generacion == self._generacion_escaneo:
+            self._pedir_medidas(nombres)
+
+    def _mostrar_proyectos(self, generacion, nombres):
+        """Pinta los nodos de primer nivel; el contenido llega después"""
+        if generacion != self._generacion_escaneo:
+            return
 
+        hijos_anteriores = self._hijos_deseados
+        estructura_anterior = self.estructura_proyectos
         self.estructura_proyectos = {}
+        self._hijos_deseados = {'': []}
+        cargados = set()
 
-        proyectos = self.gestor_proyectos.obtener_proyectos()
+        for nombre in nombres:
+            id_proyecto = str(self.gestor_proyectos.obtener_ruta_proyecto(nombre))
+            self._hijos_deseados[''].append((id_proyecto, f" {nombre}", self._valores_nodo(id_proyecto), False))
+            self.estructura_proyectos[id_proyecto] = {
+                'tipo': 'proyecto',
+                'nombre': nombre,
+                'ruta': self.gestor_proyectos.obtener_ruta_proyecto(nombre)
+            }
+
+            # Mientras se vuelve a escanear se muestra lo que ya se conocía
+            if id_proyecto in self._proyectos_cargados:
+                hijos = self._hijos_deseados[id_proyecto] = hijos_anteriores.get(id_proyecto, [])
+                for id_hijo, _, _, _ in hijos:
+                    self.estructura_proyectos[id_hijo] = estructura_anterior[id_hijo]
+                cargados.add(id_proyecto)
+            else:
+                self._hijos_deseados[id_proyecto] = [(f"{id_proyecto}::cargando", "  ⏳ Cargando...", (), False)]
+
+        self._proyectos_cargados = cargados
+        self.reconciliador_arbol.reconciliar(self._hijos_deseados)
+
+    def _completar_proyectos(self, generacion, proyectos, hechos, total):
+        """Rellena el contenido de un lote de proyectos ya escaneados"""
+        if generacion != self._generacion_escaneo:
+            return
 
+        padres = []
         for proyecto in proyectos:
-            # Agrega el proyecto al árbol
-            id_proyecto = self.arbol_proyectos.insert('', tk.END, text=f" {proyecto['nombre']}", open=True)
+            id_proyecto = str(proyecto['ruta'])
+            if id_proyecto not in self.estructura_proyectos:
+                continue
+            self._describir_hijos(proyecto)
+            self._proyectos_cargados.add(id_proyecto)
+            padres.append(id_proyecto)
 
-            self.estructura_proyectos[id_proyecto] = {
-                'tipo': 'proyecto',
-                'nombre': proyecto['nombre'],
-                'ruta': proyecto['ruta']
+        self.reconciliador_arbol.reconciliar(self._hijos_deseados, padres)
+
+        if hechos < total:
+            self.cambiar_estado(f"⏳ Escaneando proyectos... {hechos}/{total}")
+        else:
+            self.cambiar_estado(f"✅ {total} proyectos cargados")
+            if 'datos_completos' not in self.cronometro.marcas:
+                self.cronometro.marcar('datos_completos')
+                self._informar_arranque()
+            self._guardar_instantanea(en_fondo=True)
+
+    def al_expandir_arbol(self, event):
+        """Adelanta el escaneo del proyecto que se acaba de expandir"""
+        id_item = self.arbol_proyectos.focus()
+        info = self.estructura_proyectos.get(id_item)
+        if info and info['tipo'] == 'proyecto' and id_item not in self._proyectos_cargados:
+            self._prioridad_escaneo.append(info['nombre'])
+
+    def actualizar_proyectos_cambiados(self, nombres):
+        """Actualiza solo los proyectos indicados, leyéndolos en segundo plano; None equivale a todos"""
+        if nombres is None:
+            self.actualizar_proyectos()
+            return
+
+        self._numero_relectura += 1
+        for nombre in nombres:
+            self._relecturas[nombre] = self._numero_relectura
+
+        hilo = threading.Thread(target=self._releer_en_fondo,
+                                args=(self._generacion_escaneo, self._numero_relectura, list(nombres)), daemon=True)
+        hilo.start()
+
+    @trazar("Releer proyectos", 'disco')
+    def _releer_en_fondo(self, generacion, numero, nombres):
+        """Escanea los proyectos cambiados y revisa sus sellos; el árbol se actualiza en el hilo de Tk"""
+        proyectos = {}
+        for nombre in nombres:
+            proyecto = self.gestor_proyectos.obtener_proyecto(nombre)
+            if proyecto is not None:
+                self._revisar_sellos(proyecto)
+            proyectos[nombre] = proyecto
+
+        self._pedir_medidas(nombres)
+        self.despachador.despachar(self._aplicar_proyectos_cambiados, generacion, numero, proyectos)
+
+    @trazar("Actualizar proyectos", 'interfaz')
+    def _aplicar_proyectos_cambiados(self, generacion, numero, proyectos):
+        """Sustituye en el árbol los proyectos releídos"""
+        # Un escaneo completo lanzado entretanto ya trae datos más nuevos
+        if generacion != self._generacion_escaneo:
+            return
+
+        padres = []
+        cambio_raiz = False
+
+        for nombre, proyecto in proyectos.items():
+            if self._relecturas.get(nombre) != numero:
+                continue
+            del self._relecturas[nombre]
+
+            id_proyecto = str(self.gestor_proyectos.obtener_ruta_proyecto(nombre))
+            self._olvidar_proyecto(id_proyecto)
+
+            if proyecto is None:
+                cambio_raiz = True
+                continue
+
+            if not self.reconciliador_arbol.existe(id_proyecto):
+                cambio_raiz = True
+            self._describir_proyecto(proyecto)
+            padres.append(id_proyecto)
+
+        raiz = self._hijos_deseados['']
+        raiz.sort(key=lambda nodo: self.estructura_proyectos[nodo[0]]['nombre'].lower())
+
+        self.reconciliador_arbol.reconciliar(self._hijos_deseados, [''] if cambio_raiz else padres)
+
+    def _olvidar_proyecto(self, id_proyecto):
+        """Quita un proyecto y sus hijos del estado deseado del árbol"""
+        for id_hijo, _, _, _ in self._hijos_deseados.pop(id_proyecto, []):
+            self.estructura_proyectos.pop(id_hijo, None)
+        self.estructura_proyectos.pop(id_proyecto, None)
+        self._proyectos_cargados.discard(id_proyecto)
+        self._hijos_deseados[''] = [nodo for nodo in self._hijos_deseados[''] if nodo[0] != id_proyecto]
+
+    def _valores_nodo(self, id_nodo):
+        """Columnas de un nodo del árbol: su tamaño si ya se midió"""
+        tamano = self._tamanos.get(id_nodo)
+        return (formatear_bytes(tamano) if tamano is not None else "",)
+
+    def _pedir_medidas(self, nombres):
+        """Encarga medir el espacio de unos proyectos (desde cualquier hilo)"""
+        with self._candado_medidas:
+            self._medidas_pendientes.update(nombres)
+        self._aviso_medidas.set()
+
+    def _medir_en_fondo(self):
+        """Hilo que mide proyectos, entornos y carpetas; solo relee los directorios que cambiaron"""
+        while True:
+            self._aviso_medidas.wait()
+            self._aviso_medidas.clear()
+
+            with self._candado_medidas:
+                nombres = sorted(self._medidas_pendientes)
+                self._medidas_pendientes.clear()
+
+            for nombre in nombres:
+                proyecto = self.gestor_proyectos.obtener_proyecto(nombre)
+                if proyecto is None:
+                    self.calculador_espacio.olvidar(self.gestor_proyectos.obtener_ruta_proyecto(nombre))
+                    continue
+
+                raices = [proyecto['ruta']]
+                raices += [entorno['ruta'] for entorno in proyecto['entornos']]
+                raices += [carpeta['ruta'] for carpeta in proyecto['carpetas']]
+                try:
+                    medidas = self.calculador_espacio.medir(raices)
+                except Exception:
+                    continue
+                self.despachador.despachar(self._aplicar_medidas, str(proyecto['ruta']), medidas)
+
+    def _aplicar_medidas(self, id_proyecto, medidas):
+        """Actualiza la columna de tamaño de un proyecto y sus hijos"""
+        self._tamanos.update(medidas)
+
+        padres = []
+        for padre in ('', id_proyecto):
+            hijos = self._hijos_deseados.get(padre)
+            if not hijos:
+                continue
+            for posicion, (id_nodo, texto, _, abierto) in enumerate(hijos):
+                if id_nodo in medidas:
+                    hijos[posicion] = (id_nodo, texto, self._valores_nodo(id_nodo), abierto)
+            padres.append(padre)
+
+        self.reconciliador_arbol.reconciliar(self._hijos_deseados, padres)
+
+    def mostrar_mas_grandes(self):
+        """Ventana con los entornos y carpetas que más espacio ocupan"""
+        elementos = []
+        for id_nodo, info in self.estructura_proyectos.items():
+            if info['tipo'] in ('entorno', 'carpeta') and id_nodo in self._tamanos:
+                elementos.append((self._tamanos[id_nodo], info))
+
+        if not elementos:
+            messagebox.showinfo("Espacio en disco", "Todavía no se ha medido ningún proyecto")
+            return
+
+        elementos.sort(key=lambda elemento: elemento[0], reverse=True)
+
+        ventana = tk.Toplevel(self.ventana)
+        ventana.title("Elementos más grandes")
+        ventana.geometry("560x420")
+        ventana.columnconfigure(0, weight=1)
+        ventana.rowconfigure(0, weight=1)
+
+        tabla = ttk.Treeview(ventana, columns=('tipo', 'proyecto', 'tamano'), show='tree headings')
+        scroll = ttk.Scrollbar(ventana, orient="vertical", command=tabla.yview)
+        tabla.configure(yscrollcommand=scroll.set)
+        tabla.grid(row=0, column=0, sticky="nsew")
+        scroll.grid(row=0, column=1, sticky="ns")
+
+        tabla.heading('#0', text="Nombre")
+        tabla.heading('tipo', text="Tipo")
+        tabla.heading('proyecto', text="Proyecto")
+        tabla.heading('tamano', text="Tamaño")
+        tabla.column('#0', width=180)
+        tabla.column('tipo', width=80)
+        tabla.column('proyecto', width=160)
+        tabla.column('tamano', width=100, anchor='e')
+
+        for tamano, info in elementos[:self.ELEMENTOS_MAS_GRANDES]:
+            tabla.insert('', 'end', text=info['nombre'], values=(info['tipo'], info['proyecto'], formatear_bytes(tamano)))
+
+    def _revisar_sellos(self, proyecto):
+        """Comprueba el sello de los entornos de un proyecto; solo hace unos stat si nada cambió"""
+        for entorno in proyecto['entornos']:
+            self._estados_sello[str(entorno['ruta'])] = self.gestor_entornos.estado_sello(entorno['ruta'])
+
+    def _describir_proyecto(self, proyecto):
+        """Añade un proyecto y sus hijos al estado deseado del árbol"""
+        # Cada nodo se identifica por su ruta para conservar selección y expansión
+        id_proyecto = str(proyecto['ruta'])
+        self._hijos_deseados[''].append((id_proyecto, f" {proyecto['nombre']}", self._valores_nodo(id_proyecto), False))
+
+        self.estructura_proyectos[id_proyecto] = {
+            'tipo': 'proyecto',
+            'nombre': proyecto['nombre'],
+            'ruta': proyecto['ruta']
+        }
+
+        self._describir_hijos(proyecto)
+        self._proyectos_cargados.add(id_proyecto)
+
+    def _describir_hijos(self, proyecto):
+        """Sustituye los hijos de un proyecto en el estado deseado del árbol"""
+        id_proyecto = str(proyecto['ruta'])
+        for id_hijo, _, _, _ in self._hijos_deseados.get(id_proyecto, []):
+            self.estructura_proyectos.pop(id_hijo, None)
+        hijos = self._hijos_deseados[id_proyecto] = []
+
+        # Agrega los entornos virtuales, con el estado de su sello si lo tienen
+        for entorno in proyecto['entornos']:
+            id_entorno = str(entorno['ruta'])
+            texto = f"  🐍 {entorno['nombre']}" + self.TEXTOS_SELLO.get(self._estados_sello.get(id_entorno), "")
+            hijos.append((id_entorno, texto, self._valores_nodo(id_entorno), False))
+
+            self.estructura_proyectos[id_entorno] = {
+                'tipo': 'entorno',
+                'proyecto': proyecto['nombre'],
+                'nombre': entorno['nombre'],
+                'ruta': entorno['ruta']
+            }
+
+        # Agrega otras carpetas
+        for carpeta in proyecto['carpetas']:
+            id_carpeta = str(carpeta['ruta'])
+            hijos.append((id_carpeta, f" {carpeta['nombre']}", self._valores_nodo(id_carpeta), False))
+
+            self.estructura_proyectos[id_carpeta] = {
+                'tipo': 'carpeta',
+                'proyecto': proyecto['nombre'],
+                'nombre': carpeta['nombre'],
+                'ruta': carpeta['ruta']
             }
 
-            # Agrega los entornos virtuales
-            for entorno in proyecto['entornos']:
-                id_entorno = self.arbol_proyectos.insert(id_proyecto, tk.END, text=f"  🐍 {entorno['nombre']}")
+    def al_cambiar_directorio(self, nombres):
+        """Anota proyectos cambiados (desde cualquier hilo); una ráfaga produce un solo refresco"""
+        with self._candado_cambios:
+            if nombres is None or self._cambios_pendientes is None:
+                self._cambios_pendientes = None
+            else:
+                self._cambios_pendientes.update(nombres)
+
+        self.despachador.despachar(self._aplicar_cambios, clave='arbol')
 
-                self.estructura_proyectos[id_entorno] = {
-                    'tipo': 'entorno',
-                    'proyecto': proyecto['nombre'],
-                    'nombre': entorno['nombre'],
-                    'ruta': entorno['ruta']
-                }
+    def _proyecto_modificado(self, nombre):
+        """Tras crear o clonar un entorno: la caché del proyecto ya no vale"""
+        self.gestor_proyectos.invalidar_cache(nombre)
+        self.al_cambiar_directorio([nombre])
 
-            # Agrega otras carpetas
-            for carpeta in proyecto['carpetas']:
-                id_carpeta = self.arbol_proyectos.insert(id_proyecto, tk.END, text=f" {carpeta['nombre']}")
+    def _aplicar_cambios(self):
+        """Aplica en el hilo principal los cambios acumulados"""
+        with self._candado_cambios:
+            cambios = self._cambios_pendientes
+            self._cambios_pendientes = set()
 
-                self.estructura_proyectos[id_carpeta] = {
-                    'tipo': 'carpeta',
-                    'proyecto': proyecto['nombre'],
-                    'nombre': carpeta['nombre'],
-                    'ruta': carpeta['ruta']
-                }
+        if cambios is None or cambios:
+            self.actualizar_proyectos_cambiados(cambios)
 
     def al_seleccionar_arbol(self, event):
         """Maneja la selección de elementos en el árbol"""
@@ -573,22 +1181,21 @@ class GestorInterfaz:
             mensaje = f"¿Eliminar carpeta '{info['nombre']}'?"
 
         if messagebox.askyesno("Confirmar", mensaje):
-            if info['tipo'] == 'proyecto':
-                exito, resultado = self.gestor_proyectos.eliminar_proyecto(info['nombre'])
-            elif info['tipo'] == 'entorno':
-                exito, resultado = self.gestor_entornos.eliminar_entorno(info['proyecto'], info['nombre'])
-            else:
-                # Para carpetas usa shutil directamente
-                try:
-                    import shutil
-                    shutil.rmtree(info['ruta'])
-                    exito, resultado = True, f"Carpeta '{info['nombre']}' eliminada"
-                except Exception as e:
-                    exito, resultado = False, f"Error: {str(e)}"
+            with self.trazador.operacion(f"Eliminar {info['tipo']}", 'interfaz'):
+                if info['tipo'] == 'proyecto':
+                    exito, resultado = self.gestor_proyectos.eliminar_proyecto(info['nombre'])
+                elif info['tipo'] == 'entorno':
+                    exito, resultado = self.gestor_entornos.eliminar_entorno(info['proyecto'], info['nombre'])
+                else:
+                    exito, resultado = self.gestor_proyectos.eliminar_carpeta(info['proyecto'], info['nombre'])
+
+                if exito:
+                    proyecto = info['nombre'] if info['tipo'] == 'proyecto' else info['proyecto']
+                    self.gestor_proyectos.invalidar_cache(proyecto)
+                    self.actualizar_proyectos_cambiados([proyecto])
 
             if exito:
-                self.escribir_en_consola(f"✓ {resultado}", "exito")
-                self.actualizar_proyectos()
+                self.escribir_en_consola(f"✓ {resultado} (↩ Deshacer durante {self.gestor_proyectos.papelera.espera_deshacer} s)", "exito")
 
                 # Limpia la selección actual si es necesario
                 if info['tipo'] == 'proyecto' and self.proyecto_actual.get() == info['nombre']:
@@ -602,6 +1209,24 @@ class GestorInterfaz:
             else:
                 self.escribir_en_consola(f"✗ {resultado}", "error")
 
+    @trazar_operacion("Deshacer eliminación")
+    def deshacer_eliminacion(self):
+        """Recupera lo último eliminado mientras siga en la papelera"""
+        exito, mensaje = self.gestor_proyectos.deshacer_eliminacion()
+        if exito:
+            self.escribir_en_consola(f"✓ {mensaje}", "exito")
+            self.actualizar_proyectos_cambiados(None)
+        else:
+            self.escribir_en_consola(f"✗ {mensaje}", "error")
+
+    def _progreso_papelera(self, descripcion, hechos, total):
+        """Progreso del borrado en segundo plano (desde el hilo de la papelera)"""
+        if hechos < total:
+            self.cambiar_estado(f"🗑 Borrando {descripcion}: {hechos}/{total} archivos")
+        else:
+            self.cambiar_estado("✅ Listo")
+            self.escribir_en_consola(f"🗑 {descripcion} borrado del disco ({total} archivos)", "info")
+
     def abrir_carpeta(self):
         """Abre la carpeta del elemento seleccionado"""
         seleccion = self.arbol_proyectos.selection()
@@ -672,10 +1297,11 @@ class GestorInterfaz:
             messagebox.showwarning("Advertencia", "Ingresa un nombre para el entorno")
             return
 
+        proyecto = self.proyecto_actual.get()
         exito, mensaje = self.gestor_entornos.crear_entorno(
-            self.proyecto_actual.get(),
+            proyecto,
             nombre,
-            self.actualizar_proyectos
+            lambda: self._proyecto_modificado(proyecto)
         )
 
         if exito:
@@ -685,6 +1311,37 @@ class GestorInterfaz:
             self.escribir_en_consola(f"✗ {mensaje}", "error")
             messagebox.showwarning("Error", mensaje)
 
+    def clonar_entorno(self):
+        """Clona el entorno seleccionado sin reinstalar sus paquetes"""
+        if not self.proyecto_actual.get() or not self.entorno_actual.get():
+            messagebox.showwarning("Advertencia", "Selecciona el entorno que quieres clonar")
+            return
+
+        proyecto = self.proyecto_actual.get()
+        entorno = self.entorno_actual.get()
+
+        nombre = simpledialog.askstring(
+            "Clonar entorno",
+            f"Nombre del nuevo entorno (copia de '{entorno}'):",
+            initialvalue=f"{entorno}-copia",
+            parent=self.ventana
+        )
+        if not nombre:
+            return
+
+        exito, mensaje = self.gestor_entornos.clonar_entorno(
+            proyecto,
+            entorno,
+            nombre.strip(),
+            callback_exito=lambda: self._proyecto_modificado(proyecto)
+        )
+
+        if exito:
+            self.escribir_en_consola(f"✓ {mensaje}", "exito")
+        else:
+            self.escribir_en_consola(f"✗ {mensaje}", "error")
+            messagebox.showwarning("Error", mensaje)
+
     # Métodos para gestión de librerías
 
     def instalar_libreria(self):
@@ -702,10 +1359,12 @@ class GestorInterfaz:
             messagebox.showwarning("Advertencia", "Ingresa el nombre de la librería")
             return
 
+        proyecto = self.proyecto_actual.get()
         exito, mensaje = self.gestor_entornos.instalar_libreria(
-            self.proyecto_actual.get(),
+            proyecto,
             self.entorno_actual.get(),
-            libreria
+            libreria,
+            callback_exito=lambda: self.al_cambiar_directorio([proyecto])
         )
 
         if exito:
@@ -724,6 +1383,23 @@ class GestorInterfaz:
             messagebox.showwarning("Advertencia", "Selecciona un entorno virtual")
             return
 
+        ruta_archivo = self._elegir_requirements()
+        if ruta_archivo:
+            proyecto = self.proyecto_actual.get()
+            exito, mensaje = self.gestor_entornos.instalar_desde_requirements(
+                proyecto,
+                self.entorno_actual.get(),
+                ruta_archivo,
+                callback_exito=lambda: self.al_cambiar_directorio([proyecto])
+            )
+
+            if exito:
+                self.escribir_en_consola(f"✓ {mensaje}", "exito")
+            else:
+                self.escribir_en_consola(f"✗ {mensaje}", "error")
+
+    def _elegir_requirements(self):
+        """Ofrece el requirements.txt del proyecto o deja elegir otro archivo"""
         ruta_proyecto = self.gestor_proyectos.obtener_ruta_proyecto(self.proyecto_actual.get())
         requirements_default = ruta_proyecto / "requirements.txt"
 
@@ -733,29 +1409,109 @@ class GestorInterfaz:
                 f"¿Usar requirements.txt del proyecto?\n\n{requirements_default}"
             )
             if usar_default:
-                ruta_archivo = str(requirements_default)
-            else:
-                ruta_archivo = filedialog.askopenfilename(
-                    title="Seleccionar requirements.txt",
-                    filetypes=[("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
-                )
-        else:
-            ruta_archivo = filedialog.askopenfilename(
-                title="Seleccionar requirements.txt",
-                filetypes=[("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
-            )
+                return str(requirements_default)
 
-        if ruta_archivo:
-            exito, mensaje = self.gestor_entornos.instalar_desde_requirements(
-                self.proyecto_actual.get(),
-                self.entorno_actual.get(),
-                ruta_archivo
+        return filedialog.askopenfilename(
+            title="Seleccionar requirements.txt",
+            filetypes=[("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
+        )
+
+    def sincronizar_requirements(self):
+        """Muestra lo que cambiaría en el entorno para cumplir un requirements.txt y lo aplica"""
+        if not self.proyecto_actual.get():
+            messagebox.showwarning("Advertencia", "Selecciona un proyecto")
+            return
+
+        if not self.entorno_actual.get():
+            messagebox.showwarning("Advertencia", "Selecciona un entorno virtual")
+            return
+
+        ruta_archivo = self._elegir_requirements()
+        if not ruta_archivo:
+            return
+
+        proyecto = self.proyecto_actual.get()
+        entorno = self.entorno_actual.get()
+
+        # Primero una simulación para enseñar el plan; lee el entorno, así que va en segundo plano
+        planes = []
+
+        def _simular():
+            exito, resultado = self.gestor_entornos.sincronizar_requirements(proyecto, entorno, ruta_archivo,
+                                                                             simulacion=True)
+            if not exito:
+                return False, resultado
+            planes.append(resultado)
+            return True, f"Plan de sincronización de '{entorno}' calculado"
+
+        self.gestor_entornos.ejecutor.ejecutar_funcion(
+            f"simular sincronización {entorno} <- {ruta_archivo}",
+            _simular,
+            callback_exito=lambda: self._aplicar_plan_sincronizacion(proyecto, entorno, ruta_archivo, planes[0]),
+            clave=str(self.gestor_entornos.obtener_ruta_entorno(proyecto, entorno))
+        )
+
+    def _aplicar_plan_sincronizacion(self, proyecto, entorno, ruta_archivo, plan):
+        """Muestra el plan simulado y, si el usuario lo confirma, lo aplica"""
+        self.escribir_en_consola(f"Plan de sincronización de '{entorno}' con {ruta_archivo}:", "info")
+        for linea in plan.describir():
+            self.escribir_en_consola(linea, "info")
+
+        if plan.vacio():
+            self.escribir_en_consola("✓ El entorno ya cumple los requisitos, no hace falta ejecutar pip", "exito")
+            # Solo deja el sello para que el árbol lo muestre al día
+            self._sincronizar_con_plan(proyecto, entorno, ruta_archivo, plan)
+            return
+
+        resumen = f"Instalar: {len(plan.instalar)}\nActualizar: {len(plan.actualizar)}\nEliminar: {len(plan.eliminar)}"
+        if not messagebox.askyesno("Confirmar sincronización", f"¿Aplicar el plan mostrado en la consola?\n\n{resumen}"):
+            return
+
+        self._sincronizar_con_plan(proyecto, entorno, ruta_archivo, plan)
+
+    def _sincronizar_con_plan(self, proyecto, entorno, ruta_archivo, plan):
+        """Aplica el plan que vio el usuario; vuelve a leer el archivo, así que va en segundo plano"""
+        def _sincronizar():
+            exito, resultado = self.gestor_entornos.sincronizar_requirements(
+                proyecto, entorno, ruta_archivo, plan=plan,
+                callback_exito=lambda: self.al_cambiar_directorio([proyecto])
             )
+            if not exito:
+                return False, resultado
+            return True, f"Sincronizando '{entorno}'..."
+
+        self.gestor_entornos.ejecutor.ejecutar_funcion(
+            f"sincronizar {entorno} <- {ruta_archivo}",
+            _sincronizar,
+            clave=str(self.gestor_entornos.obtener_ruta_entorno(proyecto, entorno))
+        )
 
-            if exito:
-                self.escribir_en_consola(f"✓ {mensaje}", "exito")
-            else:
-                self.escribir_en_consola(f"✗ {mensaje}", "error")
+    def cambiar_modo_wheelhouse(self):
+        """Aplica al gestor de entornos el modo elegido en las casillas del wheelhouse"""
+        # "Sin conexión" solo tiene efecto con el wheelhouse activado
+        if not self.usar_wheelhouse.get():
+            modo = None
+        elif self.wheelhouse_sin_conexion.get():
+            modo = 'sin_conexion'
+        else:
+            modo = 'primero'
+
+        self.gestor_entornos.modo_wheelhouse = modo
+
+    def agregar_a_wheelhouse(self):
+        """Copia wheels o sdists elegidos por el usuario al wheelhouse local"""
+        rutas = filedialog.askopenfilenames(
+            title="Seleccionar paquetes",
+            filetypes=[("Wheels y sdists", "*.whl *.tar.gz *.zip"), ("Todos los archivos", "*.*")]
+        )
+        if not rutas:
+            return
+
+        exito, mensaje = self.gestor_entornos.agregar_a_wheelhouse(rutas)
+        if exito:
+            self.escribir_en_consola(f"✓ {mensaje}", "exito")
+        else:
+            self.escribir_en_consola(f"✗ {mensaje}", "error")
 
     def crear_requirements(self):
         """Crea un archivo requirements.txt"""
@@ -781,12 +1537,12 @@ class GestorInterfaz:
             exito, mensaje = self.gestor_entornos.crear_requirements(
                 self.proyecto_actual.get(),
                 self.entorno_actual.get(),
-                ruta_archivo
+                ruta_archivo,
+                callback_exito=lambda: messagebox.showinfo("Éxito", "requirements.txt guardado")
             )
 
             if exito:
-                self.escribir_en_consola(f"✓ {mensaje}", "exito")
-                messagebox.showinfo("Éxito", "requirements.txt guardado")
+                self.escribir_en_consola(mensaje, "info")
             else:
                 self.escribir_en_consola(f"✗ {mensaje}", "error")
 
@@ -800,16 +1556,151 @@ class GestorInterfaz:
             messagebox.showwarning("Advertencia", "Selecciona un entorno virtual")
             return
 
-        exito, mensaje = self.gestor_entornos.listar_paquetes(
-            self.proyecto_actual.get(),
-            self.entorno_actual.get()
-        )
+        with self.trazador.operacion("Listar paquetes", 'interfaz'):
+            exito, resultado = self.gestor_entornos.listar_paquetes(
+                self.proyecto_actual.get(),
+                self.entorno_actual.get()
+            )
 
-        if exito:
-            self.escribir_en_consola(f"✓ {mensaje}", "exito")
-        else:
-            self.escribir_en_consola(f"✗ {mensaje}", "error")
+        if not exito:
+            self.escribir_en_consola(f"✗ {resultado}", "error")
+            return
+
+        self.escribir_en_consola(f"✓ {len(resultado)} paquete(s) en '{self.entorno_actual.get()}'", "exito")
+        self._mostrar_tabla_paquetes(self.entorno_actual.get(), resultado)
+
+    def mostrar_historial(self):
+        """Ventana con los comandos ejecutados y consultas sobre su duración"""
+        ventana = tk.Toplevel(self.ventana)
+        ventana.title("Historial de comandos")
+        ventana.geometry("900x460")
+        ventana.columnconfigure(0, weight=1)
+        ventana.rowconfigure(1, weight=1)
+
+        nombres = list(HistorialComandos.TITULOS)
+        consulta = tk.StringVar(value=HistorialComandos.TITULOS['recientes'])
+        dias = tk.StringVar(value="7")
+
+        barra = ttk.Frame(ventana, padding=5)
+        barra.grid(row=0, column=0, columnspan=2, sticky="ew")
+        selector = ttk.Combobox(barra, textvariable=consulta, state='readonly', width=40,
+                                values=[HistorialComandos.TITULOS[nombre] for nombre in nombres])
+        selector.grid(row=0, column=0, padx=(0, 10))
+        ttk.Label(barra, text="Últimos días (0 = todo):").grid(row=0, column=1, padx=(0, 5))
+        ttk.Entry(barra, textvariable=dias, width=5).grid(row=0, column=2, padx=(0, 10))
+
+        tabla = ttk.Treeview(ventana, show='headings')
+        scroll = ttk.Scrollbar(ventana, orient="vertical", command=tabla.yview)
+        tabla.configure(yscrollcommand=scroll.set)
+        tabla.grid(row=1, column=0, sticky="nsew")
+        scroll.grid(row=1, column=1, sticky="ns")
+        ttk.Label(ventana, text="Doble clic en un comando para ver su salida", style='Estado.TLabel',
+                  padding=5).grid(row=2, column=0, columnspan=2, sticky="w")
+
+        def formatear(clave, valor):
+            if valor is None:
+                return "—"
+            if clave == 'inicio':
+                return time.strftime('%Y-%m-%d %H:%M', time.localtime(valor))
+            if clave.endswith('_ms'):
+                return f"{valor:.0f}"
+            return valor
+
+        def rellenar(event=None):
+            nombre = nombres[selector.current()]
+            try:
+                numero_dias = float(dias.get() or 0)
+            except ValueError:
+                numero_dias = 7
+            filas = self.historial_comandos.consultar(nombre, numero_dias)
+
+            columnas = [clave for clave in filas[0] if clave != 'ruta_log'] if filas else ['descripcion']
+            tabla.delete(*tabla.get_children())
+            tabla.configure(columns=columnas)
+            for columna in columnas:
+                tabla.heading(columna, text=columna.replace('_', ' ').capitalize())
+                tabla.column(columna, width=420 if columna == 'descripcion' else 110,
+                             anchor='e' if columna.endswith('_ms') or columna in ('ejecuciones', 'errores') else 'w')
+            for fila in filas:
+                tabla.insert('', 'end', iid=str(fila['id']) if 'id' in fila else None,
+                             values=[formatear(columna, fila[columna]) for columna in columnas])
+
+        def ver_salida(event):
+            id_fila = tabla.focus()
+            if not id_fila.isdigit():
+                return
+            texto = self.historial_comandos.leer_log(int(id_fila))
+            if texto is None:
+                messagebox.showinfo("Historial", "Este comando no tiene salida guardada", parent=ventana)
+                return
+
+            ventana_log = tk.Toplevel(ventana)
+            ventana_log.title(f"Salida del comando {id_fila}")
+            ventana_log.geometry("800x420")
+            salida = scrolledtext.ScrolledText(ventana_log, wrap=tk.NONE, font=('Consolas', 9))
+            salida.pack(fill=tk.BOTH, expand=True)
+            salida.insert(tk.END, texto)
+            salida.config(state=tk.DISABLED)
+
+        ttk.Button(barra, text="Consultar", command=rellenar, style='Boton.TButton').grid(row=0, column=3)
+        selector.bind('<<ComboboxSelected>>', rellenar)
+        tabla.bind('<Double-1>', ver_salida)
+        rellenar()
+
+    def _mostrar_tabla_paquetes(self, nombre_entorno, paquetes):
+        """Abre una ventana con los paquetes en una tabla que se ordena al pulsar las columnas"""
+        ventana = tk.Toplevel(self.ventana)
+        ventana.title(f"Paquetes de {nombre_entorno}")
+        ventana.geometry("620x420")
+        ventana.columnconfigure(0, weight=1)
+        ventana.rowconfigure(0, weight=1)
+
+        columnas = ('nombre', 'version', 'instalador', 'tamano')
+        titulos = {'nombre': "Paquete", 'version': "Versión", 'instalador': "Instalador", 'tamano': "Tamaño"}
+        tabla = ttk.Treeview(ventana, columns=columnas, show='headings')
+        scroll = ttk.Scrollbar(ventana, orient="vertical", command=tabla.yview)
+        tabla.configure(yscrollcommand=scroll.set)
+        tabla.grid(row=0, column=0, sticky="nsew")
+        scroll.grid(row=0, column=1, sticky="ns")
+
+        claves_orden = {
+            'nombre': lambda paquete: paquete['clave'],
+            'version': lambda paquete: clave_version(paquete['version']),
+            'instalador': lambda paquete: paquete['instalador'],
+            'tamano': lambda paquete: paquete['tamano'] or 0
+        }
+        orden = {'columna': 'nombre', 'descendente': False}
+
+        def rellenar():
+            tabla.delete(*tabla.get_children())
+            ordenados = sorted(paquetes, key=claves_orden[orden['columna']], reverse=orden['descendente'])
+            for paquete in ordenados:
+                tamano = formatear_bytes(paquete['tamano']) if paquete['tamano'] is not None else "—"
+                tabla.insert('', 'end', values=(paquete['nombre'], paquete['version'], paquete['instalador'], tamano))
+
+        def ordenar_por(columna):
+            orden['descendente'] = not orden['descendente'] if orden['columna'] == columna else False
+            orden['columna'] = columna
+            rellenar()
+
+        for columna in columnas:
+            tabla.heading(columna, text=titulos[columna], command=lambda columna=columna: ordenar_por(columna))
+        tabla.column('nombre', width=220)
+        tabla.column('version', width=120)
+        tabla.column('instalador', width=100)
+        tabla.column('tamano', width=100, anchor='e')
+
+        rellenar()
 
     def ejecutar(self):
         """Inicia la aplicación"""
-        self.ventana.mainloop()
\ No newline at end of file
+        self.ventana.mainloop()
+        self.vigilante.detener()
+        self._guardar_instantanea()
+        self.historial_comandos.cerrar()
+        self.calculador_espacio.cerrar()
+
+        # Con GESTOR_TRAZAS la traza de toda la sesión se guarda al cerrar; ya no hay consola donde avisar
+        ruta_trazas = os.environ.get(VARIABLE_ENTORNO)
+        if ruta_trazas and self.trazador.eventos():
+            self.trazador.exportar(ruta_trazas)
\ No newline at end of file
@@ -0,0 +1,329 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from src_gestor.proyectos import GestorProyectos
+from src_gestor.entornos import GestorEntornos
+from src_gestor.historial import HistorialComandos
+from src_gestor.trazas import VARIABLE_ENTORNO, obtener_trazador
+
+"""
+Línea de comandos sin interfaz gráfica (python -m src_gestor), con salida en
+texto o en JSON para usarla desde scripts
+"""
+
+class LineaComandos:
+    """Ejecuta una orden sobre los gestores y espera a que terminen sus trabajos"""
+
+    def __init__(self, directorio_base, modo_wheelhouse=None, silencioso=False):
+        self.silencioso = silencioso
+        # Mensajes de error de los trabajos en segundo plano
+        self.errores = []
+
+        self.gestor_proyectos = GestorProyectos(directorio_base)
+        self.historial = HistorialComandos(self.gestor_proyectos.directorio_proyectos)
+        self.historial.al_error = lambda mensaje: self.escribir_salida(f"⚠ {mensaje}", "advertencia")
+        self.gestor_entornos = GestorEntornos(
+            self.gestor_proyectos.directorio_proyectos,
+            self.escribir_salida,
+            modo_wheelhouse=modo_wheelhouse,
+            almacen_compartido=os.environ.get('GESTOR_ALMACEN_COMPARTIDO', '') not in ('', '0'),
+            papelera=self.gestor_proyectos.papelera,
+            historial=self.historial
+        )
+
+    def escribir_salida(self, mensaje, etiqueta='normal'):
+        """Salida de los trabajos; va a stderr para que stdout quede para el resultado"""
+        if etiqueta == 'error':
+            self.errores.append(mensaje)
+        if not self.silencioso:
+            print(mensaje, file=sys.stderr, flush=True)
+
+    def esperar_trabajos(self):
+        """Espera a que no quede ningún trabajo, incluidos los que encolan otros al terminar"""
+        planificador = self.gestor_entornos.ejecutor.planificador
+        while True:
+            trabajos = planificador.listar_trabajos()
+            if not trabajos:
+                return
+            for trabajo in trabajos:
+                trabajo.esperar()
+
+    def ejecutar(self, argumentos):
+        """Lanza la orden y devuelve el resultado como diccionario"""
+        orden = getattr(self, f"orden_{argumentos.orden}")
+        try:
+            exito, mensaje, datos = orden(argumentos)
+        except Exception as e:
+            exito, mensaje, datos = False, f"Error: {str(e)}", None
+
+        if exito:
+            self.esperar_trabajos()
+            if self.errores:
+                exito = False
+                mensaje = self.errores[-1].lstrip('✗ ')
+        # Lo que quede del historial se guarda antes de salir
+        self.historial.cerrar()
+
+        return {
+            'orden': argumentos.orden,
+            'exito': exito,
+            'mensaje': mensaje,
+            'datos': datos,
+            'errores': self.errores
+        }
+
+    def orden_listar(self, argumentos):
+        """Proyectos, un proyecto o los paquetes de un entorno"""
+        if argumentos.entorno:
+            exito, paquetes = self.gestor_entornos.listar_paquetes(argumentos.proyecto, argumentos.entorno)
+            if not exito:
+                return False, paquetes, None
+            datos = [
+                {
+                    'nombre': paquete['nombre'],
+                    'version': paquete['version'],
+                    'instalador': paquete['instalador'],
+                    'tamano': paquete['tamano']
+                }
+                for paquete in paquetes
+            ]
+            return True, f"{len(datos)} paquete(s) en '{argumentos.entorno}'", datos
+
+        if argumentos.proyecto:
+            proyecto = self.gestor_proyectos.obtener_proyecto(argumentos.proyecto)
+            if proyecto is None:
+                return False, f"El proyecto '{argumentos.proyecto}' no existe", None
+            proyectos = [proyecto]
+        else:
+            proyectos = self.gestor_proyectos.obtener_proyectos()
+
+        datos = [
+            {
+                'nombre': proyecto['nombre'],
+                'ruta': str(proyecto['ruta']),
+                'entornos': [entorno['nombre'] for entorno in proyecto['entornos']],
+                'carpetas': [carpeta['nombre'] for carpeta in proyecto['carpetas']]
+            }
+            for proyecto in proyectos
+        ]
+        return True, f"{len(datos)} proyecto(s)", datos
+
+    def orden_crear(self, argumentos):
+        """Crea un proyecto, un entorno o ambos"""
+        mensajes = []
+        if not self.gestor_proyectos.proyecto_existe(argumentos.proyecto) or not argumentos.entorno:
+            exito, mensaje = self.gestor_proyectos.crear_proyecto(argumentos.proyecto)
+            if not exito:
+                return False, mensaje, None
+            mensajes.append(mensaje)
+
+        if argumentos.entorno:
+            exito, mensaje = self.gestor_entornos.crear_entorno(argumentos.proyecto, argumentos.entorno)
+            if not exito:
+                return False, mensaje, None
+            mensajes.append(f"Entorno '{argumentos.entorno}' creado")
+
+        return True, "; ".join(mensajes), None
+
+    def orden_eliminar(self, argumentos):
+        """Elimina un proyecto o un entorno sin pasar por el plazo para deshacer"""
+        if argumentos.entorno:
+            exito, mensaje = self.gestor_entornos.eliminar_entorno(argumentos.proyecto, argumentos.entorno)
+        else:
+            exito, mensaje = self.gestor_proyectos.eliminar_proyecto(argumentos.proyecto)
+
+        if exito:
+            self.gestor_proyectos.papelera.vaciar()
+        return exito, mensaje, None
+
+    def orden_instalar(self, argumentos):
+        """Instala librerías sueltas o un requirements.txt"""
+        if not argumentos.librerias and not argumentos.requirements:
+            return False, "Indica librerías o un archivo con -r", None
+
+        mensajes = []
+        if argumentos.requirements:
+            exito, mensaje = self.gestor_entornos.instalar_desde_requirements(
+                argumentos.proyecto, argumentos.entorno, argumentos.requirements, forzar=argumentos.forzar
+            )
+            if not exito:
+                return False, mensaje, None
+            mensajes.append(mensaje)
+
+        for libreria in argumentos.librerias:
+            exito, mensaje = self.gestor_entornos.instalar_libreria(argumentos.proyecto, argumentos.entorno, libreria)
+            if not exito:
+                return False, mensaje, None
+            mensajes.append(mensaje)
+
+        return True, "; ".join(mensaje.rstrip('.') for mensaje in mensajes), None
+
+    def orden_freeze(self, argumentos):
+        """requirements.txt del entorno, en stdout o en un archivo"""
+        if argumentos.salida:
+            exito, mensaje = self.gestor_entornos.crear_requirements(
+                argumentos.proyecto, argumentos.entorno, argumentos.salida,
+                con_hashes=argumentos.hashes, incluir_todos=argumentos.todos
+            )
+            return exito, f"Requirements guardado en {argumentos.salida}" if exito else mensaje, None
+
+        exito, texto = self.gestor_entornos.texto_requirements(
+            argumentos.proyecto, argumentos.entorno, argumentos.hashes, argumentos.todos
+        )
+        if not exito:
+            return False, texto, None
+        return True, f"Requirements de '{argumentos.entorno}'", texto
+
+    def orden_sincronizar(self, argumentos):
+        """Deja el entorno como pide un requirements.txt"""
+        exito, plan = self.gestor_entornos.sincronizar_requirements(
+            argumentos.proyecto, argumentos.entorno, argumentos.requirements,
+            simulacion=argumentos.simulacion, eliminar_sobrantes=not argumentos.conservar_sobrantes
+        )
+        if not exito:
+            return False, plan, None
+
+        if plan.vacio():
+            mensaje = f"'{argumentos.entorno}' ya cumple {argumentos.requirements}"
+        elif argumentos.simulacion:
+            mensaje = "\n".join(["Plan de sincronización:"] + plan.describir())
+        else:
+            mensaje = f"'{argumentos.entorno}' sincronizado con {argumentos.requirements}"
+        return True, mensaje, plan.a_diccionario()
+
+    def orden_historial(self, argumentos):
+        """Consultas sobre los comandos ejecutados, o la salida guardada de uno"""
+        if argumentos.log is not None:
+            texto = self.historial.leer_log(argumentos.log)
+            if texto is None:
+                return False, f"El comando {argumentos.log} no tiene salida guardada", None
+            return True, f"Salida del comando {argumentos.log}", texto
+
+        filas = self.historial.consultar(argumentos.consulta, argumentos.dias, argumentos.tipo, argumentos.limite)
+        return True, f"{HistorialComandos.TITULOS[argumentos.consulta]}: {len(filas)} fila(s)", filas
+
+def crear_analizador():
+    """Argumentos de la línea de comandos"""
+    analizador = argparse.ArgumentParser(
+        prog="python -m src_gestor",
+        description="Gestor de entornos virtuales sin interfaz gráfica"
+    )
+    analizador.add_argument("--base", default=os.getcwd(), help="directorio de los proyectos (por defecto, el actual)")
+    analizador.add_argument("--json", action="store_true", help="resultado en JSON por stdout")
+    analizador.add_argument("-q", "--silencioso", action="store_true", help="no mostrar la salida de pip")
+    analizador.add_argument("--wheelhouse", choices=["primero", "sin_conexion"],
+                            help="instalar desde el wheelhouse local")
+    analizador.add_argument("--trazas", default=os.environ.get(VARIABLE_ENTORNO) or None, metavar="RUTA",
+                            help="guardar una traza de la orden (formato de Chrome, se abre en Perfetto)")
+
+    ordenes = analizador.add_subparsers(dest="orden", metavar="orden")
+    ordenes.required = True
+
+    listar = ordenes.add_parser("listar", help="proyectos, un proyecto o los paquetes de un entorno")
+    listar.add_argument("proyecto", nargs="?")
+    listar.add_argument("entorno", nargs="?")
+
+    crear = ordenes.add_parser("crear", help="crea un proyecto y, si se indica, un entorno")
+    crear.add_argument("proyecto")
+    crear.add_argument("entorno", nargs="?")
+
+    eliminar = ordenes.add_parser("eliminar", help="elimina un proyecto o un entorno")
+    eliminar.add_argument("proyecto")
+    eliminar.add_argument("entorno", nargs="?")
+
+    instalar = ordenes.add_parser("instalar", help="instala librerías o un requirements.txt")
+    instalar.add_argument("proyecto")
+    instalar.add_argument("entorno")
+    instalar.add_argument("librerias", nargs="*")
+    instalar.add_argument("-r", "--requirements", help="archivo requirements.txt")
+    instalar.add_argument("--forzar", action="store_true", help="instalar aunque el entorno esté al día")
+
+    freeze = ordenes.add_parser("freeze", help="genera el requirements.txt de un entorno")
+    freeze.add_argument("proyecto")
+    freeze.add_argument("entorno")
+    freeze.add_argument("-o", "--salida", help="archivo de destino (por defecto, stdout)")
+    freeze.add_argument("--hashes", action="store_true", help="añadir los hashes del wheelhouse")
+    freeze.add_argument("--todos", action="store_true", help="incluir pip, setuptools y wheel")
+
+    sincronizar = ordenes.add_parser("sincronizar", help="instala y elimina solo la diferencia con un requirements.txt")
+    sincronizar.add_argument("proyecto")
+    sincronizar.add_argument("entorno")
+    sincronizar.add_argument("requirements")
+    sincronizar.add_argument("--simulacion", action="store_true", help="mostrar el plan sin tocar nada")
+    sincronizar.add_argument("--conservar-sobrantes", action="store_true", help="no desinstalar lo que no se pide")
+
+    historial = ordenes.add_parser("historial", help="comandos ejecutados y sus duraciones")
+    historial.add_argument("consulta", nargs="?", default="recientes", choices=list(HistorialComandos.TITULOS),
+                           help="recientes, lentos (instalaciones más lentas), interpretes (mediana al crear "
+                                "entornos) o tipos (resumen)")
+    historial.add_argument("--dias", type=float, default=7, help="solo los últimos días (0 = todo el historial)")
+    historial.add_argument("--tipo", help="tipo de comando: instalar, desinstalar, crear_entorno, funcion...")
+    historial.add_argument("--limite", type=int, default=20, help="filas como máximo")
+    historial.add_argument("--log", type=int, metavar="ID", help="mostrar la salida guardada de un comando")
+
+    return analizador
+
+def main(argv=None):
+    argumentos = crear_analizador().parse_args(argv)
+
+    trazador = obtener_trazador()
+    if argumentos.trazas:
+        trazador.activar()
+
+    linea = LineaComandos(Path(argumentos.base), argumentos.wheelhouse, argumentos.silencioso)
+    with trazador.operacion(argumentos.orden, 'linea_comandos'):
+        resultado = linea.ejecutar(argumentos)
+
+    if argumentos.trazas:
+        exito, mensaje = trazador.exportar(argumentos.trazas)
+        print(mensaje if exito else f"✗ {mensaje}", file=sys.stderr)
+
+    if argumentos.json:
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    elif not resultado['exito']:
+        print(f"✗ {resultado['mensaje']}", file=sys.stderr)
+    elif argumentos.orden == 'listar':
+        _imprimir_listado(argumentos, resultado['datos'])
+    elif argumentos.orden == 'freeze' and not argumentos.salida:
+        sys.stdout.write(resultado['datos'])
+    elif argumentos.orden == 'historial':
+        _imprimir_historial(argumentos, resultado)
+    else:
+        print(f"✓ {resultado['mensaje']}")
+
+    return 0 if resultado['exito'] else 1
+
+def _imprimir_listado(argumentos, datos):
+    """Listado legible de proyectos o paquetes"""
+    if argumentos.entorno:
+        for paquete in datos:
+            print(f"{paquete['nombre']}=={paquete['version']}")
+        return
+
+    for proyecto in datos:
+        print(proyecto['nombre'])
+        for entorno in proyecto['entornos']:
+            print(f"  🐍 {entorno}")
+        for carpeta in proyecto['carpetas']:
+            print(f"  📁 {carpeta}")
+
+def _imprimir_historial(argumentos, resultado):
+    """Tabla de texto con las filas de una consulta del historial"""
+    if argumentos.log is not None:
+        sys.stdout.write(resultado['datos'])
+        return
+
+    print(resultado['mensaje'])
+    for fila in resultado['datos']:
+        partes = []
+        for clave, valor in fila.items():
+            if clave == 'inicio':
+                valor = time.strftime('%Y-%m-%d %H:%M', time.localtime(valor))
+            elif clave == 'ruta_log':
+                continue
+            partes.append(f"{clave}={valor}")
+        print("  " + "  ".join(partes))
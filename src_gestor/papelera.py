@@ -0,0 +1,237 @@
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+import uuid
+
+from src_gestor.utilidades import escribir_atomico
+
+"""
+Papelera del directorio base: eliminar es solo un cambio de nombre y el borrado
+real se hace en segundo plano, pasado un tiempo para poder deshacerlo
+"""
+
+class Papelera:
+    """
+    Cada elemento eliminado se mueve a .papelera/<id>/contenido junto a un info.json
+    con su ruta original. Un hilo lo borra cuando vence el plazo para deshacer; lo
+    que quede a medias por un cierre inesperado se retoma al volver a arrancar.
+    """
+
+    NOMBRE_CARPETA = '.papelera'
+    NOMBRE_INFO = 'info.json'
+    NOMBRE_CONTENIDO = 'contenido'
+    # Elementos que ya se están borrando y no se pueden recuperar
+    SUFIJO_BORRANDO = '.borrando'
+
+    # Segundos durante los que se puede deshacer una eliminación
+    ESPERA_DESHACER = 30
+
+    # Segundos entre avisos de progreso mientras se borra
+    INTERVALO_PROGRESO = 0.5
+
+    def __init__(self, directorio_base, espera_deshacer=None):
+        self.directorio = os.path.join(os.fspath(directorio_base), self.NOMBRE_CARPETA)
+        self.espera_deshacer = self.ESPERA_DESHACER if espera_deshacer is None else espera_deshacer
+
+        # al_progreso(descripcion, hechos, total) se llama desde el hilo de borrado
+        self.al_progreso = None
+
+        # Elementos que aún se pueden deshacer: {id: info} y carpetas ya condenadas
+        self._elementos = {}
+        self._por_borrar = []
+        self._candado = threading.Lock()
+        self._aviso = threading.Event()
+        self._hilo = None
+
+        self._reanudar()
+
+    def enviar(self, ruta, descripcion=None):
+        """Mueve ruta a la papelera al instante y devuelve su id; lanza OSError si no puede"""
+        ruta = os.path.abspath(os.fspath(ruta))
+        os.makedirs(self.directorio, exist_ok=True)
+
+        identificador = uuid.uuid4().hex[:12]
+        carpeta = os.path.join(self.directorio, identificador)
+        info = {
+            'ruta': ruta,
+            'momento': time.time(),
+            'descripcion': descripcion or os.path.basename(ruta)
+        }
+
+        os.mkdir(carpeta)
+        try:
+            # El info.json va antes que el contenido: tras un cierre nunca queda nada sin ruta original
+            escribir_atomico(os.path.join(carpeta, self.NOMBRE_INFO), json.dumps(info))
+            # Mismo sistema de archivos: el cambio de nombre es atómico
+            os.rename(ruta, os.path.join(carpeta, self.NOMBRE_CONTENIDO))
+        except OSError:
+            shutil.rmtree(carpeta, ignore_errors=True)
+            raise
+
+        with self._candado:
+            self._elementos[identificador] = info
+        self._arrancar()
+        return identificador
+
+    def deshacer(self, identificador=None):
+        """Devuelve un elemento a su sitio; sin id, el último eliminado"""
+        with self._candado:
+            if identificador is None and self._elementos:
+                identificador = max(self._elementos, key=lambda clave: self._elementos[clave]['momento'])
+            info = self._elementos.pop(identificador, None)
+
+        if info is None:
+            return False, "No hay ninguna eliminación que deshacer"
+
+        carpeta = os.path.join(self.directorio, identificador)
+        if os.path.exists(info['ruta']):
+            mensaje = f"No se puede restaurar '{info['descripcion']}': ya existe {info['ruta']}"
+        else:
+            try:
+                os.rename(os.path.join(carpeta, self.NOMBRE_CONTENIDO), info['ruta'])
+            except OSError as e:
+                mensaje = f"No se pudo restaurar '{info['descripcion']}': {str(e)}"
+            else:
+                shutil.rmtree(carpeta, ignore_errors=True)
+                return True, f"'{info['descripcion']}' restaurado"
+
+        # Sigue en la papelera con su plazo original
+        with self._candado:
+            self._elementos[identificador] = info
+        self._arrancar()
+        return False, mensaje
+
+    def vaciar(self):
+        """Borra ya, en el hilo que llama, todo lo que hay en la papelera"""
+        with self._candado:
+            for identificador, info in list(self._elementos.items()):
+                del self._elementos[identificador]
+                self._por_borrar.append((self._condenar(identificador), info['descripcion']))
+            por_borrar = self._por_borrar
+            self._por_borrar = []
+
+        for carpeta, descripcion in por_borrar:
+            self._borrar(carpeta, descripcion)
+
+    def _reanudar(self):
+        """Recupera lo que dejó en la papelera una ejecución anterior"""
+        try:
+            entradas = list(os.scandir(self.directorio))
+        except OSError:
+            return
+
+        for entrada in entradas:
+            if not entrada.is_dir(follow_symlinks=False):
+                continue
+
+            try:
+                with open(os.path.join(entrada.path, self.NOMBRE_INFO), encoding='utf-8') as archivo:
+                    info = json.load(archivo)
+            except (OSError, ValueError):
+                info = None
+
+            if entrada.name.endswith(self.SUFIJO_BORRANDO):
+                # Borrado que se interrumpió: se termina sin esperar
+                self._por_borrar.append((entrada.path, info['descripcion'] if info else entrada.name))
+            elif info and os.path.lexists(os.path.join(entrada.path, self.NOMBRE_CONTENIDO)):
+                self._elementos[entrada.name] = info
+            else:
+                # Cierre entre crear la carpeta y mover el contenido: no hay nada que guardar
+                self._por_borrar.append((entrada.path, entrada.name))
+
+        if self._elementos or self._por_borrar:
+            self._arrancar()
+
+    def _arrancar(self):
+        """Pone en marcha el hilo de borrado si no lo está"""
+        with self._candado:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle_borrado, daemon=True)
+                self._hilo.start()
+        self._aviso.set()
+
+    def _bucle_borrado(self):
+        """Borra los elementos cuyo plazo venció y espera al siguiente"""
+        while True:
+            self._aviso.clear()
+            with self._candado:
+                ahora = time.time()
+                for identificador, info in list(self._elementos.items()):
+                    if info['momento'] + self.espera_deshacer <= ahora:
+                        del self._elementos[identificador]
+                        self._por_borrar.append((self._condenar(identificador), info['descripcion']))
+
+                por_borrar = self._por_borrar
+                self._por_borrar = []
+                vencimientos = [info['momento'] + self.espera_deshacer for info in self._elementos.values()]
+
+                if not por_borrar and not vencimientos:
+                    self._hilo = None
+                    return
+
+            for carpeta, descripcion in por_borrar:
+                self._borrar(carpeta, descripcion)
+
+            if vencimientos and not por_borrar:
+                self._aviso.wait(max(0, min(vencimientos) - time.time()))
+
+    def _condenar(self, identificador):
+        """Marca un elemento como en borrado para que ya no se pueda deshacer"""
+        carpeta = os.path.join(self.directorio, identificador)
+        try:
+            os.rename(carpeta, carpeta + self.SUFIJO_BORRANDO)
+            return carpeta + self.SUFIJO_BORRANDO
+        except OSError:
+            return carpeta
+
+    def _borrar(self, carpeta, descripcion):
+        """Borra un árbol de abajo arriba, avisando del progreso por archivos"""
+        # Recorrerlo entero primero da el total para el progreso
+        niveles = list(os.walk(carpeta, topdown=False))
+        total = sum(len(archivos) for _, _, archivos in niveles)
+        hechos = 0
+        ultimo_aviso = time.monotonic()
+
+        for directorio, subdirectorios, archivos in niveles:
+            for nombre in archivos:
+                _quitar(os.path.join(directorio, nombre), os.unlink)
+                hechos += 1
+                if time.monotonic() - ultimo_aviso >= self.INTERVALO_PROGRESO:
+                    ultimo_aviso = time.monotonic()
+                    self._avisar(descripcion, hechos, total)
+
+            for nombre in subdirectorios:
+                ruta = os.path.join(directorio, nombre)
+                # os.walk no entra en los enlaces a directorios: se quita el enlace
+                _quitar(ruta, os.unlink if os.path.islink(ruta) else os.rmdir)
+
+        _quitar(carpeta, os.rmdir)
+        if os.path.lexists(carpeta):
+            # Lo que no se pudo borrar se reintenta en el próximo arranque
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+        self._avisar(descripcion, total, total)
+
+    def _avisar(self, descripcion, hechos, total):
+        """Pasa el progreso del borrado a quien lo haya pedido"""
+        if self.al_progreso is not None:
+            try:
+                self.al_progreso(descripcion, hechos, total)
+            except Exception:
+                pass
+
+def _quitar(ruta, funcion):
+    """Borra un archivo o directorio; en Windows quita antes el atributo de solo lectura"""
+    try:
+        funcion(ruta)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        try:
+            os.chmod(ruta, stat.S_IWRITE)
+            funcion(ruta)
+        except OSError:
+            pass
@@ -0,0 +1,302 @@
+import csv
+import email.parser
+import json
+import os
+import threading
+import urllib.parse
+
+from src_gestor.requisitos import clave_version, normalizar_nombre
+
+"""
+Lectura de los paquetes instalados en un entorno directamente de sus metadatos,
+sin lanzar pip
+"""
+
+# Paquetes que pip freeze omite salvo con --all; desde Python 3.12 solo omite pip
+PAQUETES_BASE = {'pip', 'setuptools', 'wheel', 'distribute'}
+PAQUETES_BASE_312 = {'pip'}
+
+class LectorPaquetes:
+    """Lee los *.dist-info y *.egg-info de site-packages con caché por mtime del directorio"""
+
+    def __init__(self):
+        self._cache = {}
+        self._candado = threading.Lock()
+
+    def listar(self, directorios_site):
+        """Devuelve los paquetes instalados ordenados por nombre"""
+        paquetes = {}
+        for directorio in directorios_site:
+            for registro in self._listar_directorio(os.fspath(directorio)):
+                # Si un paquete aparece en dos carpetas manda la primera, como en sys.path
+                paquetes.setdefault(registro['clave'], registro)
+
+        return sorted(paquetes.values(), key=lambda registro: registro['clave'])
+
+    def invalidar(self, directorio=None):
+        """Olvida la caché de un directorio o de todos"""
+        with self._candado:
+            if directorio is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.fspath(directorio), None)
+
+    def _listar_directorio(self, directorio):
+        """Paquetes de una carpeta site-packages, releída solo si cambió"""
+        try:
+            mtime = os.stat(directorio).st_mtime_ns
+        except OSError:
+            return []
+
+        with self._candado:
+            guardado = self._cache.get(directorio)
+            if guardado and guardado[0] == mtime:
+                return guardado[1]
+
+        registros = []
+        with os.scandir(directorio) as entradas:
+            for entrada in entradas:
+                if entrada.name.endswith('.dist-info') and entrada.is_dir():
+                    registro = leer_dist_info(entrada.path)
+                elif entrada.name.endswith('.egg-info'):
+                    registro = leer_egg_info(entrada.path)
+                else:
+                    continue
+                if registro is not None:
+                    registros.append(registro)
+
+        with self._candado:
+            self._cache[directorio] = (mtime, registros)
+        return registros
+
+def _leer_cabeceras(ruta):
+    """Lee las cabeceras de un METADATA o PKG-INFO (formato de correo)"""
+    with open(ruta, encoding='utf-8', errors='replace') as archivo:
+        return email.parser.Parser().parse(archivo, headersonly=True)
+
+def _leer_texto(ruta):
+    """Contenido de un archivo pequeño de metadatos, o '' si no existe"""
+    try:
+        with open(ruta, encoding='utf-8', errors='replace') as archivo:
+            return archivo.read().strip()
+    except OSError:
+        return ''
+
+def leer_dist_info(ruta):
+    """Registro de un paquete instalado con un *.dist-info"""
+    try:
+        cabeceras = _leer_cabeceras(os.path.join(ruta, 'METADATA'))
+    except OSError:
+        return None
+
+    nombre = cabeceras.get('Name')
+    if not nombre:
+        return None
+
+    return {
+        'nombre': nombre,
+        'clave': normalizar_nombre(nombre),
+        'version': cabeceras.get('Version', ''),
+        'instalador': _leer_texto(os.path.join(ruta, 'INSTALLER')),
+        'tamano': _tamano_record(os.path.join(ruta, 'RECORD')),
+        'dependencias': cabeceras.get_all('Requires-Dist') or [],
+        'metadatos': ruta
+    }
+
+def leer_egg_info(ruta):
+    """Registro de un paquete instalado con un *.egg-info (carpeta o archivo)"""
+    ruta_pkg_info = os.path.join(ruta, 'PKG-INFO') if os.path.isdir(ruta) else ruta
+    try:
+        cabeceras = _leer_cabeceras(ruta_pkg_info)
+    except OSError:
+        return None
+
+    nombre = cabeceras.get('Name')
+    if not nombre:
+        return None
+
+    return {
+        'nombre': nombre,
+        'clave': normalizar_nombre(nombre),
+        'version': cabeceras.get('Version', ''),
+        'instalador': _leer_texto(os.path.join(ruta, 'INSTALLER')) if os.path.isdir(ruta) else '',
+        # Los egg-info no guardan los tamaños de sus archivos
+        'tamano': None,
+        'dependencias': _dependencias_egg_info(ruta),
+        'metadatos': ruta
+    }
+
+def _dependencias_egg_info(ruta):
+    """Convierte requires.txt de un egg-info al formato de Requires-Dist"""
+    if not os.path.isdir(ruta):
+        return []
+
+    dependencias = []
+    marcador = ''
+    for linea in _leer_texto(os.path.join(ruta, 'requires.txt')).splitlines():
+        linea = linea.strip()
+        if not linea:
+            continue
+        if linea.startswith('['):
+            # Secciones [extra], [:marcador] o [extra:marcador]
+            extra, _, condicion = linea.strip('[]').partition(':')
+            partes = []
+            if extra:
+                partes.append(f'extra == "{extra}"')
+            if condicion:
+                partes.append(f'({condicion})' if extra else condicion)
+            marcador = ' and '.join(partes)
+            continue
+        dependencias.append(f"{linea}; {marcador}" if marcador else linea)
+    return dependencias
+
+def leer_record(ruta_record):
+    """Filas (ruta, hash, tamaño) del RECORD de un dist-info"""
+    try:
+        with open(ruta_record, encoding='utf-8', newline='') as archivo:
+            return [tuple(fila) + ('',) * (3 - len(fila)) for fila in csv.reader(archivo) if fila]
+    except OSError:
+        return []
+
+def _tamano_record(ruta_record):
+    """Suma los tamaños que declara el RECORD (los .pyc no llevan tamaño)"""
+    filas = leer_record(ruta_record)
+    if not filas:
+        return None
+
+    total = 0
+    for _, _, tamano in filas:
+        if tamano.isdigit():
+            total += int(tamano)
+    return total
+
+def leer_direct_url(ruta_metadatos):
+    """Contenido de direct_url.json (PEP 610) o None si el paquete vino de un índice"""
+    try:
+        with open(os.path.join(ruta_metadatos, 'direct_url.json'), encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+def lineas_freeze(registro, hashes=None):
+    """Líneas de requirements para un paquete, con el mismo formato que pip freeze"""
+    nombre = registro['nombre']
+    version = registro['version']
+    origen = leer_direct_url(registro['metadatos']) if os.path.isdir(registro['metadatos']) else None
+
+    if origen and 'url' in origen:
+        url = origen['url']
+        subdirectorio = origen.get('subdirectory')
+
+        if origen.get('dir_info', {}).get('editable'):
+            return _lineas_editable(nombre, version, ruta_de_url(url))
+
+        if 'vcs_info' in origen:
+            vcs = origen['vcs_info']
+            linea = f"{nombre} @ {vcs['vcs']}+{url}@{vcs.get('commit_id', '')}"
+            if subdirectorio:
+                linea += f"#subdirectory={subdirectorio}"
+            return [linea]
+
+        linea = f"{nombre} @ {url}"
+        if subdirectorio:
+            linea += f"#subdirectory={subdirectorio}"
+        return [linea]
+
+    linea = f"{nombre}=={version}"
+    if hashes:
+        linea += ''.join(f" \\\n    --hash={huella}" for huella in hashes)
+    return [linea]
+
+def _lineas_editable(nombre, version, ruta):
+    """Instalación editable: con la URL del repositorio git si lo hay, o la ruta local"""
+    raiz_git = _buscar_raiz_git(ruta)
+    if raiz_git is None:
+        return [f"# Editable install with no version control ({nombre}=={version})", f"-e {ruta}"]
+
+    remoto, commit = _leer_git(raiz_git)
+    if not remoto or not commit:
+        return [f"# Editable Git install with no remote ({nombre}=={version})", f"-e {ruta}"]
+
+    if '://' not in remoto and ':' in remoto:
+        # git@host:usuario/repo.git -> ssh://git@host/usuario/repo.git
+        remoto = 'ssh://' + remoto.replace(':', '/', 1)
+
+    fragmento = f"#egg={nombre.replace('-', '_')}"
+    subdirectorio = os.path.relpath(ruta, raiz_git)
+    if subdirectorio != '.':
+        fragmento += f"&subdirectory={subdirectorio.replace(os.sep, '/')}"
+    return [f"-e git+{remoto}@{commit}{fragmento}"]
+
+def ruta_de_url(url):
+    """Convierte una URL file:// en ruta local"""
+    if not url.startswith('file:'):
+        return url
+    # urllib.request arrastra http y ssl: solo se carga si hay alguna URL file://
+    from urllib.request import url2pathname
+    return url2pathname(urllib.parse.urlparse(url).path)
+
+def _buscar_raiz_git(ruta):
+    """Carpeta que contiene .git subiendo desde ruta, o None"""
+    actual = os.path.abspath(ruta)
+    while True:
+        if os.path.exists(os.path.join(actual, '.git')):
+            return actual
+        padre = os.path.dirname(actual)
+        if padre == actual:
+            return None
+        actual = padre
+
+def _leer_git(raiz):
+    """(url de origin, commit de HEAD) leyendo .git directamente, sin lanzar git"""
+    directorio_git = os.path.join(raiz, '.git')
+    if os.path.isfile(directorio_git):
+        # Worktrees y submódulos: .git es un archivo que apunta al directorio real
+        contenido = _leer_texto(directorio_git)
+        if contenido.startswith('gitdir:'):
+            directorio_git = os.path.normpath(os.path.join(raiz, contenido[len('gitdir:'):].strip()))
+
+    directorio_comun = directorio_git
+    ruta_comun = _leer_texto(os.path.join(directorio_git, 'commondir'))
+    if ruta_comun:
+        directorio_comun = os.path.normpath(os.path.join(directorio_git, ruta_comun))
+
+    remoto = None
+    seccion = None
+    for linea in _leer_texto(os.path.join(directorio_comun, 'config')).splitlines():
+        linea = linea.strip()
+        if linea.startswith('['):
+            seccion = linea
+        elif seccion == '[remote "origin"]' and linea.startswith('url'):
+            remoto = linea.split('=', 1)[1].strip()
+
+    commit = _leer_texto(os.path.join(directorio_git, 'HEAD'))
+    if commit.startswith('ref:'):
+        referencia = commit[len('ref:'):].strip()
+        commit = _leer_texto(os.path.join(directorio_git, referencia)) or _leer_texto(os.path.join(directorio_comun, referencia))
+        if not commit:
+            for linea in _leer_texto(os.path.join(directorio_comun, 'packed-refs')).splitlines():
+                partes = linea.split()
+                if len(partes) == 2 and partes[1] == referencia:
+                    commit = partes[0]
+                    break
+
+    return remoto, commit or None
+
+def paquetes_omitidos(version_python=None):
+    """Los que pip freeze omite en un entorno con esa versión de Python (sin versión, como antes de 3.12)"""
+    if version_python and clave_version(version_python)[1] >= (3, 12):
+        return PAQUETES_BASE_312
+    return PAQUETES_BASE
+
+def generar_freeze(paquetes, incluir_todos=False, hashes_por_paquete=None, version_python=None):
+    """Texto de requirements.txt para los paquetes dados, ordenados como en pip freeze"""
+    hashes_por_paquete = hashes_por_paquete or {}
+    omitidos = set() if incluir_todos else paquetes_omitidos(version_python)
+    lineas = []
+    for registro in sorted(paquetes, key=lambda registro: registro['nombre'].lower()):
+        if registro['clave'] in omitidos:
+            continue
+        lineas.extend(lineas_freeze(registro, hashes_por_paquete.get(registro['clave'])))
+
+    return ''.join(linea + '\n' for linea in lineas)
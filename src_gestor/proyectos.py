@@ -1,6 +1,10 @@
-import shutil
+import os
+import time
 from pathlib import Path
 from src_gestor.utilidades import SistemaOperativo, validar_nombre
+from src_gestor.clonado import SUFIJO_CLONANDO
+from src_gestor.papelera import Papelera
+from src_gestor.trazas import trazar
 
 """
 Gestión de Proyectos y directorios
@@ -9,14 +13,28 @@ Gestión de Proyectos y directorios
 class GestorProyectos:
     """Maneja la creación y administración de proyectos"""
 
+    # Carpetas que nunca se muestran como proyectos ni como carpetas de un proyecto
+    EXCLUIDAS_BASE = {'__pycache__', 'src_gestor'}
+    EXCLUIDAS_PROYECTO = {'venvs', '__pycache__', 'src_gestor', 'src', 'node_modules'}
+
+    # Un directorio modificado hace menos de esto puede seguir cambiando sin alterar su mtime
+    MARGEN_MTIME_SEGUNDOS = 2
+
     def __init__(self, directorio_base):
         self.directorio_base = Path(directorio_base)
         self.directorio_proyectos = self.directorio_base
         self.sistema = SistemaOperativo()
 
+        # Resultado del último escaneo de cada proyecto: {ruta: (mtime_ns, info)}
+        self._cache_proyectos = {}
+
         # Asegura que existe el directorio de proyectos
         self.directorio_proyectos.mkdir(exist_ok=True)
 
+        # Lo eliminado se mueve aquí y se borra en segundo plano
+        self.papelera = Papelera(self.directorio_proyectos)
+
+    @trazar("Crear proyecto", 'proyectos')
     def crear_proyecto(self, nombre):
         """Crea un nuevo proyecto con su estructura básica"""
         if not nombre.strip():
@@ -33,12 +51,14 @@ class GestorProyectos:
         try:
             # Crea la estructura del proyecto
             ruta_proyecto.mkdir(parents=True)
+            self.invalidar_cache(nombre)
 
             return True, f"Proyecto '{nombre}' creado exitosamente"
 
         except Exception as e:
             return False, f"Error al crear el proyecto: {str(e)}"
 
+    @trazar("Eliminar proyecto", 'proyectos')
     def eliminar_proyecto(self, nombre):
         """Elimina un proyecto completo"""
         ruta_proyecto = self.directorio_proyectos / nombre
@@ -47,63 +67,165 @@ class GestorProyectos:
             return False, f"El proyecto '{nombre}' no existe"
 
         try:
-            shutil.rmtree(ruta_proyecto)
+            self.papelera.enviar(ruta_proyecto, f"proyecto {nombre}")
+            self.invalidar_cache(nombre)
             return True, f"Proyecto '{nombre}' eliminado"
 
         except Exception as e:
             return False, f"Error al eliminar el proyecto: {str(e)}"
 
+    @trazar("Eliminar carpeta", 'proyectos')
+    def eliminar_carpeta(self, nombre_proyecto, nombre_carpeta):
+        """Elimina una carpeta de un proyecto"""
+        ruta_carpeta = self.directorio_proyectos / nombre_proyecto / nombre_carpeta
+
+        if not ruta_carpeta.exists():
+            return False, f"La carpeta '{nombre_carpeta}' no existe"
+
+        try:
+            self.papelera.enviar(ruta_carpeta, f"carpeta {nombre_proyecto}/{nombre_carpeta}")
+            self.invalidar_cache(nombre_proyecto)
+            return True, f"Carpeta '{nombre_carpeta}' eliminada"
+
+        except Exception as e:
+            return False, f"Error al eliminar la carpeta: {str(e)}"
+
+    def deshacer_eliminacion(self):
+        """Recupera lo último eliminado si aún no se ha borrado del disco"""
+        exito, mensaje = self.papelera.deshacer()
+        if exito:
+            # No se sabe de qué proyecto era; la caché se rehace con el siguiente escaneo
+            self.invalidar_cache()
+        return exito, mensaje
+
+    @trazar("Obtener proyectos", 'proyectos')
     def obtener_proyectos(self):
         """Devuelve una lista de todos los proyectos disponibles"""
         proyectos = []
+        vistos = set()
+
+        for entrada in self._entradas_proyectos():
+            try:
+                mtime = entrada.stat().st_mtime_ns
+            except OSError:
+                continue
+
+            vistos.add(entrada.path)
+            proyectos.append(self._obtener_info_proyecto(entrada.path, entrada.name, mtime))
+
+        self._olvidar_desaparecidos(vistos)
+
+        proyectos.sort(key=lambda proyecto: proyecto['nombre'].lower())
+        return proyectos
+
+    @trazar("Listar proyectos", 'disco')
+    def listar_proyectos(self):
+        """Devuelve los nombres de los proyectos sin escanear su contenido"""
+        entradas = self._entradas_proyectos()
+        self._olvidar_desaparecidos({entrada.path for entrada in entradas})
+        return sorted((entrada.name for entrada in entradas), key=str.lower)
+
+    def _entradas_proyectos(self):
+        """Devuelve las entradas del directorio base que son proyectos"""
+        proyectos = []
 
         try:
-            for directorio in self.directorio_proyectos.iterdir():
-                if (directorio.is_dir() and 
-                    not directorio.name.startswith('.') and
-                    directorio.name not in ['__pycache__', 'src_gestor']):
-                    info_proyecto = {
-                        'nombre': directorio.name,
-                        'ruta': directorio,
-                        'entornos': self._obtener_entornos_proyecto(directorio),
-                        'carpetas': self._obtener_carpetas_proyecto(directorio)
-                    }
-                    proyectos.append(info_proyecto)
-
-        except Exception:
+            with os.scandir(self.directorio_proyectos) as entradas:
+                for entrada in entradas:
+                    if (not entrada.name.startswith('.') and
+                        entrada.name not in self.EXCLUIDAS_BASE and
+                        entrada.is_dir()):
+                        proyectos.append(entrada)
+
+        except OSError:
             pass
 
         return proyectos
 
-    def _obtener_entornos_proyecto(self, ruta_proyecto):
-        """Obtiene los entornos virtuales de un proyecto"""
-        entornos = []
-        directorio_venvs = ruta_proyecto
+    def _olvidar_desaparecidos(self, vistos):
+        """Quita de la caché los proyectos que ya no existen"""
+        for ruta in list(self._cache_proyectos):
+            if ruta not in vistos:
+                self._cache_proyectos.pop(ruta, None)
 
-        if directorio_venvs.exists():
-            for venv_dir in directorio_venvs.iterdir():
-                if venv_dir.is_dir() and (venv_dir / "pyvenv.cfg").exists():
-                    entornos.append({
-                        'nombre': venv_dir.name,
-                        'ruta': venv_dir
-                    })
+    def obtener_proyecto(self, nombre):
+        """Devuelve la información de un único proyecto, o None si ya no existe"""
+        ruta = os.path.join(self.directorio_proyectos, nombre)
+        try:
+            estado = os.stat(ruta)
+        except OSError:
+            self._cache_proyectos.pop(ruta, None)
+            return None
+
+        if not os.path.isdir(ruta):
+            return None
+
+        return self._obtener_info_proyecto(ruta, nombre, estado.st_mtime_ns)
+
+    def invalidar_cache(self, nombre=None):
+        """
+        Fuerza a reescanear un proyecto, o todos si no se indica ninguno. El mtime no basta
+        en sistemas de archivos con fechas poco precisas, así que cada cambio hecho desde
+        la aplicación lo llama.
+        """
+        if nombre is None:
+            self._cache_proyectos.clear()
+        else:
+            self._cache_proyectos.pop(str(self.directorio_proyectos / nombre), None)
+
+    def _obtener_info_proyecto(self, ruta, nombre, mtime):
+        """Devuelve la información de un proyecto, reutilizando la caché si no cambió"""
+        guardado = self._cache_proyectos.get(ruta)
+        if guardado is not None and guardado[0] == mtime:
+            return guardado[1]
+
+        entornos, carpetas = self._escanear_proyecto(ruta)
+        info_proyecto = {
+            'nombre': nombre,
+            'ruta': Path(ruta),
+            'entornos': entornos,
+            'carpetas': carpetas
+        }
+
+        # Un directorio recién modificado puede estar a medio crear (p. ej. un venv sin pyvenv.cfg)
+        if time.time() - mtime / 1e9 >= self.MARGEN_MTIME_SEGUNDOS:
+            self._cache_proyectos[ruta] = (mtime, info_proyecto)
+        else:
+            self._cache_proyectos.pop(ruta, None)
 
-        return entornos
+        return info_proyecto
 
-    def _obtener_carpetas_proyecto(self, ruta_proyecto):
-        """Obtiene las carpetas adicionales de un proyecto"""
+    @trazar("Escanear proyecto", 'disco')
+    def _escanear_proyecto(self, ruta_proyecto):
+        """Clasifica en una sola pasada los entornos y carpetas de un proyecto"""
+        entornos = []
         carpetas = []
 
-        for subdirectorio in ruta_proyecto.iterdir():
-            if (subdirectorio.is_dir() and
-                not subdirectorio.name.startswith('.') and
-                subdirectorio.name not in ['venvs', '__pycache__', 'src_gestor', 'src', 'node_modules']):
-                carpetas.append({
-                    'nombre': subdirectorio.name,
-                    'ruta': subdirectorio
-                })
+        try:
+            with os.scandir(ruta_proyecto) as entradas:
+                for entrada in entradas:
+                    # Un clon a medio copiar ya tiene pyvenv.cfg pero aún no es un entorno
+                    if not entrada.is_dir() or entrada.name.endswith(SUFIJO_CLONANDO):
+                        continue
+
+                    if os.path.exists(os.path.join(entrada.path, "pyvenv.cfg")):
+                        entornos.append({
+                            'nombre': entrada.name,
+                            'ruta': Path(entrada.path)
+                        })
+                    elif (not entrada.name.startswith('.') and
+                          entrada.name not in self.EXCLUIDAS_PROYECTO):
+                        carpetas.append({
+                            'nombre': entrada.name,
+                            'ruta': Path(entrada.path)
+                        })
+
+        except OSError:
+            pass
 
-        return carpetas
+        entornos.sort(key=lambda entorno: entorno['nombre'].lower())
+        carpetas.sort(key=lambda carpeta: carpeta['nombre'].lower())
+        return entornos, carpetas
 
     def abrir_carpeta_proyecto(self, nombre):
         """Abre la carpeta de un proyecto en el explorador"""
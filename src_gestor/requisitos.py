@@ -0,0 +1,373 @@
+import os
+import platform
+import re
+import sys
+
+"""
+Lectura de archivos requirements.txt, nombres de paquete, versiones y marcadores
+sin depender de pip ni de packaging
+"""
+
+PATRON_NOMBRE = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*(.*)$')
+PATRON_VERSION = re.compile(
+    r'^\s*v?(?:(\d+)!)?(\d+(?:\.\d+)*)'
+    r'(?:[-_.]?(a|b|c|rc|alpha|beta|pre|preview)[-_.]?(\d*))?'
+    r'(?:(?:-(\d+))|(?:[-_.]?(post|rev|r)[-_.]?(\d*)))?'
+    r'(?:[-_.]?(dev)[-_.]?(\d*))?'
+    r'(?:\+([a-z0-9]+(?:[-_.][a-z0-9]+)*))?\s*$',
+    re.IGNORECASE
+)
+PATRON_WHEEL = re.compile(
+    r'^(?P<nombre>.+?)-(?P<version>[^-]+)(?:-(?P<build>\d[^-]*))?'
+    r'-(?P<python>[^-]+)-(?P<abi>[^-]+)-(?P<plataforma>[^-]+)\.whl$'
+)
+PATRON_SDIST = re.compile(r'^(?P<nombre>.+)-(?P<version>[^-]+)\.(?:tar\.gz|tar\.bz2|tgz|zip)$')
+
+OPERADORES = ('===', '~=', '==', '!=', '<=', '>=', '<', '>')
+
+# Opciones que pip admite detrás de un requisito: --hash, --config-settings, --global-option...
+PATRON_OPCIONES_REQUISITO = re.compile(r'\s+(--[A-Za-z][A-Za-z-]*(?:[ =]\S+)?)')
+
+def normalizar_nombre(nombre):
+    """Nombre canónico de un paquete (PEP 503)"""
+    return re.sub(r'[-_.]+', '-', nombre).lower()
+
+def clave_version(version):
+    """Tupla comparable para una versión PEP 440; las no válidas quedan al final"""
+    coincidencia = PATRON_VERSION.match(version or '')
+    if not coincidencia:
+        return (-1, (), (0,), (0,), (1,), version or '')
+
+    epoca, release, pre_tipo, pre_num, post_guion, post_tipo, post_num, dev, dev_num, _ = coincidencia.groups()
+    numeros = [int(parte) for parte in release.split('.')]
+    while len(numeros) > 1 and numeros[-1] == 0:
+        numeros.pop()
+
+    # Orden: dev < pre < final < post
+    if pre_tipo:
+        orden_pre = {'a': 0, 'alpha': 0, 'b': 1, 'beta': 1}.get(pre_tipo.lower(), 2)
+        pre = (1, orden_pre, int(pre_num or 0))
+    elif dev and not (post_guion or post_tipo):
+        pre = (0,)
+    else:
+        pre = (2,)
+
+    post = (1, int(post_guion or post_num or 0)) if (post_guion or post_tipo) else (0,)
+    desarrollo = (0, int(dev_num or 0)) if dev else (1,)
+
+    return (int(epoca or 0), tuple(numeros), pre, post, desarrollo, '')
+
+def es_prerelease(version):
+    """Indica si una versión es alfa, beta, rc o de desarrollo"""
+    clave = clave_version(version)
+    return clave[2][0] < 2 or clave[4][0] == 0
+
+def cumple_especificador(version, especificador):
+    """Comprueba una versión contra un especificador como '>=1.0,<2'"""
+    for condicion in filter(None, (parte.strip() for parte in especificador.split(','))):
+        operador = next((op for op in OPERADORES if condicion.startswith(op)), None)
+        if operador is None:
+            return False
+        objetivo = condicion[len(operador):].strip()
+        if not _comparar(version, operador, objetivo):
+            return False
+    return True
+
+def _comparar(version, operador, objetivo):
+    """Aplica un único operador de versión"""
+    if operador == '===':
+        return version == objetivo
+
+    if objetivo.endswith('.*') and operador in ('==', '!='):
+        prefijo = clave_version(objetivo[:-2])[1]
+        propio = clave_version(version)[1]
+        propio = propio + (0,) * (len(prefijo) - len(propio))
+        coincide = propio[:len(prefijo)] == prefijo
+        return coincide if operador == '==' else not coincide
+
+    actual = clave_version(version)
+    meta = clave_version(objetivo)
+
+    if operador == '==':
+        return actual == meta
+    if operador == '!=':
+        return actual != meta
+    if operador == '<=':
+        return actual <= meta
+    if operador == '>=':
+        return actual >= meta
+    if operador == '<':
+        return actual < meta
+    if operador == '>':
+        return actual > meta
+    if operador == '~=':
+        partes = objetivo.split('.')
+        prefijo = '.'.join(partes[:-1]) + '.*' if len(partes) > 1 else objetivo
+        return actual >= meta and _comparar(version, '==', prefijo)
+    return False
+
+def separar_opciones(texto):
+    """
+    Separa las opciones por requisito del final de una línea ('foo==1.0 --hash=sha256:...').
+    Devuelve (texto sin opciones, hashes, otras opciones ya en la forma --nombre=valor).
+    """
+    texto = texto.strip()
+    inicio = re.search(r'\s--[A-Za-z]', texto)
+    if inicio is None:
+        return texto, [], []
+
+    hashes, opciones = [], []
+    for opcion in PATRON_OPCIONES_REQUISITO.findall(texto[inicio.start():]):
+        nombre, _, valor = opcion.replace(' ', '=', 1).partition('=')
+        if nombre == '--hash':
+            hashes.append(valor)
+        else:
+            opciones.append(f"{nombre}={valor}" if valor else nombre)
+    return texto[:inicio.start()].strip(), hashes, opciones
+
+def parsear_requisito(texto):
+    """
+    Divide una línea de requisito en sus partes.
+    Devuelve None si la línea no es un requisito de paquete.
+    """
+    texto, hashes, opciones = separar_opciones(texto)
+    marcador = ''
+    if ';' in texto:
+        texto, marcador = (parte.strip() for parte in texto.split(';', 1))
+
+    coincidencia = PATRON_NOMBRE.match(texto)
+    if not coincidencia:
+        return None
+
+    nombre, extras, resto = coincidencia.groups()
+    url = None
+    especificador = resto.strip()
+    if especificador.startswith('@'):
+        url = especificador[1:].strip()
+        especificador = ''
+    especificador = especificador.strip('()').replace(' ', '')
+
+    return {
+        'nombre': nombre,
+        'clave': normalizar_nombre(nombre),
+        'extras': [extra.strip() for extra in extras.strip('[]').split(',') if extra.strip()] if extras else [],
+        'especificador': especificador,
+        'marcador': marcador,
+        'url': url,
+        'texto': texto if not marcador else f"{texto}; {marcador}",
+        'hashes': hashes,
+        'opciones': opciones
+    }
+
+def leer_archivo_requisitos(ruta, archivos_leidos=None):
+    """
+    Lee un requirements.txt siguiendo -r y -c.
+    Devuelve (requisitos, restricciones, opciones); cada requisito lleva su 'origen'.
+    Si se pasa un conjunto archivos_leidos, se añaden a él las rutas de todos los archivos leídos.
+    """
+    ruta = os.path.abspath(ruta)
+    visitados = archivos_leidos if archivos_leidos is not None else set()
+    requisitos, restricciones, opciones = [], [], []
+
+    if ruta in visitados:
+        return requisitos, restricciones, opciones
+    visitados.add(ruta)
+
+    base = os.path.dirname(ruta)
+    with open(ruta, encoding='utf-8') as archivo:
+        lineas = _unir_continuaciones(archivo.read().splitlines())
+
+    for linea in lineas:
+        linea = re.sub(r'(^|\s)#.*$', '', linea).strip()
+        if not linea:
+            continue
+
+        incluido = _opcion(linea, ('-r', '--requirement'))
+        if incluido is not None:
+            sub = leer_archivo_requisitos(os.path.join(base, incluido), visitados)
+            requisitos.extend(sub[0])
+            restricciones.extend(sub[1])
+            opciones.extend(sub[2])
+            continue
+
+        restriccion = _opcion(linea, ('-c', '--constraint'))
+        if restriccion is not None:
+            sub_requisitos, sub_restricciones, _ = leer_archivo_requisitos(os.path.join(base, restriccion), visitados)
+            restricciones.extend(sub_requisitos + sub_restricciones)
+            continue
+
+        editable = _opcion(linea, ('-e', '--editable'))
+        if editable is not None:
+            requisitos.append({'nombre': None, 'clave': None, 'editable': editable, 'texto': linea, 'origen': ruta,
+                               'extras': [], 'especificador': '', 'marcador': '', 'url': editable,
+                               'hashes': [], 'opciones': []})
+            continue
+
+        if linea.startswith('-'):
+            opciones.append(linea)
+            continue
+
+        requisito = parsear_requisito(linea)
+        if requisito is None:
+            # Rutas o URLs sin nombre: se pasan tal cual a pip
+            texto, hashes, opciones_requisito = separar_opciones(linea)
+            requisitos.append({'nombre': None, 'clave': None, 'texto': texto, 'origen': ruta,
+                               'extras': [], 'especificador': '', 'marcador': '', 'url': texto,
+                               'hashes': hashes, 'opciones': opciones_requisito})
+            continue
+
+        requisito['origen'] = ruta
+        requisitos.append(requisito)
+
+    return requisitos, restricciones, opciones
+
+def _unir_continuaciones(lineas):
+    """Une las líneas que terminan en barra invertida"""
+    resultado = []
+    acumulada = ''
+    for linea in lineas:
+        if linea.endswith('\\'):
+            acumulada += linea[:-1] + ' '
+        else:
+            resultado.append(acumulada + linea)
+            acumulada = ''
+    if acumulada:
+        resultado.append(acumulada)
+    return resultado
+
+def _opcion(linea, nombres):
+    """Devuelve el valor de una opción como '-r archivo' o '--requirement=archivo'"""
+    for nombre in nombres:
+        if linea.startswith(nombre + '=') and nombre.startswith('--'):
+            return linea[len(nombre) + 1:].strip()
+        if linea.startswith(nombre) and len(linea) > len(nombre) and linea[len(nombre)] in ' \t':
+            return linea[len(nombre):].strip()
+        if nombre.startswith('-') and not nombre.startswith('--') and linea.startswith(nombre) and len(linea) > len(nombre):
+            return linea[len(nombre):].strip()
+    return None
+
+def entorno_marcadores(version_python=None):
+    """Variables de marcadores PEP 508; la versión puede ser la de otro intérprete"""
+    version_python = version_python or platform.python_version()
+    partes = version_python.split('.')
+    implementacion = sys.implementation.name
+    return {
+        'os_name': os.name,
+        'sys_platform': sys.platform,
+        'platform_machine': platform.machine(),
+        'platform_python_implementation': platform.python_implementation(),
+        'platform_release': platform.release(),
+        'platform_system': platform.system(),
+        'platform_version': platform.version(),
+        'python_version': '.'.join(partes[:2]),
+        'python_full_version': version_python,
+        'implementation_name': implementacion,
+        'implementation_version': version_python if implementacion == 'cpython' else platform.python_version(),
+        'extra': ''
+    }
+
+def evaluar_marcador(marcador, variables):
+    """
+    Evalúa un marcador PEP 508 como 'python_version < "3.8" and os_name == "nt"'.
+    Lanza ValueError si el marcador está mal escrito.
+    """
+    if not marcador:
+        return True
+    fichas = _tokenizar_marcador(marcador)
+    try:
+        resultado, posicion = _expresion_o(fichas, 0, variables)
+    except IndexError:
+        raise ValueError(f"Marcador no válido: {marcador}") from None
+    if posicion != len(fichas):
+        raise ValueError(f"Marcador no válido: {marcador}")
+    return resultado
+
+OPERADORES_MARCADOR = OPERADORES + ('in', 'not in')
+
+PATRON_FICHA = re.compile(r'\s*(\(|\)|===|==|!=|~=|<=|>=|<|>|not\s+in\b|in\b|and\b|or\b|"[^"]*"|\'[^\']*\'|[A-Za-z_][A-Za-z0-9_.]*)')
+
+def _tokenizar_marcador(texto):
+    fichas = []
+    posicion = 0
+    texto = texto.strip()
+    while posicion < len(texto):
+        coincidencia = PATRON_FICHA.match(texto, posicion)
+        if not coincidencia:
+            raise ValueError(f"Marcador no válido: {texto}")
+        fichas.append(re.sub(r'\s+', ' ', coincidencia.group(1)))
+        posicion = coincidencia.end()
+        while posicion < len(texto) and texto[posicion].isspace():
+            posicion += 1
+    return fichas
+
+def _expresion_o(fichas, posicion, variables):
+    valor, posicion = _expresion_y(fichas, posicion, variables)
+    while posicion < len(fichas) and fichas[posicion] == 'or':
+        derecha, posicion = _expresion_y(fichas, posicion + 1, variables)
+        valor = valor or derecha
+    return valor, posicion
+
+def _expresion_y(fichas, posicion, variables):
+    valor, posicion = _comparacion(fichas, posicion, variables)
+    while posicion < len(fichas) and fichas[posicion] == 'and':
+        derecha, posicion = _comparacion(fichas, posicion + 1, variables)
+        valor = valor and derecha
+    return valor, posicion
+
+def _comparacion(fichas, posicion, variables):
+    if fichas[posicion] == '(':
+        valor, posicion = _expresion_o(fichas, posicion + 1, variables)
+        if fichas[posicion] != ')':
+            raise ValueError(f"Falta ')' en el marcador: {' '.join(fichas)}")
+        return valor, posicion + 1
+
+    operador = fichas[posicion + 1]
+    if operador not in OPERADORES_MARCADOR:
+        raise ValueError(f"Operador no válido en el marcador: {operador}")
+    izquierda = _valor_marcador(fichas[posicion], variables)
+    derecha = _valor_marcador(fichas[posicion + 2], variables)
+    posicion += 3
+
+    if operador == 'in':
+        return izquierda in derecha, posicion
+    if operador == 'not in':
+        return izquierda not in derecha, posicion
+
+    # Las comparaciones de versiones se hacen como versiones; el resto como texto
+    if PATRON_VERSION.match(izquierda) and PATRON_VERSION.match(derecha):
+        return _comparar(izquierda, operador, derecha), posicion
+    if operador == '==':
+        return izquierda == derecha, posicion
+    if operador == '!=':
+        return izquierda != derecha, posicion
+    return False, posicion
+
+def _valor_marcador(ficha, variables):
+    if ficha[0] in '"\'':
+        return ficha[1:-1]
+    valor = variables.get(ficha, '')
+    return normalizar_nombre(valor) if ficha == 'extra' else valor
+
+def parsear_nombre_archivo(nombre_archivo):
+    """Nombre, versión y tipo de un wheel o sdist a partir de su nombre de archivo"""
+    coincidencia = PATRON_WHEEL.match(nombre_archivo)
+    if coincidencia:
+        return {
+            'nombre': coincidencia.group('nombre'),
+            'clave': normalizar_nombre(coincidencia.group('nombre')),
+            'version': coincidencia.group('version'),
+            'tipo': 'wheel',
+            'etiquetas': f"{coincidencia.group('python')}-{coincidencia.group('abi')}-{coincidencia.group('plataforma')}"
+        }
+
+    coincidencia = PATRON_SDIST.match(nombre_archivo)
+    if coincidencia:
+        return {
+            'nombre': coincidencia.group('nombre'),
+            'clave': normalizar_nombre(coincidencia.group('nombre')),
+            'version': coincidencia.group('version'),
+            'tipo': 'sdist',
+            'etiquetas': None
+        }
+
+    return None
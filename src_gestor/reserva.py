@@ -0,0 +1,139 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+
+from src_gestor.clonado import reubicar_entorno
+from src_gestor.trabajos import obtener_planificador
+
+"""
+Reserva de entornos virtuales ya creados para que crear uno nuevo sea instantáneo
+"""
+
+class ReservaEntornos:
+    """Mantiene N entornos listos por intérprete en una carpeta oculta del directorio base"""
+
+    NOMBRE_CARPETA = '.reserva_entornos'
+    SUFIJO_TEMPORAL = '.tmp'
+
+    # Espera entre comprobaciones cuando hay trabajos en marcha
+    ESPERA_OCUPADO = 5
+
+    def __init__(self, directorio_base, tamano=2, planificador=None):
+        self.directorio = os.path.join(os.fspath(directorio_base), self.NOMBRE_CARPETA)
+        self.tamano = tamano
+        self.planificador = planificador or obtener_planificador()
+
+        self._interpretes = set()
+        self._candado = threading.Lock()
+        self._aviso = threading.Event()
+        self._hilo = None
+
+        self._limpiar_temporales()
+
+    def tomar(self, ruta_destino, python):
+        """Mueve un entorno de la reserva a ruta_destino; devuelve False si no hay ninguno"""
+        carpeta = self._carpeta_interprete(python)
+
+        try:
+            with self._candado:
+                for nombre in self._listos(carpeta):
+                    ruta_reserva = os.path.join(carpeta, nombre)
+                    try:
+                        # Mismo sistema de archivos: el cambio de nombre es atómico
+                        os.rename(ruta_reserva, ruta_destino)
+                    except OSError:
+                        continue
+
+                    try:
+                        reubicar_entorno(ruta_destino, ruta_reserva)
+                    except OSError:
+                        shutil.rmtree(ruta_destino, ignore_errors=True)
+                        return False
+                    return True
+
+            return False
+        finally:
+            self.reponer(python)
+
+    def reponer(self, python):
+        """Pide rellenar en segundo plano la reserva de un intérprete"""
+        with self._candado:
+            self._interpretes.add(python)
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle_reposicion, daemon=True)
+                self._hilo.start()
+        self._aviso.set()
+
+    def disponibles(self, python):
+        """Número de entornos listos para un intérprete"""
+        return len(self._listos(self._carpeta_interprete(python)))
+
+    def _carpeta_interprete(self, python):
+        """Carpeta de la reserva para un intérprete concreto"""
+        ruta_real = os.path.realpath(python)
+        clave = hashlib.sha256(ruta_real.encode()).hexdigest()[:12]
+        return os.path.join(self.directorio, clave)
+
+    def _listos(self, carpeta):
+        """Entornos terminados de una carpeta de la reserva"""
+        try:
+            return sorted(
+                nombre for nombre in os.listdir(carpeta)
+                if not nombre.endswith(self.SUFIJO_TEMPORAL)
+            )
+        except OSError:
+            return []
+
+    def _limpiar_temporales(self):
+        """Borra entornos a medio crear que dejó una ejecución anterior"""
+        if not os.path.isdir(self.directorio):
+            return
+
+        for clave in os.listdir(self.directorio):
+            carpeta = os.path.join(self.directorio, clave)
+            if not os.path.isdir(carpeta):
+                continue
+            for nombre in os.listdir(carpeta):
+                if nombre.endswith(self.SUFIJO_TEMPORAL):
+                    shutil.rmtree(os.path.join(carpeta, nombre), ignore_errors=True)
+
+    def _bucle_reposicion(self):
+        """Crea entornos de reserva cuando no hay otros trabajos en marcha"""
+        while True:
+            self._aviso.wait()
+            self._aviso.clear()
+
+            for python in list(self._interpretes):
+                carpeta = self._carpeta_interprete(python)
+                while len(self._listos(carpeta)) < self.tamano:
+                    # Solo se trabaja cuando el gestor está ocioso
+                    while self.planificador.trabajos_activos():
+                        self._aviso.wait(self.ESPERA_OCUPADO)
+                        self._aviso.clear()
+
+                    if not self._crear_reserva(python, carpeta):
+                        break
+
+    def _crear_reserva(self, python, carpeta):
+        """Crea un entorno en la reserva; solo se publica al terminar"""
+        os.makedirs(carpeta, exist_ok=True)
+        nombre = uuid.uuid4().hex
+        temporal = os.path.join(carpeta, nombre + self.SUFIJO_TEMPORAL)
+
+        resultado = subprocess.run(
+            [python, "-m", "venv", temporal],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        if resultado.returncode != 0:
+            shutil.rmtree(temporal, ignore_errors=True)
+            return False
+
+        # Al crearse en la ruta temporal, el entorno guarda esa ruta
+        definitivo = os.path.join(carpeta, nombre)
+        reubicar_entorno(temporal, temporal, definitivo)
+        os.rename(temporal, definitivo)
+        return True
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+
+from src_gestor.utilidades import escribir_atomico
+
+"""
+Sellos que guardan en cada entorno la huella de su última instalación desde
+requirements, para no repetir instalaciones que no cambiarían nada
+"""
+
+NOMBRE_SELLO = '.gestor_sello.json'
+
+AL_DIA = 'al_dia'
+DESACTUALIZADO = 'desactualizado'
+
+def firma_archivo(ruta):
+    """(mtime_ns, tamaño) de un archivo, o None si no existe"""
+    try:
+        info = os.stat(ruta)
+    except OSError:
+        return None
+    return [info.st_mtime_ns, info.st_size]
+
+def hash_archivos(rutas):
+    """Hash conjunto del contenido de varios archivos"""
+    huella = hashlib.sha256()
+    for ruta in sorted(rutas):
+        huella.update(ruta.encode())
+        try:
+            with open(ruta, 'rb') as archivo:
+                huella.update(archivo.read())
+        except OSError:
+            huella.update(b'\0')
+    return huella.hexdigest()
+
+def hash_instalados(paquetes):
+    """Hash del conjunto de paquetes instalados (nombre y versión)"""
+    lineas = sorted(f"{paquete['clave']}=={paquete['version']}" for paquete in paquetes)
+    return hashlib.sha256('\n'.join(lineas).encode()).hexdigest()
+
+def escribir_sello(ruta_entorno, archivo_principal, archivos, version_python, directorios_site, paquetes):
+    """Guarda la huella de una instalación que terminó bien"""
+    ruta_entorno = os.fspath(ruta_entorno)
+    sello = {
+        'archivo': os.path.abspath(archivo_principal),
+        'archivos': {ruta: firma_archivo(ruta) for ruta in archivos},
+        'hash_archivos': hash_archivos(archivos),
+        'version_python': version_python,
+        # Relativos al entorno: si se copia o se mueve, el sello mira sus propios site-packages
+        'site': {os.path.relpath(directorio, ruta_entorno): firma_archivo(directorio) for directorio in directorios_site},
+        'hash_instalados': hash_instalados(paquetes)
+    }
+    sello['huella'] = hashlib.sha256(
+        f"{sello['hash_archivos']}|{version_python}|{sello['hash_instalados']}".encode()
+    ).hexdigest()
+
+    escribir_atomico(os.path.join(ruta_entorno, NOMBRE_SELLO), json.dumps(sello, indent=1))
+    return sello
+
+def leer_sello(ruta_entorno):
+    """Sello de un entorno, o None si nunca se instaló desde requirements"""
+    try:
+        with open(os.path.join(os.fspath(ruta_entorno), NOMBRE_SELLO), encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+def comprobar_sello(ruta_entorno, version_python, obtener_paquetes, archivo_principal=None):
+    """
+    Devuelve None sin sello, AL_DIA o DESACTUALIZADO. En el caso habitual solo hace
+    unos stat; los hashes se recalculan solo si cambió alguna fecha de modificación.
+    obtener_paquetes() devuelve los paquetes instalados cuando hace falta compararlos.
+    """
+    sello = leer_sello(ruta_entorno)
+    if sello is None:
+        return None
+
+    if archivo_principal is not None and os.path.abspath(archivo_principal) != sello.get('archivo'):
+        return DESACTUALIZADO
+
+    if version_python != sello.get('version_python'):
+        return DESACTUALIZADO
+
+    archivos = sello.get('archivos', {})
+    if any(firma_archivo(ruta) != firma for ruta, firma in archivos.items()):
+        # Un archivo tocado pero con el mismo contenido sigue valiendo
+        if hash_archivos(archivos) != sello.get('hash_archivos'):
+            return DESACTUALIZADO
+
+    site = {os.path.join(os.fspath(ruta_entorno), directorio): firma for directorio, firma in sello.get('site', {}).items()}
+    if any(firma_archivo(directorio) != firma for directorio, firma in site.items()):
+        if hash_instalados(obtener_paquetes()) != sello.get('hash_instalados'):
+            return DESACTUALIZADO
+
+    return AL_DIA
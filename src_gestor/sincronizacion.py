@@ -0,0 +1,188 @@
+import os
+
+from src_gestor.requisitos import (
+    parsear_requisito, normalizar_nombre, cumple_especificador, evaluar_marcador
+)
+from src_gestor.paquetes import PAQUETES_BASE, leer_direct_url, ruta_de_url
+
+"""
+Comparación de un requirements.txt con los paquetes instalados para instalar,
+actualizar o eliminar solo lo necesario
+"""
+
+class PlanSincronizacion:
+    """Operaciones necesarias para que un entorno cumpla sus requisitos"""
+
+    def __init__(self):
+        # Textos de requisito para pip install
+        self.instalar = []
+        # (nombre, versión instalada, requisito)
+        self.actualizar = []
+        # Nombres para pip uninstall
+        self.eliminar = []
+        # Opciones por requisito (--hash, --config-settings) de los textos que las llevan
+        self.opciones = {}
+        self.cumplidos = 0
+        self.avisos = []
+
+    def vacio(self):
+        """Indica si el entorno ya cumple los requisitos"""
+        return not (self.instalar or self.actualizar or self.eliminar)
+
+    def requisitos_pip(self):
+        """Requisitos que hay que pasar a pip install"""
+        return self.instalar + [requisito for _, _, requisito in self.actualizar]
+
+    def lineas_pip(self):
+        """Requisitos con sus opciones, para un archivo que pip lea con -r"""
+        return [' '.join([texto] + self.opciones.get(texto, [])) for texto in self.requisitos_pip()]
+
+    def con_hashes(self):
+        """Indica si algún requisito a instalar lleva --hash"""
+        return any(opcion.startswith('--hash=') for opciones in self.opciones.values() for opcion in opciones)
+
+    def a_diccionario(self):
+        """El plan en tipos básicos, para guardarlo o mostrarlo como JSON"""
+        return {
+            'instalar': list(self.instalar),
+            'actualizar': [
+                {'nombre': nombre, 'version': version, 'requisito': requisito}
+                for nombre, version, requisito in self.actualizar
+            ],
+            'eliminar': list(self.eliminar),
+            'cumplidos': self.cumplidos,
+            'avisos': list(self.avisos)
+        }
+
+    def describir(self):
+        """Líneas legibles del plan, para la simulación"""
+        lineas = [f"  + instalar {requisito}" for requisito in self.instalar]
+        lineas += [f"  ↑ actualizar {nombre} {version} -> {requisito}" for nombre, version, requisito in self.actualizar]
+        lineas += [f"  - eliminar {nombre}" for nombre in self.eliminar]
+        lineas += [f"  ⚠ {aviso}" for aviso in self.avisos]
+        lineas.append(f"  = {self.cumplidos} requisito(s) ya cumplidos")
+        return lineas
+
+def planificar(requisitos, restricciones, instalados, variables, eliminar=True):
+    """
+    Compara los requisitos leídos de un archivo con los paquetes instalados.
+    variables son las de los marcadores PEP 508 del intérprete del entorno.
+    """
+    plan = PlanSincronizacion()
+    por_clave = {paquete['clave']: paquete for paquete in instalados}
+
+    limites = {}
+    for restriccion in restricciones:
+        if restriccion.get('clave') and evaluar_marcador(restriccion['marcador'], dict(variables)):
+            limites.setdefault(restriccion['clave'], []).append(restriccion['especificador'])
+
+    # Paquetes pedidos con sus extras; de ellos parte el cierre de dependencias
+    raices = {}
+    conservar_todo = False
+
+    for requisito in requisitos:
+        if requisito.get('clave') is None:
+            instalado = _buscar_por_origen(requisito, instalados)
+            if instalado is None:
+                plan.instalar.append(requisito['texto'])
+                _anotar_opciones(plan, requisito['texto'], requisito)
+                # Sin saber qué paquete es no se puede decidir qué sobra
+                conservar_todo = True
+            else:
+                raices.setdefault(instalado['clave'], set())
+                plan.cumplidos += 1
+            continue
+
+        if not evaluar_marcador(requisito['marcador'], dict(variables)):
+            continue
+
+        clave = requisito['clave']
+        raices.setdefault(clave, set()).update(normalizar_nombre(extra) for extra in requisito['extras'])
+        especificadores = [requisito['especificador']] + limites.get(clave, [])
+        instalado = por_clave.get(clave)
+        texto = requisito['texto'].split(';', 1)[0].strip()
+
+        if instalado is None:
+            plan.instalar.append(texto)
+        elif requisito['url']:
+            origen = leer_direct_url(instalado['metadatos']) or {}
+            if origen.get('url') == requisito['url']:
+                plan.cumplidos += 1
+                continue
+            plan.actualizar.append((instalado['nombre'], instalado['version'], texto))
+        elif all(cumple_especificador(instalado['version'], especificador) for especificador in especificadores):
+            plan.cumplidos += 1
+            continue
+        else:
+            plan.actualizar.append((instalado['nombre'], instalado['version'], texto))
+        _anotar_opciones(plan, texto, requisito)
+
+    if eliminar and not conservar_todo:
+        necesarios = _cierre_dependencias(raices, por_clave, variables)
+        plan.eliminar = sorted(
+            paquete['nombre'] for paquete in instalados
+            if paquete['clave'] not in necesarios and paquete['clave'] not in PAQUETES_BASE
+        )
+    elif eliminar:
+        plan.avisos.append("Hay requisitos sin nombre todavía sin instalar; no se elimina nada")
+
+    return plan
+
+def _anotar_opciones(plan, texto, requisito):
+    """Guarda en el plan las opciones por requisito para cuando haya que instalarlo"""
+    opciones = [f"--hash={valor}" for valor in requisito.get('hashes', [])] + requisito.get('opciones', [])
+    if opciones:
+        plan.opciones[texto] = opciones
+
+def _buscar_por_origen(requisito, instalados):
+    """Paquete instalado desde la misma ruta o URL que un requisito sin nombre"""
+    destino = requisito.get('editable') or requisito.get('url') or ''
+    if not destino:
+        return None
+
+    base = os.path.dirname(requisito.get('origen', ''))
+    if '://' not in destino:
+        destino = os.path.normcase(os.path.abspath(os.path.join(base, destino)))
+
+    for paquete in instalados:
+        origen = leer_direct_url(paquete['metadatos']) if os.path.isdir(paquete['metadatos']) else None
+        if not origen or 'url' not in origen:
+            continue
+        url = origen['url']
+        if url.startswith('file://'):
+            url = os.path.normcase(os.path.abspath(ruta_de_url(url)))
+        if url == destino:
+            return paquete
+    return None
+
+def _cierre_dependencias(raices, por_clave, variables):
+    """Claves de los paquetes pedidos y de todo lo que necesitan, según los metadatos instalados"""
+    necesarios = set()
+    # Cada paquete se recorre una vez sin extras y una vez por cada extra pedido
+    visitados = set()
+    pendientes = [(clave, extra) for clave, extras in raices.items() for extra in [None] + sorted(extras)]
+
+    while pendientes:
+        clave, extra = pendientes.pop()
+        if (clave, extra) in visitados:
+            continue
+        visitados.add((clave, extra))
+        necesarios.add(clave)
+
+        paquete = por_clave.get(clave)
+        if paquete is None:
+            continue
+
+        for dependencia in paquete.get('dependencias', []):
+            sub = parsear_requisito(dependencia)
+            if sub is None:
+                continue
+            if extra is None:
+                aplica = 'extra' not in sub['marcador'] and evaluar_marcador(sub['marcador'], dict(variables))
+            else:
+                aplica = 'extra' in sub['marcador'] and evaluar_marcador(sub['marcador'], dict(variables, extra=extra))
+            if aplica:
+                pendientes.append((sub['clave'], None))
+                pendientes.extend((sub['clave'], normalizar_nombre(sub_extra)) for sub_extra in sub['extras'])
+
+    return necesarios
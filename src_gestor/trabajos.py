@@ -0,0 +1,181 @@
+import itertools
+import os
+import threading
+import time
+
+"""
+Planificación de los comandos en segundo plano: grupo acotado de hilos y
+un único trabajo a la vez por entorno virtual
+"""
+
+class Trabajo:
+    """Un comando encolado o en ejecución; permite cancelarlo y esperar su fin"""
+
+    EN_COLA = "en cola"
+    EJECUTANDO = "ejecutando"
+    COMPLETADO = "completado"
+    ERROR = "error"
+    CANCELADO = "cancelado"
+    TIEMPO_AGOTADO = "tiempo agotado"
+
+    FINALES = (COMPLETADO, ERROR, CANCELADO, TIEMPO_AGOTADO)
+
+    _contador = itertools.count(1)
+
+    def __init__(self, descripcion, funcion, clave=None, planificador=None):
+        self.id = next(self._contador)
+        self.descripcion = descripcion
+        self.funcion = funcion
+        self.clave = clave
+        self.estado = self.EN_COLA
+        self.creado = time.time()
+        self.inicio = None
+        self.fin = None
+
+        # Lo rellena quien ejecuta el trabajo para poder interrumpirlo
+        self.al_cancelar = None
+        self.cancelacion_solicitada = False
+
+        self._planificador = planificador
+        self._terminado = threading.Event()
+
+    def __repr__(self):
+        return f"<Trabajo {self.id} {self.estado}: {self.descripcion}>"
+
+    def cancelar(self):
+        """Cancela el trabajo; devuelve False si ya había terminado"""
+        if self.estado in self.FINALES:
+            return False
+
+        self.cancelacion_solicitada = True
+
+        # Si todavía no empezó basta con sacarlo de la cola
+        if self._planificador is not None and self._planificador._retirar(self):
+            return True
+
+        if self.al_cancelar:
+            self.al_cancelar()
+        return True
+
+    def esperar(self, timeout=None):
+        """Espera a que termine; devuelve True si terminó dentro del plazo"""
+        return self._terminado.wait(timeout)
+
+    def terminado(self):
+        """Indica si el trabajo ya terminó, de la forma que sea"""
+        return self._terminado.is_set()
+
+    def duracion(self):
+        """Segundos de ejecución, o None si no llegó a empezar"""
+        if self.inicio is None:
+            return None
+        return (self.fin or time.time()) - self.inicio
+
+    def _finalizar(self, estado):
+        self.estado = estado
+        self.fin = time.time()
+        self._terminado.set()
+
+class PlanificadorTrabajos:
+    """Reparte los trabajos entre un número fijo de hilos respetando el bloqueo por clave"""
+
+    def __init__(self, max_trabajadores=None):
+        if max_trabajadores is None:
+            max_trabajadores = max(1, min(4, (os.cpu_count() or 2) // 2))
+        self.max_trabajadores = max_trabajadores
+
+        self._condicion = threading.Condition()
+        self._pendientes = []
+        self._en_ejecucion = []
+        self._claves_ocupadas = set()
+        self._hilos = []
+
+    def enviar(self, descripcion, funcion, clave=None):
+        """
+        Encola funcion(trabajo) y devuelve el Trabajo.
+        Los trabajos con la misma clave se ejecutan de uno en uno.
+        """
+        trabajo = Trabajo(descripcion, funcion, clave, self)
+
+        with self._condicion:
+            self._pendientes.append(trabajo)
+
+            # Crea hilos solo hasta el máximo permitido
+            if len(self._hilos) < self.max_trabajadores and len(self._hilos) < len(self._pendientes) + len(self._en_ejecucion):
+                hilo = threading.Thread(target=self._trabajar, daemon=True)
+                self._hilos.append(hilo)
+                hilo.start()
+
+            self._condicion.notify()
+
+        return trabajo
+
+    def listar_trabajos(self):
+        """Devuelve los trabajos en ejecución seguidos de los que esperan"""
+        with self._condicion:
+            return list(self._en_ejecucion) + list(self._pendientes)
+
+    def trabajos_activos(self):
+        """Número de trabajos en ejecución o en cola"""
+        with self._condicion:
+            return len(self._en_ejecucion) + len(self._pendientes)
+
+    def _retirar(self, trabajo):
+        """Quita de la cola un trabajo que aún no empezó"""
+        with self._condicion:
+            if trabajo not in self._pendientes:
+                return False
+            self._pendientes.remove(trabajo)
+
+        trabajo._finalizar(Trabajo.CANCELADO)
+        return True
+
+    def _siguiente_ejecutable(self):
+        """Toma el primer trabajo cuya clave no esté ocupada"""
+        for indice, trabajo in enumerate(self._pendientes):
+            if trabajo.clave is None or trabajo.clave not in self._claves_ocupadas:
+                return self._pendientes.pop(indice)
+        return None
+
+    def _trabajar(self):
+        """Bucle de cada hilo del grupo"""
+        while True:
+            with self._condicion:
+                trabajo = self._siguiente_ejecutable()
+                while trabajo is None:
+                    self._condicion.wait()
+                    trabajo = self._siguiente_ejecutable()
+
+                if trabajo.clave is not None:
+                    self._claves_ocupadas.add(trabajo.clave)
+                trabajo.estado = Trabajo.EJECUTANDO
+                trabajo.inicio = time.time()
+                self._en_ejecucion.append(trabajo)
+
+            # La función recibe su trabajo y devuelve un estado final o un booleano
+            try:
+                resultado = trabajo.funcion(trabajo)
+                if resultado in Trabajo.FINALES:
+                    estado = resultado
+                else:
+                    estado = Trabajo.ERROR if resultado is False else Trabajo.COMPLETADO
+            except Exception:
+                estado = Trabajo.ERROR
+
+            with self._condicion:
+                self._en_ejecucion.remove(trabajo)
+                trabajo._finalizar(estado)
+                self._claves_ocupadas.discard(trabajo.clave)
+                # Un trabajo que esperaba esta clave puede estar listo ahora
+                self._condicion.notify_all()
+
+_planificador_global = None
+_candado_global = threading.Lock()
+
+def obtener_planificador():
+    """Devuelve el planificador compartido por todo el proceso"""
+    global _planificador_global
+    with _candado_global:
+        if _planificador_global is None:
+            _planificador_global = PlanificadorTrabajos()
+        return _planificador_global
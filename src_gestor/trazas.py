@@ -0,0 +1,195 @@
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+"""
+Trazas de las operaciones (tramos con inicio y fin) exportables al formato de
+eventos de Chrome, que abren chrome://tracing y Perfetto
+"""
+
+# Si está definida, las trazas se graban desde el arranque y se guardan en esa ruta al salir
+VARIABLE_ENTORNO = 'GESTOR_TRAZAS'
+
+class Tramo:
+    """Intervalo medido con with; al cerrarse se registra en su trazador"""
+
+    __slots__ = ('trazador', 'nombre', 'categoria', 'argumentos', 'operacion', 'inicio')
+
+    def __init__(self, trazador, nombre, categoria, argumentos, operacion=False):
+        self.trazador = trazador
+        self.nombre = nombre
+        self.categoria = categoria
+        self.argumentos = argumentos
+        self.operacion = operacion
+        self.inicio = None
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        fin = time.perf_counter()
+        if tipo is not None:
+            self.argumentos['error'] = tipo.__name__
+        self.trazador._cerrar(self, fin)
+        return False
+
+    def anotar(self, **argumentos):
+        """Añade datos al tramo (aparecen como args en la traza)"""
+        self.argumentos.update(argumentos)
+
+class _TramoNulo:
+    """Lo que devuelve tramo() con las trazas apagadas: no mide ni guarda nada"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        return False
+
+    def anotar(self, **argumentos):
+        pass
+
+TRAMO_NULO = _TramoNulo()
+
+class Trazador:
+    """Guarda los tramos de todos los hilos en memoria, con un máximo de eventos"""
+
+    MAX_EVENTOS = 100000
+
+    def __init__(self, max_eventos=MAX_EVENTOS):
+        self.activo = False
+        # al_terminar_operacion(nombre, milisegundos), llamado desde el hilo de la operación
+        self.al_terminar_operacion = None
+        self.ultima_operacion = None
+
+        self._eventos = collections.deque(maxlen=max_eventos)
+        self._hilos = {}
+        self._origen = time.perf_counter()
+        self._pid = os.getpid()
+
+    def activar(self, activo=True):
+        """Empieza o deja de grabar; lo grabado se conserva hasta limpiar()"""
+        self.activo = activo
+
+    def tramo(self, nombre, categoria='gestor', **argumentos):
+        """Tramo para usar con with; apagado no cuesta más que esta llamada"""
+        if not self.activo:
+            return TRAMO_NULO
+        return Tramo(self, nombre, categoria, argumentos)
+
+    def operacion(self, nombre, categoria='operacion', **argumentos):
+        """Tramo de algo que espera el usuario: se mide siempre para informar de su duración"""
+        return Tramo(self, nombre, categoria, argumentos, operacion=True)
+
+    def completo(self, nombre, inicio, fin, categoria='gestor', **argumentos):
+        """Registra un tramo ya medido (inicio y fin de time.perf_counter)"""
+        if self.activo:
+            self._registrar(nombre, categoria, inicio, fin, argumentos)
+
+    def instante(self, nombre, categoria='gestor', **argumentos):
+        """Registra un suceso sin duración"""
+        if not self.activo:
+            return
+        evento = self._evento(nombre, categoria, time.perf_counter(), argumentos)
+        evento['ph'] = 'i'
+        evento['s'] = 't'
+        self._eventos.append(evento)
+
+    def eventos(self):
+        """Copia de los eventos grabados"""
+        return list(self._eventos)
+
+    def limpiar(self):
+        """Descarta lo grabado"""
+        self._eventos.clear()
+
+    def a_chrome(self):
+        """Traza en el formato JSON de eventos de Chrome"""
+        metadatos = [{
+            'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'tid': 0,
+            'args': {'name': 'Gestor de Entornos'}
+        }]
+        for hilo, nombre in list(self._hilos.items()):
+            metadatos.append({'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': hilo, 'args': {'name': nombre}})
+
+        return {'traceEvents': metadatos + self.eventos(), 'displayTimeUnit': 'ms'}
+
+    def exportar(self, ruta):
+        """Guarda la traza como JSON de eventos de Chrome"""
+        traza = self.a_chrome()
+        try:
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                json.dump(traza, archivo, ensure_ascii=False, default=str)
+        except OSError as e:
+            return False, f"No se pudo guardar la traza: {str(e)}"
+
+        return True, f"Traza guardada en {ruta} ({len(traza['traceEvents'])} eventos)"
+
+    def _cerrar(self, tramo, fin):
+        if self.activo:
+            self._registrar(tramo.nombre, tramo.categoria, tramo.inicio, fin, tramo.argumentos)
+
+        if tramo.operacion:
+            milisegundos = (fin - tramo.inicio) * 1000
+            self.ultima_operacion = (tramo.nombre, milisegundos)
+            if self.al_terminar_operacion:
+                self.al_terminar_operacion(tramo.nombre, milisegundos)
+
+    def _registrar(self, nombre, categoria, inicio, fin, argumentos):
+        evento = self._evento(nombre, categoria, inicio, argumentos)
+        evento['ph'] = 'X'
+        evento['dur'] = round((fin - inicio) * 1e6, 1)
+        self._eventos.append(evento)
+
+    def _evento(self, nombre, categoria, instante, argumentos):
+        hilo = threading.get_ident()
+        if hilo not in self._hilos:
+            self._hilos[hilo] = threading.current_thread().name
+
+        evento = {
+            'name': nombre,
+            'cat': categoria,
+            # Microsegundos desde que se creó el trazador
+            'ts': round((instante - self._origen) * 1e6, 1),
+            'pid': self._pid,
+            'tid': hilo
+        }
+        if argumentos:
+            evento['args'] = argumentos
+        return evento
+
+_trazador_global = Trazador()
+if os.environ.get(VARIABLE_ENTORNO):
+    _trazador_global.activar()
+
+def obtener_trazador():
+    """Devuelve el trazador compartido por todo el proceso"""
+    return _trazador_global
+
+def trazar(nombre, categoria='gestor'):
+    """Decorador: cada llamada a la función es un tramo de la traza"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _trazador_global.activo:
+                return funcion(*args, **kwargs)
+            with _trazador_global.tramo(nombre, categoria):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def trazar_operacion(nombre, categoria='interfaz'):
+    """Decorador: la función es una operación del usuario y su duración se informa siempre"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with _trazador_global.operacion(nombre, categoria):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
@@ -1,10 +1,17 @@
 import subprocess
 import threading
 import platform
+import signal
 import sys
 import os
+import tempfile
+import time
 from pathlib import Path
 
+from src_gestor.trabajos import Trabajo, obtener_planificador
+from src_gestor.despachador import DespachadorInmediato
+from src_gestor.trazas import obtener_trazador
+
 """
 Utilidades del Gestor de Entornos Virtuales
 Funciones auxiliares para el funcionamiento del sistema
@@ -27,6 +34,20 @@ class SistemaOperativo:
         else:
             return ruta_venv / "bin" / "python"
 
+    def obtener_site_packages_venv(self, ruta_venv):
+        """Devuelve las carpetas site-packages de un entorno virtual"""
+        if self.nombre == "Windows":
+            candidatas = [ruta_venv / "Lib" / "site-packages"]
+        else:
+            # pyvenv.cfg dice qué versión de Python usa el entorno
+            version = leer_pyvenv_cfg(ruta_venv).get('version', '')
+            partes = version.split('.')
+            if len(partes) >= 2:
+                candidatas = [ruta_venv / "lib" / f"python{partes[0]}.{partes[1]}" / "site-packages"]
+            else:
+                candidatas = sorted((ruta_venv / "lib").glob("python*/site-packages"))
+        return [ruta for ruta in candidatas if ruta.is_dir()]
+
     def obtener_pip_venv(self, ruta_venv):
         """Devuelve la ruta del pip dentro de un entorno virtual"""
         if self.nombre == "Windows":
@@ -34,6 +55,30 @@ class SistemaOperativo:
         else:
             return ruta_venv / "bin" / "pip"
 
+    def opciones_grupo_procesos(self):
+        """Argumentos de Popen para lanzar el comando en su propio grupo de procesos"""
+        if self.nombre == "Windows":
+            return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {'start_new_session': True}
+
+    def terminar_grupo_procesos(self, proceso, espera=3):
+        """Termina un proceso y todos sus hijos (p. ej. las compilaciones que lanza pip)"""
+        if proceso.poll() is not None:
+            return
+
+        try:
+            if self.nombre == "Windows":
+                subprocess.run(['taskkill', '/T', '/F', '/PID', str(proceso.pid)], capture_output=True)
+                return
+
+            os.killpg(proceso.pid, signal.SIGTERM)
+            try:
+                proceso.wait(espera)
+            except subprocess.TimeoutExpired:
+                os.killpg(proceso.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
     def abrir_carpeta(self, ruta):
         """Abre una carpeta en el explorador del sistema"""
         try:
@@ -68,56 +113,252 @@ class SistemaOperativo:
 class EjecutorComandos:
     """Ejecuta comandos del sistema de forma asíncrona"""
 
-    def __init__(self, callback_salida=None, callback_estado=None):
+    # Caracteres del nombre de un comando en la traza y en la barra de estado
+    LONGITUD_NOMBRE_TRAZA = 60
+
+    def __init__(self, callback_salida=None, callback_estado=None, planificador=None, despachador=None,
+                 trazador=None, historial=None):
         self.callback_salida = callback_salida
         self.callback_estado = callback_estado
+        self.planificador = planificador or obtener_planificador()
+        self.trazador = trazador or obtener_trazador()
+        # Si se indica (HistorialComandos), cada trabajo queda registrado con su salida
+        self.historial = historial
+        # Decide en qué hilo se ejecutan los callback_exito
+        self.despachador = despachador or DespachadorInmediato()
+        self.sistema = SistemaOperativo()
+
+    def ejecutar(self, comando, directorio_trabajo=None, callback_exito=None, clave=None, tiempo_limite=None):
+        """
+        Encola un comando para ejecutarlo en segundo plano y devuelve su Trabajo.
+        Los comandos con la misma clave (p. ej. la ruta de un entorno) nunca se solapan.
+        Si se indica tiempo_limite (segundos) el comando se interrumpe al superarlo.
+        """
+        def _ejecutar(trabajo):
+            estado = Trabajo.ERROR
+            vigilante_tiempo = None
+            registro = None
+            proceso = None
 
-    def ejecutar(self, comando, directorio_trabajo=None, callback_exito=None):
-        """Ejecuta un comando en un hilo separado"""
-        def _ejecutar():
             try:
-                if self.callback_estado:
-                    self.callback_estado("Ejecutando...")
+                if trabajo.cancelacion_solicitada:
+                    estado = Trabajo.CANCELADO
+                    return estado
+
+                self._informar_estado()
+
+                if self.historial is not None:
+                    registro = self.historial.empezar(' '.join(comando), comando, directorio_trabajo, clave, trabajo)
 
                 if self.callback_salida:
                     self.callback_salida(f"$ {' '.join(comando)}", "comando")
 
-                proceso = subprocess.Popen(
-                    comando,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    universal_newlines=True,
-                    bufsize=1,
-                    cwd=directorio_trabajo
-                )
+                with self.trazador.tramo("Arrancar proceso", 'proceso'):
+                    proceso = subprocess.Popen(
+                        comando,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        universal_newlines=True,
+                        bufsize=1,
+                        cwd=directorio_trabajo,
+                        **self.sistema.opciones_grupo_procesos()
+                    )
+
+                # Cancelar o agotar el tiempo termina todo el grupo de procesos
+                motivo = []
+
+                def interrumpir(causa):
+                    motivo.append(causa)
+                    self.sistema.terminar_grupo_procesos(proceso)
+
+                # Se interrumpe en otro hilo para no bloquear a quien cancela
+                trabajo.al_cancelar = lambda: threading.Thread(
+                    target=interrumpir, args=(Trabajo.CANCELADO,), daemon=True
+                ).start()
+                if trabajo.cancelacion_solicitada:
+                    interrumpir(Trabajo.CANCELADO)
+
+                if tiempo_limite:
+                    vigilante_tiempo = threading.Timer(tiempo_limite, interrumpir, (Trabajo.TIEMPO_AGOTADO,))
+                    vigilante_tiempo.daemon = True
+                    vigilante_tiempo.start()
 
                 # Lee la salida línea por línea
-                for linea in iter(proceso.stdout.readline, ''):
-                    if linea and self.callback_salida:
-                        self.callback_salida(linea.rstrip())
+                with self.trazador.tramo("Leer salida", 'proceso'):
+                    for linea in iter(proceso.stdout.readline, ''):
+                        if not linea:
+                            continue
+                        if registro is not None:
+                            registro.escribir(linea)
+                        if self.callback_salida:
+                            self.callback_salida(linea.rstrip())
 
-                proceso.wait()
+                with self.trazador.tramo("Esperar fin del proceso", 'proceso'):
+                    proceso.wait()
 
-                if proceso.returncode == 0:
+                if motivo:
+                    estado = motivo[0]
+                    if self.callback_salida:
+                        if estado == Trabajo.CANCELADO:
+                            self.callback_salida("⚠ Comando cancelado", "advertencia")
+                        else:
+                            self.callback_salida(f"✗ Tiempo límite agotado ({tiempo_limite} s)", "error")
+                elif proceso.returncode == 0:
+                    estado = Trabajo.COMPLETADO
                     if self.callback_salida:
                         self.callback_salida("✓ Comando completado exitosamente", "exito")
                     if callback_exito:
-                        # Programa el callback para ejecutarse en el hilo principal
-                        threading.Timer(0.1, callback_exito).start()
+                        self.despachador.despachar(callback_exito)
                 else:
                     if self.callback_salida:
                         self.callback_salida(f"✗ Error en comando (código {proceso.returncode})", "error")
 
+                return estado
+
+            except Exception as e:
+                if self.callback_salida:
+                    self.callback_salida(f"✗ Error: {str(e)}", "error")
+                return estado
+            finally:
+                if vigilante_tiempo is not None:
+                    vigilante_tiempo.cancel()
+                if registro is not None:
+                    registro.terminar(estado, proceso.returncode if proceso is not None else None)
+                # Este trabajo aún cuenta como activo, por eso se descuenta
+                self._informar_estado(terminando=True, trabajo=trabajo, estado=estado)
+
+        if self.callback_estado and self.planificador.trabajos_activos():
+            self.callback_estado(f"En cola: {' '.join(comando)}")
+
+        nombre = ' '.join([Path(comando[0]).name] + [str(parte) for parte in comando[1:]])
+        return self.planificador.enviar(' '.join(comando), self._trazado(nombre, 'comando', _ejecutar), clave)
+
+    def ejecutar_funcion(self, descripcion, funcion, callback_exito=None, clave=None):
+        """
+        Encola una función de Python como trabajo y devuelve su Trabajo.
+        La función devuelve (exito, mensaje), igual que los métodos de los gestores.
+        """
+        def _ejecutar(trabajo):
+            estado = Trabajo.ERROR
+            registro = None
+            try:
+                if trabajo.cancelacion_solicitada:
+                    estado = Trabajo.CANCELADO
+                    return estado
+
+                self._informar_estado()
+
+                if self.historial is not None:
+                    registro = self.historial.empezar(descripcion, entorno=clave, trabajo=trabajo)
+
+                if self.callback_salida:
+                    self.callback_salida(f"$ {descripcion}", "comando")
+
+                exito, mensaje = funcion()
+
+                if exito:
+                    estado = Trabajo.COMPLETADO
+                    if self.callback_salida:
+                        self.callback_salida(f"✓ {mensaje}", "exito")
+                    if callback_exito:
+                        self.despachador.despachar(callback_exito)
+                elif self.callback_salida:
+                    self.callback_salida(f"✗ {mensaje}", "error")
+
+                return estado
+
             except Exception as e:
                 if self.callback_salida:
                     self.callback_salida(f"✗ Error: {str(e)}", "error")
+                return estado
             finally:
-                if self.callback_estado:
-                    self.callback_estado("Listo")
+                if registro is not None:
+                    registro.terminar(estado)
+                self._informar_estado(terminando=True, trabajo=trabajo, estado=estado)
 
-        hilo = threading.Thread(target=_ejecutar, daemon=True)
-        hilo.start()
+        if self.callback_estado and self.planificador.trabajos_activos():
+            self.callback_estado(f"En cola: {descripcion}")
+
+        return self.planificador.enviar(descripcion, self._trazado(descripcion, 'funcion', _ejecutar), clave)
+
+    def _trazado(self, nombre, categoria, funcion):
+        """Envuelve la función de un trabajo para medirlo como operación; anota cuánto esperó en cola"""
+        if len(nombre) > self.LONGITUD_NOMBRE_TRAZA:
+            nombre = nombre[:self.LONGITUD_NOMBRE_TRAZA - 1] + "…"
+
+        def _ejecutar(trabajo):
+            espera_cola = round((time.time() - trabajo.creado) * 1000, 1)
+            with self.trazador.operacion(nombre, categoria, trabajo=trabajo.id, espera_cola_ms=espera_cola) as tramo:
+                estado = funcion(trabajo)
+                tramo.anotar(estado=estado)
+            return estado
+
+        return _ejecutar
+
+    def listar_trabajos(self):
+        """Devuelve los trabajos en ejecución y en cola"""
+        return self.planificador.listar_trabajos()
+
+    def _informar_estado(self, terminando=False, trabajo=None, estado=None):
+        """Actualiza la barra de estado según los trabajos pendientes"""
+        if not self.callback_estado:
+            return
+
+        activos = self.planificador.trabajos_activos() - (1 if terminando else 0)
+        if estado == Trabajo.CANCELADO:
+            self.callback_estado(f"⚠ Trabajo #{trabajo.id} cancelado")
+        elif estado == Trabajo.TIEMPO_AGOTADO:
+            self.callback_estado(f"✗ Trabajo #{trabajo.id}: tiempo límite agotado")
+        elif activos <= 0:
+            self.callback_estado("Listo")
+        elif activos == 1:
+            self.callback_estado("Ejecutando...")
+        else:
+            self.callback_estado(f"Ejecutando... ({activos} trabajos activos)")
 
 def validar_nombre(nombre):
     """Valida que un nombre solo contenga caracteres permitidos"""
-    return nombre.replace('_', '').replace('-', '').isalnum()
\ No newline at end of file
+    return nombre.replace('_', '').replace('-', '').isalnum()
+
+def leer_pyvenv_cfg(ruta_venv):
+    """Devuelve las claves de pyvenv.cfg; 'version' se rellena también desde 'version_info'"""
+    valores = {}
+    try:
+        with open(Path(ruta_venv) / "pyvenv.cfg", encoding='utf-8') as archivo:
+            for linea in archivo:
+                clave, separador, valor = linea.partition('=')
+                if separador:
+                    valores[clave.strip()] = valor.strip()
+    except OSError:
+        return valores
+
+    if 'version' not in valores and 'version_info' in valores:
+        valores['version'] = valores['version_info']
+    return valores
+
+def escribir_atomico(ruta, texto):
+    """Escribe un archivo de texto de golpe: se ve el contenido anterior o el nuevo, nunca uno a medias"""
+    ruta = Path(ruta)
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, prefix=f".{ruta.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8', newline='') as archivo:
+            archivo.write(texto)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        # mkstemp crea el archivo solo legible por el usuario
+        os.chmod(temporal, os.stat(ruta).st_mode & 0o7777 if ruta.exists() else 0o644)
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
+
+def formatear_bytes(cantidad):
+    """Convierte un número de bytes en texto legible"""
+    for unidad in ('B', 'KB', 'MB', 'GB'):
+        if abs(cantidad) < 1024:
+            return f"{cantidad:.0f} {unidad}" if unidad == 'B' else f"{cantidad:.1f} {unidad}"
+        cantidad /= 1024
+    return f"{cantidad:.1f} TB"
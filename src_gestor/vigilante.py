@@ -0,0 +1,215 @@
+import abc
+import ctypes
+import ctypes.util
+import os
+import platform
+import select
+import struct
+import threading
+import time
+
+from src_gestor.proyectos import GestorProyectos
+
+"""
+Vigilancia del directorio de proyectos para reflejar cambios hechos fuera del gestor
+"""
+
+# Constantes de inotify (linux/inotify.h)
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+MASCARA_EVENTOS = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO |
+                   IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+CABECERA_EVENTO = struct.Struct('iIII')
+
+class VigilanteBase(abc.ABC):
+    """Base común: agrupa los cambios y avisa cuando el directorio se calma"""
+
+    def __init__(self, directorio, al_cambiar, espera=0.3, espera_maxima=2.0):
+        self.directorio = str(directorio)
+        self.al_cambiar = al_cambiar
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+        self._detener = threading.Event()
+        self._hilo = None
+
+        # Proyectos con cambios pendientes de notificar; None significa "todos"
+        self._pendientes = set()
+        self._primer_cambio = None
+        self._ultimo_cambio = None
+
+    def iniciar(self):
+        """Arranca la vigilancia en un hilo de fondo"""
+        self._hilo = threading.Thread(target=self._bucle, daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene la vigilancia"""
+        self._detener.set()
+
+    @abc.abstractmethod
+    def _bucle(self):
+        """Vigila hasta que se pida detener, llamando a _registrar y _emitir_si_calmado"""
+
+    def _registrar(self, nombre_proyecto):
+        """Anota un proyecto cambiado (None fuerza a revisar todos)"""
+        ahora = time.monotonic()
+        if self._primer_cambio is None:
+            self._primer_cambio = ahora
+        self._ultimo_cambio = ahora
+
+        if nombre_proyecto is None or self._pendientes is None:
+            self._pendientes = None
+        else:
+            self._pendientes.add(nombre_proyecto)
+
+    def _emitir_si_calmado(self):
+        """Avisa de los cambios acumulados si ya pasó el tiempo de espera"""
+        if self._primer_cambio is None:
+            return
+
+        ahora = time.monotonic()
+        if (ahora - self._ultimo_cambio < self.espera and
+                ahora - self._primer_cambio < self.espera_maxima):
+            return
+
+        cambios = self._pendientes
+        self._pendientes = set()
+        self._primer_cambio = None
+        self._ultimo_cambio = None
+
+        try:
+            self.al_cambiar(cambios)
+        except Exception:
+            pass
+
+def es_proyecto_visible(nombre):
+    """Filtra los nombres que nunca se muestran como proyecto"""
+    return not nombre.startswith('.') and nombre not in GestorProyectos.EXCLUIDAS_BASE
+
+class VigilanteInotify(VigilanteBase):
+    """Vigila con inotify (Linux) el directorio base y cada proyecto"""
+
+    def __init__(self, directorio, al_cambiar, **opciones):
+        super().__init__(directorio, al_cambiar, **opciones)
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "No se pudo inicializar inotify")
+
+        # Descriptor de vigilancia -> nombre del proyecto ('' para el directorio base)
+        self._vigilados = {}
+        self._agregar_vigilancia(self.directorio, '')
+
+        with os.scandir(self.directorio) as entradas:
+            for entrada in entradas:
+                if es_proyecto_visible(entrada.name) and entrada.is_dir():
+                    self._agregar_vigilancia(entrada.path, entrada.name)
+
+    def _agregar_vigilancia(self, ruta, nombre_proyecto):
+        """Registra un directorio en inotify"""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(ruta), MASCARA_EVENTOS)
+        if wd >= 0:
+            self._vigilados[wd] = nombre_proyecto
+
+    def _bucle(self):
+        try:
+            while not self._detener.is_set():
+                listos, _, _ = select.select([self._fd], [], [], self.espera / 2)
+                if listos:
+                    self._leer_eventos()
+                self._emitir_si_calmado()
+        finally:
+            os.close(self._fd)
+
+    def _leer_eventos(self):
+        """Lee y procesa los eventos disponibles"""
+        try:
+            datos = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        desplazamiento = 0
+        while desplazamiento < len(datos):
+            wd, mascara, _, longitud = CABECERA_EVENTO.unpack_from(datos, desplazamiento)
+            desplazamiento += CABECERA_EVENTO.size
+            nombre = os.fsdecode(datos[desplazamiento:desplazamiento + longitud].rstrip(b'\0'))
+            desplazamiento += longitud
+            self._procesar_evento(wd, mascara, nombre)
+
+    def _procesar_evento(self, wd, mascara, nombre):
+        """Traduce un evento de inotify al proyecto afectado"""
+        if mascara & IN_Q_OVERFLOW:
+            self._registrar(None)
+            return
+
+        if mascara & IN_IGNORED:
+            self._vigilados.pop(wd, None)
+            return
+
+        proyecto = self._vigilados.get(wd)
+        if proyecto is None or not (mascara & IN_ISDIR):
+            return
+
+        if proyecto == '':
+            # Cambio en el directorio base: aparece o desaparece un proyecto
+            if not es_proyecto_visible(nombre):
+                return
+            if mascara & (IN_CREATE | IN_MOVED_TO):
+                self._agregar_vigilancia(os.path.join(self.directorio, nombre), nombre)
+            self._registrar(nombre)
+        else:
+            self._registrar(proyecto)
+
+class VigilanteSondeo(VigilanteBase):
+    """Alternativa portátil: compara periódicamente el mtime de cada proyecto"""
+
+    def __init__(self, directorio, al_cambiar, intervalo=2.0, **opciones):
+        opciones.setdefault('espera', 0)
+        super().__init__(directorio, al_cambiar, **opciones)
+        self.intervalo = intervalo
+        self._instantanea = self._tomar_instantanea()
+
+    def _tomar_instantanea(self):
+        """Devuelve {proyecto: mtime} del directorio base"""
+        instantanea = {}
+        try:
+            with os.scandir(self.directorio) as entradas:
+                for entrada in entradas:
+                    if es_proyecto_visible(entrada.name) and entrada.is_dir():
+                        try:
+                            instantanea[entrada.name] = entrada.stat().st_mtime_ns
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+        return instantanea
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo):
+            actual = self._tomar_instantanea()
+            for nombre in set(actual) | set(self._instantanea):
+                if actual.get(nombre) != self._instantanea.get(nombre):
+                    self._registrar(nombre)
+            self._instantanea = actual
+            self._emitir_si_calmado()
+
+def crear_vigilante(directorio, al_cambiar):
+    """Devuelve el mejor vigilante disponible para el sistema actual"""
+    if platform.system() == "Linux":
+        try:
+            return VigilanteInotify(directorio, al_cambiar)
+        except (OSError, AttributeError):
+            pass
+    return VigilanteSondeo(directorio, al_cambiar)
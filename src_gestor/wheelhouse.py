@@ -0,0 +1,226 @@
+import json
+import os
+import shutil
+import threading
+import zipfile
+
+from src_gestor.requisitos import (
+    parsear_nombre_archivo, parsear_requisito, normalizar_nombre,
+    cumple_especificador, evaluar_marcador, entorno_marcadores
+)
+from src_gestor.utilidades import escribir_atomico
+
+"""
+Almacén local de wheels y sdists para instalar sin conexión
+"""
+
+class AlmacenWheels:
+    """Carpeta de paquetes dentro del directorio base con un índice de su contenido"""
+
+    NOMBRE_CARPETA = '.wheelhouse'
+    # En una subcarpeta: guardar el índice no cambia la fecha de modificación del almacén
+    CARPETA_INDICE = '.indice'
+    NOMBRE_INDICE = 'indice.json'
+    EXTENSIONES = ('.whl', '.tar.gz', '.tar.bz2', '.tgz', '.zip')
+
+    def __init__(self, directorio_base):
+        self.directorio = os.path.join(os.fspath(directorio_base), self.NOMBRE_CARPETA)
+        self.ruta_indice = os.path.join(self.directorio, self.CARPETA_INDICE, self.NOMBRE_INDICE)
+        self._candado = threading.Lock()
+        self._indice = None
+        self._mtime_indice = None
+
+    def existe(self):
+        """Indica si el almacén ya se creó"""
+        return os.path.isdir(self.directorio)
+
+    def agregar(self, ruta_archivo):
+        """Copia un wheel o sdist al almacén"""
+        nombre_archivo = os.path.basename(ruta_archivo)
+        if not nombre_archivo.endswith(self.EXTENSIONES):
+            return False, f"'{nombre_archivo}' no es un wheel ni un sdist"
+
+        info = parsear_nombre_archivo(nombre_archivo)
+        if info is None:
+            return False, f"No se reconoce el nombre de archivo '{nombre_archivo}'"
+
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            destino = os.path.join(self.directorio, nombre_archivo)
+            if os.path.abspath(ruta_archivo) != os.path.abspath(destino):
+                shutil.copy2(ruta_archivo, destino)
+            self.actualizar_indice()
+            return True, f"'{nombre_archivo}' añadido al wheelhouse"
+
+        except Exception as e:
+            return False, f"Error al añadir al wheelhouse: {str(e)}"
+
+    def sdists_sin_wheel(self):
+        """Sdists del almacén para los que todavía no hay un wheel de la misma versión"""
+        indice = self.obtener_indice()
+        pendientes = []
+        for artefactos in indice.values():
+            versiones_wheel = {artefacto['version'] for artefacto in artefactos if artefacto['tipo'] == 'wheel'}
+            for artefacto in artefactos:
+                if artefacto['tipo'] == 'sdist' and artefacto['version'] not in versiones_wheel:
+                    pendientes.append(os.path.join(self.directorio, artefacto['archivo']))
+        return pendientes
+
+    def comando_construir_wheels(self, python):
+        """Comando de pip que construye, una sola vez, los wheels de los sdists pendientes"""
+        sdists = self.sdists_sin_wheel()
+        if not sdists:
+            return None
+
+        # Las dependencias de construcción también salen del almacén
+        return [
+            str(python), "-m", "pip", "wheel",
+            "--no-deps", "--no-index", "--find-links", self.directorio,
+            "--wheel-dir", self.directorio
+        ] + sdists
+
+    def opciones_pip(self, sin_conexion):
+        """Opciones para que pip busque primero en el almacén, o solo en él"""
+        opciones = ["--find-links", self.directorio]
+        if sin_conexion:
+            opciones.insert(0, "--no-index")
+        return opciones
+
+    def obtener_indice(self):
+        """Devuelve {nombre_canonico: [artefactos]} releyendo el índice si cambió"""
+        with self._candado:
+            try:
+                mtime = os.stat(self.directorio).st_mtime_ns
+            except OSError:
+                return {}
+
+            if self._indice is None or mtime != self._mtime_indice:
+                self._indice, self._mtime_indice = self._cargar_o_reconstruir(mtime)
+
+            return self._indice
+
+    def actualizar_indice(self):
+        """Vuelve a generar el índice a partir de los archivos del almacén"""
+        with self._candado:
+            self._indice = None
+        return self.obtener_indice()
+
+    def _cargar_o_reconstruir(self, mtime):
+        """Usa el índice guardado si corresponde al contenido actual; devuelve (paquetes, mtime)"""
+        try:
+            with open(self.ruta_indice, encoding='utf-8') as archivo:
+                guardado = json.load(archivo)
+            if guardado.get('mtime') == mtime:
+                return guardado['paquetes'], mtime
+        except (OSError, ValueError, KeyError):
+            pass
+
+        carpeta_indice = os.path.dirname(self.ruta_indice)
+        if not os.path.isdir(carpeta_indice):
+            try:
+                os.mkdir(carpeta_indice)
+                mtime = os.stat(self.directorio).st_mtime_ns
+            except OSError:
+                pass
+
+        paquetes = {}
+        with os.scandir(self.directorio) as entradas:
+            for entrada in entradas:
+                info = parsear_nombre_archivo(entrada.name)
+                if info is None or not entrada.is_file():
+                    continue
+                info['archivo'] = entrada.name
+                if info['tipo'] == 'wheel':
+                    info['dependencias'] = self._dependencias_wheel(entrada.path)
+                paquetes.setdefault(info['clave'], []).append(info)
+
+        # Si algo cambió mientras se recorría, este índice no se guarda y se rehace en la próxima consulta
+        try:
+            sin_cambios = os.stat(self.directorio).st_mtime_ns == mtime
+        except OSError:
+            sin_cambios = False
+        if not sin_cambios:
+            return paquetes, None
+
+        try:
+            escribir_atomico(self.ruta_indice, json.dumps({'mtime': mtime, 'paquetes': paquetes}))
+        except OSError:
+            # Con el almacén de solo lectura el índice vive solo en memoria
+            pass
+
+        return paquetes, mtime
+
+    def _dependencias_wheel(self, ruta_wheel):
+        """Lee las líneas Requires-Dist del METADATA de un wheel"""
+        dependencias = []
+        try:
+            with zipfile.ZipFile(ruta_wheel) as wheel:
+                for nombre in wheel.namelist():
+                    if nombre.endswith('.dist-info/METADATA') and nombre.count('/') == 1:
+                        metadatos = wheel.read(nombre).decode('utf-8', 'replace')
+                        for linea in metadatos.splitlines():
+                            if not linea.strip():
+                                break
+                            if linea.startswith('Requires-Dist:'):
+                                dependencias.append(linea.split(':', 1)[1].strip())
+                        break
+        except (OSError, zipfile.BadZipFile):
+            pass
+        return dependencias
+
+    def faltantes(self, requisitos, version_python=None):
+        """
+        Devuelve los requisitos que el almacén no puede satisfacer, incluidas las
+        dependencias que declaran los wheels que sí están. Los sdists no declaran
+        dependencias, así que las suyas solo se descubren al construirlos.
+        """
+        indice = self.obtener_indice()
+        variables = entorno_marcadores(version_python)
+        faltan = []
+        revisados = set()
+        pendientes = [(texto, None) for texto in requisitos]
+
+        while pendientes:
+            texto, solicitante = pendientes.pop()
+            requisito = parsear_requisito(texto)
+            if requisito is None or requisito['url']:
+                continue
+
+            if not evaluar_marcador(requisito['marcador'], dict(variables)):
+                continue
+
+            clave = (requisito['clave'], requisito['especificador'])
+            if clave in revisados:
+                continue
+            revisados.add(clave)
+
+            candidatos = [
+                artefacto for artefacto in indice.get(requisito['clave'], [])
+                if cumple_especificador(artefacto['version'], requisito['especificador'])
+            ]
+            if not candidatos:
+                detalle = f" (requerido por {solicitante})" if solicitante else ""
+                faltan.append(f"{requisito['nombre']}{requisito['especificador']}{detalle}")
+                continue
+
+            # Sigue las dependencias del wheel elegido, ignorando las de extras no pedidos
+            for artefacto in candidatos:
+                if artefacto['tipo'] != 'wheel':
+                    continue
+                for dependencia in artefacto.get('dependencias', []):
+                    sub = parsear_requisito(dependencia)
+                    if sub is None:
+                        continue
+                    if 'extra' in sub['marcador']:
+                        if not any(
+                            evaluar_marcador(sub['marcador'], dict(variables, extra=normalizar_nombre(extra)))
+                            for extra in requisito['extras']
+                        ):
+                            continue
+                        sub_texto = dependencia.split(';', 1)[0]
+                    else:
+                        sub_texto = dependencia
+                    pendientes.append((sub_texto, requisito['nombre']))
+                break
+
+        return sorted(set(faltan))
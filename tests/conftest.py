@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+from src_gestor.entornos import GestorEntornos
+
+"""
+Utilidades compartidas por las pruebas: entornos falsos con un pip de mentira
+"""
+
+VERSION_PYTHON = "3.11.4"
+
+def crear_entorno_falso(ruta_entorno, paquetes=(), codigo_pip=0, codigo_python=0):
+    """
+    Crea la estructura mínima de un entorno (pyvenv.cfg, site-packages, pip y python) sin Python real.
+    Cada programa falso anota sus argumentos en <programa>.log y termina con el código indicado.
+    """
+    ruta_entorno = Path(ruta_entorno)
+    site = ruta_entorno / "lib" / "python3.11" / "site-packages"
+    site.mkdir(parents=True)
+    (ruta_entorno / "pyvenv.cfg").write_text(f"home = /usr/bin\nversion = {VERSION_PYTHON}\n", encoding='utf-8')
+
+    for nombre, version in paquetes:
+        agregar_paquete(site, nombre, version)
+
+    (ruta_entorno / "bin").mkdir()
+    for programa, codigo in (("pip", codigo_pip), ("python", codigo_python)):
+        ruta_programa = ruta_entorno / "bin" / programa
+        ruta_programa.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            f"with open({str(ruta_entorno / (programa + '.log'))!r}, 'a') as log:\n"
+            "    log.write(' '.join(sys.argv[1:]) + '\\n')\n"
+            f"sys.exit({codigo})\n",
+            encoding='utf-8'
+        )
+        ruta_programa.chmod(0o755)
+    return ruta_entorno
+
+def agregar_paquete(site, nombre, version, dependencias=()):
+    """Escribe el dist-info de un paquete instalado"""
+    dist_info = Path(site) / f"{nombre.replace('-', '_')}-{version}.dist-info"
+    dist_info.mkdir()
+    lineas = ["Metadata-Version: 2.1", f"Name: {nombre}", f"Version: {version}"]
+    lineas += [f"Requires-Dist: {dependencia}" for dependencia in dependencias]
+    (dist_info / "METADATA").write_text("\n".join(lineas) + "\n", encoding='utf-8')
+    return dist_info
+
+def llamadas_pip(ruta_entorno, programa="pip"):
+    """Argumentos de cada llamada al pip (o al python) falso del entorno"""
+    ruta_log = Path(ruta_entorno) / f"{programa}.log"
+    if not ruta_log.exists():
+        return []
+    return ruta_log.read_text(encoding='utf-8').splitlines()
+
+def esperar_trabajos(gestor, limite=30):
+    """Espera a que el planificador no tenga nada en marcha ni en cola"""
+    final = time.monotonic() + limite
+    while gestor.ejecutor.planificador.trabajos_activos():
+        if time.monotonic() > final:
+            raise TimeoutError("Los trabajos no terminaron a tiempo")
+        time.sleep(0.01)
+
+@pytest.fixture
+def gestor(tmp_path):
+    """GestorEntornos sobre un directorio temporal con un proyecto vacío"""
+    (tmp_path / "proyecto").mkdir()
+    mensajes = []
+    gestor = GestorEntornos(tmp_path, callback_salida=lambda mensaje, etiqueta=None: mensajes.append(mensaje))
+    gestor.mensajes = mensajes
+    yield gestor
+    esperar_trabajos(gestor)
+
+@pytest.fixture
+def posix():
+    """Los entornos falsos usan un pip ejecutable con shebang"""
+    if os.name == 'nt':
+        pytest.skip("El pip falso necesita un sistema POSIX")
@@ -0,0 +1,42 @@
+from conftest import crear_entorno_falso, esperar_trabajos
+from src_gestor.clonado import SUFIJO_CLONANDO
+from src_gestor.proyectos import GestorProyectos
+
+"""
+Clonado de entornos: copia a una carpeta temporal y reubicación de rutas
+"""
+
+def test_clonar_reubica_y_no_deja_temporales(gestor, tmp_path):
+    origen = crear_entorno_falso(tmp_path / "proyecto" / "env")
+    (origen / "pyvenv.cfg").write_text(f"home = /usr/bin\nversion = 3.11.4\ncommand = python -m venv {origen}\n",
+                                       encoding='utf-8')
+    (origen / "bin" / "activate").write_text(f'VIRTUAL_ENV="{origen}"\n', encoding='utf-8')
+    llamados = []
+
+    exito, _ = gestor.clonar_entorno("proyecto", "env", "copia", callback_exito=lambda: llamados.append(True))
+    esperar_trabajos(gestor)
+
+    destino = tmp_path / "proyecto" / "copia"
+    assert exito and llamados == [True]
+    assert f"venv {destino}" in (destino / "pyvenv.cfg").read_text(encoding='utf-8')
+    assert (destino / "bin" / "activate").read_text(encoding='utf-8') == f'VIRTUAL_ENV="{destino}"\n'
+    # El original no se toca aunque los archivos se compartan con enlaces
+    assert str(origen) in (origen / "bin" / "activate").read_text(encoding='utf-8')
+    assert not list((tmp_path / "proyecto").glob(f"*{SUFIJO_CLONANDO}"))
+
+def test_clonar_a_nombre_existente_falla(gestor, tmp_path):
+    crear_entorno_falso(tmp_path / "proyecto" / "env")
+    crear_entorno_falso(tmp_path / "proyecto" / "otro")
+
+    exito, mensaje = gestor.clonar_entorno("proyecto", "env", "otro")
+
+    assert not exito and "otro" in mensaje
+
+def test_escaneo_ignora_clones_a_medias(tmp_path):
+    crear_entorno_falso(tmp_path / "proyecto" / "env")
+    crear_entorno_falso(tmp_path / "proyecto" / f".copia.1234{SUFIJO_CLONANDO}")
+
+    proyecto = GestorProyectos(tmp_path).obtener_proyecto("proyecto")
+
+    assert [entorno['nombre'] for entorno in proyecto['entornos']] == ["env"]
+    assert proyecto['carpetas'] == []
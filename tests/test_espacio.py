@@ -0,0 +1,47 @@
+import os
+import threading
+
+from src_gestor.espacio import CalculadorEspacio
+
+"""
+Medición del espacio en disco con caché por directorio
+"""
+
+def _arbol(raiz):
+    (raiz / "sub" / "profundo").mkdir(parents=True)
+    (raiz / "a.bin").write_bytes(b"x" * 100000)
+    (raiz / "sub" / "profundo" / "b.bin").write_bytes(b"y" * 50000)
+    return raiz
+
+def test_enlaces_duros_cuentan_una_vez(tmp_path):
+    sin_enlace = _arbol(tmp_path / "sin_enlace")
+    con_enlace = _arbol(tmp_path / "con_enlace")
+    os.link(con_enlace / "a.bin", con_enlace / "sub" / "enlace.bin")
+    calculador = CalculadorEspacio(max_hilos=4)
+
+    medidas = calculador.medir([sin_enlace, con_enlace])
+    calculador.cerrar()
+
+    # El enlace solo añade lo que ocupa su entrada de directorio, no otra copia del archivo
+    assert medidas[str(sin_enlace)] > 150000
+    assert medidas[str(con_enlace)] - medidas[str(sin_enlace)] < 100000
+
+def test_reutiliza_los_hilos_entre_mediciones(tmp_path):
+    raiz = _arbol(tmp_path / "raiz")
+    calculador = CalculadorEspacio(max_hilos=4)
+    hilos = threading.active_count()
+
+    for _ in range(20):
+        calculador.medir([raiz, raiz / "sub"])
+
+    assert threading.active_count() <= hilos + 4
+    calculador.cerrar()
+
+def test_olvidar_y_directorio_borrado(tmp_path):
+    raiz = _arbol(tmp_path / "raiz")
+    calculador = CalculadorEspacio(max_hilos=2)
+    calculador.medir([raiz])
+
+    calculador.olvidar(raiz)
+    assert calculador.medir([tmp_path / "no_existe"]) == {str(tmp_path / "no_existe"): 0}
+    calculador.cerrar()
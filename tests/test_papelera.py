@@ -0,0 +1,87 @@
+import json
+import os
+import time
+
+from src_gestor.papelera import Papelera
+
+"""
+Papelera: eliminar al instante, deshacer dentro del plazo y borrado en segundo plano
+"""
+
+def _carpeta_con_archivos(ruta, cantidad=5):
+    (ruta / "sub").mkdir(parents=True)
+    for indice in range(cantidad):
+        (ruta / "sub" / f"archivo{indice}.txt").write_text("contenido", encoding='utf-8')
+    return ruta
+
+def _esperar(condicion, limite=5):
+    final = time.monotonic() + limite
+    while not condicion():
+        if time.monotonic() > final:
+            return False
+        time.sleep(0.01)
+    return True
+
+def test_enviar_y_deshacer(tmp_path):
+    papelera = Papelera(tmp_path, espera_deshacer=60)
+    ruta = _carpeta_con_archivos(tmp_path / "proyecto")
+
+    papelera.enviar(ruta, "proyecto")
+    assert not ruta.exists()
+
+    exito, mensaje = papelera.deshacer()
+    assert exito, mensaje
+    assert len(list((ruta / "sub").iterdir())) == 5
+    assert not papelera.deshacer()[0]
+
+def test_deshacer_no_pisa_lo_que_ya_existe(tmp_path):
+    papelera = Papelera(tmp_path, espera_deshacer=60)
+    ruta = _carpeta_con_archivos(tmp_path / "proyecto")
+    papelera.enviar(ruta)
+    ruta.mkdir()
+
+    exito, _ = papelera.deshacer()
+
+    assert not exito
+    assert list(ruta.iterdir()) == []
+    papelera.vaciar()
+
+def test_borra_al_vencer_el_plazo_y_avisa(tmp_path):
+    papelera = Papelera(tmp_path, espera_deshacer=0.05)
+    avisos = []
+    papelera.al_progreso = lambda descripcion, hechos, total: avisos.append((descripcion, hechos, total))
+
+    papelera.enviar(_carpeta_con_archivos(tmp_path / "entorno"), "entorno")
+
+    # El último aviso llega con todo borrado; cuenta también el info.json de la entrada
+    assert _esperar(lambda: avisos and avisos[-1][1] == avisos[-1][2])
+    assert avisos[-1] == ("entorno", 6, 6)
+    assert os.listdir(papelera.directorio) == []
+    assert not papelera.deshacer()[0]
+
+def test_retoma_lo_que_dejo_un_cierre(tmp_path):
+    directorio = tmp_path / Papelera.NOMBRE_CARPETA
+    # Un elemento que se podía deshacer, un borrado interrumpido y una carpeta sin contenido
+    pendiente = directorio / "a1"
+    _carpeta_con_archivos(pendiente / Papelera.NOMBRE_CONTENIDO)
+    (pendiente / Papelera.NOMBRE_INFO).write_text(
+        json.dumps({'ruta': str(tmp_path / "restaurado"), 'momento': time.time(), 'descripcion': "restaurado"}),
+        encoding='utf-8'
+    )
+    _carpeta_con_archivos(directorio / ("b2" + Papelera.SUFIJO_BORRANDO))
+    (directorio / "c3").mkdir()
+
+    papelera = Papelera(tmp_path, espera_deshacer=60)
+
+    assert _esperar(lambda: sorted(os.listdir(directorio)) == ["a1"])
+    assert papelera.deshacer()[0]
+    assert (tmp_path / "restaurado" / "sub").is_dir()
+
+def test_vaciar_borra_en_el_momento(tmp_path):
+    papelera = Papelera(tmp_path, espera_deshacer=60)
+    papelera.enviar(_carpeta_con_archivos(tmp_path / "uno"))
+    papelera.enviar(_carpeta_con_archivos(tmp_path / "dos"))
+
+    papelera.vaciar()
+
+    assert os.listdir(papelera.directorio) == []
@@ -0,0 +1,22 @@
+from conftest import agregar_paquete
+from src_gestor.paquetes import LectorPaquetes, generar_freeze
+
+"""
+Freeze a partir de los metadatos: qué paquetes omite según la versión de Python del entorno
+"""
+
+def _paquetes(tmp_path):
+    for nombre, version in (("pip", "24.0"), ("setuptools", "69.0"), ("wheel", "0.42.0"), ("Requests", "2.31.0")):
+        agregar_paquete(tmp_path, nombre, version)
+    return LectorPaquetes().listar([tmp_path])
+
+def test_antes_de_312_omite_las_herramientas_de_empaquetado(tmp_path):
+    assert generar_freeze(_paquetes(tmp_path), version_python="3.11.4") == "Requests==2.31.0\n"
+
+def test_desde_312_solo_omite_pip(tmp_path):
+    texto = generar_freeze(_paquetes(tmp_path), version_python="3.12.1")
+
+    assert texto == "Requests==2.31.0\nsetuptools==69.0\nwheel==0.42.0\n"
+
+def test_incluir_todos(tmp_path):
+    assert "pip==24.0\n" in generar_freeze(_paquetes(tmp_path), incluir_todos=True, version_python="3.11.4")
@@ -0,0 +1,65 @@
+import os
+
+from src_gestor.proyectos import GestorProyectos
+
+"""
+Caché de proyectos: se reutiliza mientras no cambien, y los cambios propios la invalidan
+"""
+
+def _envejecer(ruta, segundos=60):
+    """Fecha de modificación antigua, para que el proyecto entre en la caché"""
+    mtime = os.stat(ruta).st_mtime - segundos
+    os.utime(ruta, (mtime, mtime))
+    return os.stat(ruta).st_mtime_ns
+
+def _fijar_mtime(ruta, mtime_ns):
+    os.utime(ruta, ns=(mtime_ns, mtime_ns))
+
+def test_reutiliza_la_cache_si_no_cambia(tmp_path):
+    gestor = GestorProyectos(tmp_path)
+    gestor.crear_proyecto("web")
+    _envejecer(tmp_path / "web")
+
+    assert gestor.obtener_proyecto("web") is gestor.obtener_proyecto("web")
+
+def test_eliminar_carpeta_invalida_la_cache(tmp_path):
+    gestor = GestorProyectos(tmp_path)
+    gestor.crear_proyecto("web")
+    (tmp_path / "web" / "datos").mkdir()
+    mtime = _envejecer(tmp_path / "web")
+    assert [carpeta['nombre'] for carpeta in gestor.obtener_proyecto("web")['carpetas']] == ["datos"]
+
+    exito, _ = gestor.eliminar_carpeta("web", "datos")
+    # Un sistema de archivos con fechas poco precisas puede no mover el mtime
+    _fijar_mtime(tmp_path / "web", mtime)
+
+    assert exito
+    assert gestor.obtener_proyecto("web")['carpetas'] == []
+    gestor.papelera.vaciar()
+
+def test_deshacer_invalida_la_cache(tmp_path):
+    gestor = GestorProyectos(tmp_path)
+    gestor.crear_proyecto("web")
+    (tmp_path / "web" / "datos").mkdir()
+    gestor.eliminar_carpeta("web", "datos")
+    mtime = _envejecer(tmp_path / "web")
+    assert gestor.obtener_proyecto("web")['carpetas'] == []
+
+    exito, _ = gestor.deshacer_eliminacion()
+    _fijar_mtime(tmp_path / "web", mtime)
+
+    assert exito
+    assert [carpeta['nombre'] for carpeta in gestor.obtener_proyecto("web")['carpetas']] == ["datos"]
+
+def test_crear_y_eliminar_proyecto(tmp_path):
+    gestor = GestorProyectos(tmp_path)
+
+    assert gestor.crear_proyecto("web")[0]
+    assert not gestor.crear_proyecto("web")[0]
+    assert not gestor.crear_proyecto("con espacios")[0]
+    assert gestor.listar_proyectos() == ["web"]
+
+    assert gestor.eliminar_proyecto("web")[0]
+    assert gestor.listar_proyectos() == []
+    assert gestor.obtener_proyecto("web") is None
+    gestor.papelera.vaciar()
@@ -0,0 +1,119 @@
+import pytest
+
+from src_gestor.requisitos import (
+    clave_version, cumple_especificador, entorno_marcadores, evaluar_marcador, leer_archivo_requisitos,
+    normalizar_nombre, parsear_nombre_archivo, parsear_requisito, separar_opciones
+)
+
+"""
+Lectura de requirements, versiones y marcadores
+"""
+
+def test_normalizar_nombre():
+    assert normalizar_nombre("Zope.Interface") == "zope-interface"
+    assert normalizar_nombre("typing__extensions") == "typing-extensions"
+
+@pytest.mark.parametrize("menor, mayor", [
+    ("1.0.dev1", "1.0a1"),
+    ("1.0a1", "1.0b2"),
+    ("1.0rc1", "1.0"),
+    ("1.0", "1.0.post1"),
+    ("1.9", "1.10"),
+    ("2.0", "1!0.1"),
+])
+def test_orden_de_versiones(menor, mayor):
+    assert clave_version(menor) < clave_version(mayor)
+
+def test_ceros_finales_no_cuentan():
+    assert clave_version("1.0.0") == clave_version("1")
+
+@pytest.mark.parametrize("version, especificador, esperado", [
+    ("1.4", ">=1.0,<2", True),
+    ("2.0", ">=1.0,<2", False),
+    ("1.4.2", "==1.4.*", True),
+    ("1.5", "~=1.4", True),
+    ("2.0", "~=1.4", False),
+    ("1.4", "!=1.4", False),
+    ("1.4", "", True),
+])
+def test_cumple_especificador(version, especificador, esperado):
+    assert cumple_especificador(version, especificador) is esperado
+
+def test_parsear_requisito_completo():
+    requisito = parsear_requisito('Foo_Bar[seguro, rapido] >= 1.0 ; python_version >= "3.8"')
+    assert requisito['clave'] == "foo-bar"
+    assert requisito['extras'] == ["seguro", "rapido"]
+    assert requisito['especificador'] == ">=1.0"
+    assert requisito['marcador'] == 'python_version >= "3.8"'
+    assert requisito['hashes'] == [] and requisito['opciones'] == []
+
+def test_parsear_requisito_con_url():
+    requisito = parsear_requisito("paquete @ https://ejemplo.org/paquete-1.0.whl")
+    assert requisito['url'] == "https://ejemplo.org/paquete-1.0.whl"
+    assert requisito['especificador'] == ""
+
+def test_parsear_requisito_separa_hashes():
+    requisito = parsear_requisito("foo==1.0 --hash=sha256:abc --hash sha256:def")
+    assert requisito['especificador'] == "==1.0"
+    assert requisito['texto'] == "foo==1.0"
+    assert requisito['hashes'] == ["sha256:abc", "sha256:def"]
+
+def test_separar_opciones_por_requisito():
+    texto, hashes, opciones = separar_opciones('foo>=1; os_name == "posix" --config-settings=clave=valor')
+    assert texto == 'foo>=1; os_name == "posix"'
+    assert hashes == []
+    assert opciones == ["--config-settings=clave=valor"]
+
+def test_leer_archivo_con_includes_restricciones_y_hashes(tmp_path):
+    (tmp_path / "base.txt").write_text("requests>=2\n", encoding='utf-8')
+    (tmp_path / "limites.txt").write_text("urllib3<3\n", encoding='utf-8')
+    principal = tmp_path / "requirements.txt"
+    principal.write_text(
+        "# comentario\n"
+        "-r base.txt\n"
+        "-c limites.txt\n"
+        "--index-url https://indice.local/simple\n"
+        "idna==3.4 \\\n"
+        "    --hash=sha256:aaa \\\n"
+        "    --hash=sha256:bbb\n"
+        "./vendor/local  # sin nombre\n",
+        encoding='utf-8'
+    )
+    archivos = set()
+
+    requisitos, restricciones, opciones = leer_archivo_requisitos(principal, archivos)
+
+    assert [requisito['texto'] for requisito in requisitos] == ["requests>=2", "idna==3.4", "./vendor/local"]
+    assert requisitos[1]['hashes'] == ["sha256:aaa", "sha256:bbb"]
+    assert requisitos[1]['origen'] == str(principal)
+    assert requisitos[2]['clave'] is None
+    assert [restriccion['clave'] for restriccion in restricciones] == ["urllib3"]
+    assert opciones == ["--index-url https://indice.local/simple"]
+    assert len(archivos) == 3
+
+def test_include_circular_no_se_repite(tmp_path):
+    (tmp_path / "a.txt").write_text("-r b.txt\nuno\n", encoding='utf-8')
+    (tmp_path / "b.txt").write_text("-r a.txt\ndos\n", encoding='utf-8')
+
+    requisitos, _, _ = leer_archivo_requisitos(tmp_path / "a.txt")
+
+    assert sorted(requisito['clave'] for requisito in requisitos) == ["dos", "uno"]
+
+def test_evaluar_marcador():
+    variables = entorno_marcadores("3.9.1")
+    assert evaluar_marcador('python_version < "3.10" and python_version >= "3.8"', variables)
+    assert not evaluar_marcador('python_version >= "3.10" or extra == "pruebas"', dict(variables, extra=""))
+    assert evaluar_marcador('', variables)
+
+@pytest.mark.parametrize("marcador", [
+    'python_version >> "3"', 'python_version <', '(python_version >= "3"', 'os_name == "nt" and', 'os_name is "nt"'
+])
+def test_marcador_mal_escrito_falla(marcador):
+    with pytest.raises(ValueError):
+        evaluar_marcador(marcador, entorno_marcadores("3.9.1"))
+
+def test_parsear_nombre_archivo():
+    wheel = parsear_nombre_archivo("Foo_Bar-1.2.3-py3-none-any.whl")
+    assert (wheel['clave'], wheel['version'], wheel['tipo']) == ("foo-bar", "1.2.3", "wheel")
+    sdist = parsear_nombre_archivo("foo-0.1.tar.gz")
+    assert (sdist['version'], sdist['tipo']) == ("0.1", "sdist")
@@ -0,0 +1,92 @@
+import os
+import shutil
+
+from conftest import crear_entorno_falso, esperar_trabajos
+from src_gestor.sellos import AL_DIA, DESACTUALIZADO, NOMBRE_SELLO, comprobar_sello, escribir_sello
+
+"""
+Sellos de instalación: qué cambios dejan un entorno desactualizado y cuáles no
+"""
+
+PAQUETES = [{'clave': 'requests', 'version': '2.31.0'}, {'clave': 'idna', 'version': '3.6'}]
+
+def _sellar(tmp_path):
+    entorno = tmp_path / "venv"
+    site = entorno / "lib" / "site-packages"
+    site.mkdir(parents=True)
+    requisitos = tmp_path / "requirements.txt"
+    requisitos.write_text("requests==2.31.0\n", encoding='utf-8')
+    escribir_sello(entorno, str(requisitos), [str(requisitos)], "3.11.4", [site], PAQUETES)
+    return entorno, site, requisitos
+
+def _tocar(ruta):
+    """Adelanta la fecha de modificación sin depender de la resolución del reloj"""
+    info = os.stat(ruta)
+    os.utime(ruta, ns=(info.st_atime_ns, info.st_mtime_ns + 10 ** 9))
+
+def test_sin_sello(tmp_path):
+    assert comprobar_sello(tmp_path, "3.11.4", lambda: PAQUETES) is None
+
+def test_recien_sellado_esta_al_dia(tmp_path):
+    entorno, _, requisitos = _sellar(tmp_path)
+
+    def no_hace_falta():
+        raise AssertionError("sin cambios no se listan los paquetes")
+
+    assert comprobar_sello(entorno, "3.11.4", no_hace_falta, str(requisitos)) == AL_DIA
+
+def test_cambiar_el_contenido_desactualiza(tmp_path):
+    entorno, _, requisitos = _sellar(tmp_path)
+    requisitos.write_text("requests==2.32.0\n", encoding='utf-8')
+    _tocar(requisitos)
+
+    assert comprobar_sello(entorno, "3.11.4", lambda: PAQUETES) == DESACTUALIZADO
+
+def test_tocar_sin_cambiar_el_contenido_sigue_al_dia(tmp_path):
+    entorno, _, requisitos = _sellar(tmp_path)
+    _tocar(requisitos)
+
+    assert comprobar_sello(entorno, "3.11.4", lambda: PAQUETES) == AL_DIA
+
+def test_otra_version_de_python_u_otro_archivo(tmp_path):
+    entorno, _, requisitos = _sellar(tmp_path)
+    otro = tmp_path / "requirements-dev.txt"
+    otro.write_text("requests==2.31.0\n", encoding='utf-8')
+
+    assert comprobar_sello(entorno, "3.12.1", lambda: PAQUETES) == DESACTUALIZADO
+    assert comprobar_sello(entorno, "3.11.4", lambda: PAQUETES, str(otro)) == DESACTUALIZADO
+
+def test_cambios_en_site_packages(tmp_path):
+    entorno, site, _ = _sellar(tmp_path)
+    _tocar(site)
+
+    # La carpeta cambió pero los paquetes son los mismos
+    assert comprobar_sello(entorno, "3.11.4", lambda: list(reversed(PAQUETES))) == AL_DIA
+    otros = PAQUETES + [{'clave': 'urllib3', 'version': '2.2.0'}]
+    assert comprobar_sello(entorno, "3.11.4", lambda: otros) == DESACTUALIZADO
+
+def test_el_sello_sigue_al_entorno_copiado(tmp_path):
+    entorno, _, requisitos = _sellar(tmp_path)
+    copia = tmp_path / "copia"
+    shutil.copytree(entorno, copia)
+    (copia / "lib" / "site-packages" / "urllib3-2.2.0.dist-info").mkdir()
+    _tocar(copia / "lib" / "site-packages")
+    otros = PAQUETES + [{'clave': 'urllib3', 'version': '2.2.0'}]
+
+    # La copia mira sus propios site-packages, no los del original
+    assert comprobar_sello(copia, "3.11.4", lambda: otros, str(requisitos)) == DESACTUALIZADO
+    assert comprobar_sello(entorno, "3.11.4", lambda: PAQUETES, str(requisitos)) == AL_DIA
+
+def test_clonar_no_copia_el_sello(gestor, tmp_path):
+    origen = crear_entorno_falso(tmp_path / "proyecto" / "env")
+    requisitos = tmp_path / "proyecto" / "requirements.txt"
+    requisitos.write_text("", encoding='utf-8')
+    escribir_sello(origen, str(requisitos), [str(requisitos)], "3.11.4", [], [])
+
+    exito, _ = gestor.clonar_entorno("proyecto", "env", "copia")
+    esperar_trabajos(gestor)
+
+    assert exito
+    assert (origen / NOMBRE_SELLO).exists()
+    assert not (tmp_path / "proyecto" / "copia" / NOMBRE_SELLO).exists()
+    assert gestor.estado_sello(tmp_path / "proyecto" / "copia", str(requisitos)) is None
@@ -0,0 +1,90 @@
+import pytest
+
+from src_gestor.requisitos import entorno_marcadores, parsear_requisito
+from src_gestor.sincronizacion import planificar
+
+"""
+Plan de sincronización entre un requirements y los paquetes instalados
+"""
+
+@pytest.fixture
+def variables():
+    return entorno_marcadores("3.11.4")
+
+def _instalado(nombre, version, dependencias=(), metadatos="/no/existe"):
+    return {'nombre': nombre, 'clave': nombre.lower(), 'version': version,
+            'dependencias': list(dependencias), 'metadatos': metadatos}
+
+def _requisitos(*lineas):
+    return [parsear_requisito(linea) for linea in lineas]
+
+def test_instala_actualiza_y_elimina(variables):
+    instalados = [_instalado("requests", "2.0"), _instalado("viejo", "1.0"), _instalado("pip", "24.0")]
+
+    plan = planificar(_requisitos("requests>=2.31", "idna==3.4"), [], instalados, variables)
+
+    assert plan.instalar == ["idna==3.4"]
+    assert plan.actualizar == [("requests", "2.0", "requests>=2.31")]
+    assert plan.eliminar == ["viejo"]
+    assert plan.requisitos_pip() == ["idna==3.4", "requests>=2.31"]
+    assert not plan.vacio()
+
+def test_entorno_al_dia(variables):
+    plan = planificar(_requisitos("requests>=2"), [], [_instalado("requests", "2.31")], variables)
+
+    assert plan.vacio()
+    assert plan.cumplidos == 1
+
+def test_dependencias_no_se_eliminan(variables):
+    instalados = [
+        _instalado("requests", "2.31", ["idna>=2", "pruebas-extra; extra == 'pruebas'"]),
+        _instalado("idna", "3.4"),
+        _instalado("pruebas-extra", "1.0"),
+    ]
+
+    sin_extra = planificar(_requisitos("requests"), [], instalados, variables)
+    con_extra = planificar(_requisitos("requests[pruebas]"), [], instalados, variables)
+
+    assert sin_extra.eliminar == ["pruebas-extra"]
+    assert con_extra.eliminar == []
+
+def test_restricciones_cuentan_para_cumplir(variables):
+    plan = planificar(_requisitos("urllib3"), _requisitos("urllib3<2"), [_instalado("urllib3", "2.1")], variables)
+
+    assert plan.actualizar == [("urllib3", "2.1", "urllib3")]
+
+def test_marcador_que_no_aplica_se_ignora(variables):
+    plan = planificar(_requisitos('tomli; python_version < "3.11"'), [], [], variables)
+
+    assert plan.vacio()
+
+def test_sin_eliminar(variables):
+    plan = planificar(_requisitos("requests"), [], [_instalado("requests", "2.31"), _instalado("viejo", "1.0")],
+                      variables, eliminar=False)
+
+    assert plan.eliminar == []
+
+def test_requisito_sin_nombre_conserva_todo(variables):
+    requisitos = [{'nombre': None, 'clave': None, 'texto': "./local", 'origen': "/tmp/req.txt", 'extras': [],
+                   'especificador': '', 'marcador': '', 'url': "./local", 'hashes': [], 'opciones': []}]
+
+    plan = planificar(requisitos, [], [_instalado("viejo", "1.0")], variables)
+
+    assert plan.instalar == ["./local"]
+    assert plan.eliminar == []
+    assert plan.avisos
+
+def test_opciones_solo_de_lo_que_se_instala(variables):
+    requisitos = _requisitos("idna==3.4 --hash=sha256:aaa", "requests==2.31 --hash=sha256:bbb")
+
+    plan = planificar(requisitos, [], [_instalado("requests", "2.31")], variables)
+
+    assert plan.requisitos_pip() == ["idna==3.4"]
+    assert plan.lineas_pip() == ["idna==3.4 --hash=sha256:aaa"]
+    assert plan.con_hashes()
+
+def test_describir_y_diccionario(variables):
+    plan = planificar(_requisitos("idna"), [], [_instalado("viejo", "1.0")], variables)
+
+    assert "  + instalar idna" in plan.describir()
+    assert plan.a_diccionario()['eliminar'] == ["viejo"]
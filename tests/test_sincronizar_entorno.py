@@ -0,0 +1,112 @@
+from conftest import agregar_paquete, crear_entorno_falso, esperar_trabajos, llamadas_pip
+from src_gestor.entornos import ARCHIVO_SINCRONIZACION
+from src_gestor.sellos import AL_DIA, leer_sello
+
+"""
+Encadenado de GestorEntornos.sincronizar_requirements: instalar, eliminar sobrantes y sellar
+"""
+
+def _preparar(gestor, tmp_path, codigo_pip, contenido="nuevo==1.0\n"):
+    ruta_entorno = crear_entorno_falso(tmp_path / "proyecto" / "env", [("viejo", "1.0")], codigo_pip)
+    archivo = tmp_path / "req.txt"
+    archivo.write_text(contenido, encoding='utf-8')
+    return ruta_entorno, archivo
+
+def test_pip_fallido_no_sella(gestor, tmp_path, posix):
+    ruta_entorno, archivo = _preparar(gestor, tmp_path, codigo_pip=1)
+    llamados = []
+
+    exito, plan = gestor.sincronizar_requirements("proyecto", "env", str(archivo),
+                                                  callback_exito=lambda: llamados.append(True))
+    esperar_trabajos(gestor)
+
+    assert exito and plan.instalar == ["nuevo==1.0"]
+    assert leer_sello(ruta_entorno) is None
+    assert gestor.estado_sello(ruta_entorno, str(archivo)) is None
+    assert llamados == []
+
+def test_pip_fallido_no_elimina_sobrantes(gestor, tmp_path, posix):
+    ruta_entorno, archivo = _preparar(gestor, tmp_path, codigo_pip=1)
+
+    gestor.sincronizar_requirements("proyecto", "env", str(archivo))
+    esperar_trabajos(gestor)
+
+    llamadas = llamadas_pip(ruta_entorno)
+    assert len(llamadas) == 1 and llamadas[0].startswith("install")
+
+def test_pip_fallido_sin_eliminar_no_sella(gestor, tmp_path, posix):
+    ruta_entorno, archivo = _preparar(gestor, tmp_path, codigo_pip=1)
+
+    gestor.sincronizar_requirements("proyecto", "env", str(archivo), eliminar_sobrantes=False)
+    esperar_trabajos(gestor)
+
+    assert leer_sello(ruta_entorno) is None
+
+def test_pip_correcto_elimina_y_sella(gestor, tmp_path, posix):
+    ruta_entorno, archivo = _preparar(gestor, tmp_path, codigo_pip=0)
+    llamados = []
+
+    gestor.sincronizar_requirements("proyecto", "env", str(archivo), callback_exito=lambda: llamados.append(True))
+    esperar_trabajos(gestor)
+
+    llamadas = llamadas_pip(ruta_entorno)
+    assert llamadas[0] == "install nuevo==1.0"
+    # El pip falso no instala nada, así que viejo sigue sobrando tras la instalación
+    assert llamadas[1] == "uninstall -y viejo"
+    assert leer_sello(ruta_entorno) is not None
+    assert llamados == [True]
+
+def test_plan_vacio_sella_sin_llamar_a_pip(gestor, tmp_path, posix):
+    ruta_entorno, archivo = _preparar(gestor, tmp_path, codigo_pip=1, contenido="viejo==1.0\n")
+
+    exito, plan = gestor.sincronizar_requirements("proyecto", "env", str(archivo))
+    esperar_trabajos(gestor)
+
+    assert exito and plan.vacio()
+    assert llamadas_pip(ruta_entorno) == []
+    assert gestor.estado_sello(ruta_entorno, str(archivo)) == AL_DIA
+
+def test_simulacion_no_toca_nada(gestor, tmp_path, posix):
+    ruta_entorno, archivo = _preparar(gestor, tmp_path, codigo_pip=0)
+
+    exito, plan = gestor.sincronizar_requirements("proyecto", "env", str(archivo), simulacion=True)
+    esperar_trabajos(gestor)
+
+    assert exito
+    assert plan.instalar == ["nuevo==1.0"] and plan.eliminar == ["viejo"]
+    assert llamadas_pip(ruta_entorno) == []
+    assert leer_sello(ruta_entorno) is None
+
+def test_hashes_se_pasan_en_un_archivo(gestor, tmp_path, posix):
+    ruta_entorno, archivo = _preparar(gestor, tmp_path, codigo_pip=0,
+                                      contenido="nuevo==1.0 \\\n    --hash=sha256:aaa\nviejo==1.0\n")
+
+    gestor.sincronizar_requirements("proyecto", "env", str(archivo))
+    esperar_trabajos(gestor)
+
+    ruta_lista = ruta_entorno / ARCHIVO_SINCRONIZACION
+    assert llamadas_pip(ruta_entorno)[0] == f"install --require-hashes -r {ruta_lista}"
+    assert ruta_lista.read_text(encoding='utf-8') == "nuevo==1.0 --hash=sha256:aaa\n"
+
+def test_marcador_mal_escrito_no_toca_nada(gestor, tmp_path, posix):
+    # Antes se evaluaba a medias y el paquete pedido acababa en la lista de sobrantes
+    ruta_entorno, archivo = _preparar(gestor, tmp_path, codigo_pip=0, contenido='viejo==1.0 ; python_version >> "3"\n')
+
+    exito, mensaje = gestor.sincronizar_requirements("proyecto", "env", str(archivo))
+    esperar_trabajos(gestor)
+
+    assert not exito and "Marcador no válido" in mensaje
+    assert llamadas_pip(ruta_entorno) == []
+    assert leer_sello(ruta_entorno) is None
+
+def test_se_aplica_el_plan_confirmado(gestor, tmp_path, posix):
+    ruta_entorno, archivo = _preparar(gestor, tmp_path, codigo_pip=0)
+    _, plan = gestor.sincronizar_requirements("proyecto", "env", str(archivo), simulacion=True)
+
+    # Lo que aparezca entre la simulación y la confirmación no se elimina sin preguntar
+    agregar_paquete(ruta_entorno / "lib" / "python3.11" / "site-packages", "intruso", "2.0")
+    gestor.sincronizar_requirements("proyecto", "env", str(archivo), plan=plan)
+    esperar_trabajos(gestor)
+
+    assert llamadas_pip(ruta_entorno) == ["install nuevo==1.0", "uninstall -y viejo"]
+    assert leer_sello(ruta_entorno) is not None
@@ -0,0 +1,55 @@
+import json
+import os
+
+from src_gestor import wheelhouse
+from src_gestor.wheelhouse import AlmacenWheels
+
+"""
+Índice del wheelhouse: se guarda una vez por contenido y nunca registra archivos que no vio
+"""
+
+def _almacen(tmp_path, *archivos):
+    almacen = AlmacenWheels(tmp_path)
+    os.makedirs(almacen.directorio)
+    for nombre in archivos:
+        open(os.path.join(almacen.directorio, nombre), 'wb').close()
+    return almacen
+
+def test_el_indice_guardado_se_reutiliza(tmp_path):
+    almacen = _almacen(tmp_path, "uno-1.0-py3-none-any.whl", "dos-2.0.tar.gz")
+
+    assert sorted(almacen.obtener_indice()) == ["dos", "uno"]
+    with open(almacen.ruta_indice, encoding='utf-8') as archivo:
+        guardado = json.load(archivo)
+    # Guardar el índice no cambia la fecha del almacén, así que sigue valiendo
+    assert guardado['mtime'] == os.stat(almacen.directorio).st_mtime_ns
+    assert sorted(AlmacenWheels(tmp_path).obtener_indice()) == ["dos", "uno"]
+
+def test_lo_que_llega_durante_el_recorrido_no_se_pierde(tmp_path, monkeypatch):
+    almacen = _almacen(tmp_path, "uno-1.0-py3-none-any.whl")
+    original = AlmacenWheels._dependencias_wheel
+
+    def _llega_otro(self, ruta_wheel):
+        # Como un pip wheel -w que deja un archivo mientras se lee el almacén
+        destino = os.path.join(self.directorio, "nuevo-1.0-py3-none-any.whl")
+        if not os.path.exists(destino):
+            open(destino, 'wb').close()
+            os.utime(self.directorio, ns=(0, os.stat(self.directorio).st_mtime_ns + 10 ** 9))
+        return original(self, ruta_wheel)
+
+    monkeypatch.setattr(AlmacenWheels, '_dependencias_wheel', _llega_otro)
+    almacen.obtener_indice()
+
+    assert not os.path.exists(almacen.ruta_indice)
+    assert "nuevo" in almacen.obtener_indice()
+
+def test_almacen_de_solo_lectura(tmp_path, monkeypatch):
+    almacen = _almacen(tmp_path, "uno-1.0-py3-none-any.whl")
+
+    def _sin_permiso(ruta, texto):
+        raise PermissionError(ruta)
+
+    monkeypatch.setattr(wheelhouse, 'escribir_atomico', _sin_permiso)
+
+    assert list(almacen.obtener_indice()) == ["uno"]
+    assert list(almacen.obtener_indice()) == ["uno"]
@@ -0,0 +1,70 @@
+import hashlib
+
+from conftest import crear_entorno_falso, esperar_trabajos, llamadas_pip
+from src_gestor.requisitos import leer_archivo_requisitos
+
+"""
+Instalación desde el wheelhouse: la construcción de wheels va antes y condiciona la instalación
+"""
+
+def _preparar(gestor, tmp_path, codigo_python, modo='primero'):
+    ruta_entorno = crear_entorno_falso(tmp_path / "proyecto" / "env", codigo_python=codigo_python)
+    sdist = tmp_path / "paquete-1.0.tar.gz"
+    sdist.write_bytes(b"")
+    assert gestor.agregar_a_wheelhouse([str(sdist)])[0]
+    gestor.modo_wheelhouse = modo
+    return ruta_entorno
+
+def _leer_texto(directorio, texto):
+    ruta = directorio / "generado.txt"
+    ruta.write_text(texto, encoding='utf-8')
+    return leer_archivo_requisitos(ruta)
+
+def test_construccion_fallida_no_instala(gestor, tmp_path, posix):
+    ruta_entorno = _preparar(gestor, tmp_path, codigo_python=1)
+
+    exito, _ = gestor.instalar_libreria("proyecto", "env", "paquete")
+    esperar_trabajos(gestor)
+
+    assert exito
+    assert llamadas_pip(ruta_entorno, "python")[0].startswith("-m pip wheel")
+    assert llamadas_pip(ruta_entorno) == []
+
+def test_sin_conexion_lo_que_falta_se_avisa_tras_construir(gestor, tmp_path, posix):
+    ruta_entorno = _preparar(gestor, tmp_path, codigo_python=0, modo='sin_conexion')
+
+    exito, _ = gestor.instalar_libreria("proyecto", "env", "otro")
+    esperar_trabajos(gestor)
+
+    assert exito
+    assert len(llamadas_pip(ruta_entorno, "python")) == 1
+    assert llamadas_pip(ruta_entorno) == []
+    assert "✗ Faltan en el wheelhouse: otro" in gestor.mensajes
+
+def test_wheelhouse_completo_no_consulta_pypi(gestor, tmp_path, posix):
+    ruta_entorno = crear_entorno_falso(tmp_path / "proyecto" / "env")
+    wheel = tmp_path / "paquete-1.0-py3-none-any.whl"
+    wheel.write_bytes(b"")
+    gestor.agregar_a_wheelhouse([str(wheel)])
+    gestor.modo_wheelhouse = 'primero'
+
+    gestor.instalar_libreria("proyecto", "env", "paquete")
+    esperar_trabajos(gestor)
+
+    assert llamadas_pip(ruta_entorno) == [f"install --no-index --find-links {gestor.wheelhouse.directorio} paquete"]
+
+def test_requirements_con_hashes_del_wheelhouse(gestor, tmp_path, monkeypatch):
+    crear_entorno_falso(tmp_path / "proyecto" / "env", [("paquete", "1.0")])
+    wheel = tmp_path / "paquete-1.0-py3-none-any.whl"
+    contenido = bytes(range(256)) * 10000
+    wheel.write_bytes(contenido)
+    gestor.agregar_a_wheelhouse([str(wheel)])
+    # Varios bloques por archivo
+    monkeypatch.setattr(gestor, 'TAMANO_BLOQUE', 4096)
+
+    exito, texto = gestor.texto_requirements("proyecto", "env", con_hashes=True)
+
+    assert exito
+    requisitos, _, _ = _leer_texto(tmp_path, texto)
+    assert requisitos[0]['texto'] == "paquete==1.0"
+    assert requisitos[0]['hashes'] == [f"sha256:{hashlib.sha256(contenido).hexdigest()}"]